@@ -320,11 +320,39 @@ contract ReviewProcessor is Ownable, ReentrancyGuard, IReviewProcessor {
         require(review.user != address(0), "ReviewProcessor: Review does not exist");
         require(review.status == IScenicReviewCore.ReviewStatus.Pending, "ReviewProcessor: Review must be in pending status");
         
+        _updateReviewStatus(reviewId, isApproved);
+    }
+    
+    /**
+     * @dev Update status for multiple reviews in one transaction
+     * @notice Reviews that do not exist or are no longer pending are skipped instead of reverting the whole batch
+     * @param reviewIds Review ID list
+     * @param approvals Approval result for each review
+     */
+    function updateReviewStatusBatch(uint256[] calldata reviewIds, bool[] calldata approvals) external override nonReentrant {
+        require(msg.sender == oracleAddress || msg.sender == owner(), "ReviewProcessor: Only Oracle or owner can update review status");
+        require(reviewIds.length == approvals.length, "ReviewProcessor: Array length mismatch");
+        
+        for (uint256 i = 0; i < reviewIds.length; i++) {
+            IScenicReviewCore.Review storage review = _reviews[reviewIds[i]];
+            if (review.user == address(0) || review.status != IScenicReviewCore.ReviewStatus.Pending) {
+                continue;
+            }
+            _updateReviewStatus(reviewIds[i], approvals[i]);
+        }
+    }
+    
+    /**
+     * @dev Internal function: Apply review result to a pending review
+     * @param reviewId Review ID
+     * @param isApproved Whether it's approved
+     */
+    function _updateReviewStatus(uint256 reviewId, bool isApproved) internal {
         // Update status based on review result
         if (isApproved) {
             _processApprovedReview(reviewId);
         } else {
-            review.status = IScenicReviewCore.ReviewStatus.Rejected;
+            _reviews[reviewId].status = IScenicReviewCore.ReviewStatus.Rejected;
         }
         
         // Send review status update event
@@ -527,9 +555,45 @@ contract ReviewProcessor is Ownable, ReentrancyGuard, IReviewProcessor {
      */
     function updateReviewTxHashes(uint256 reviewId, bytes32 submitHash, bytes32 approveHash) external override {
         require(msg.sender == oracleAddress, "ReviewProcessor: Only Oracle can update transaction hash");
+        require(_reviews[reviewId].user != address(0), "ReviewProcessor: Review does not exist");
         
+        _updateReviewTxHashes(reviewId, submitHash, approveHash);
+    }
+    
+    /**
+     * @dev Update transaction hashes for multiple reviews in one transaction
+     * @notice Reviews that do not exist are skipped instead of reverting the whole batch
+     * @param reviewIds Review ID list
+     * @param submitHashes Transaction hashes of user's review submissions
+     * @param approveHashes Transaction hashes of AI review status changes
+     */
+    function updateReviewTxHashesBatch(
+        uint256[] calldata reviewIds,
+        bytes32[] calldata submitHashes,
+        bytes32[] calldata approveHashes
+    ) external override {
+        require(msg.sender == oracleAddress, "ReviewProcessor: Only Oracle can update transaction hash");
+        require(
+            reviewIds.length == submitHashes.length && reviewIds.length == approveHashes.length,
+            "ReviewProcessor: Array length mismatch"
+        );
+        
+        for (uint256 i = 0; i < reviewIds.length; i++) {
+            if (_reviews[reviewIds[i]].user == address(0)) {
+                continue;
+            }
+            _updateReviewTxHashes(reviewIds[i], submitHashes[i], approveHashes[i]);
+        }
+    }
+    
+    /**
+     * @dev Internal function: Update transaction hashes, leaving zero hashes untouched
+     * @param reviewId Review ID
+     * @param submitHash Transaction hash of user's review submission
+     * @param approveHash Transaction hash of AI review status change
+     */
+    function _updateReviewTxHashes(uint256 reviewId, bytes32 submitHash, bytes32 approveHash) internal {
         IScenicReviewCore.Review storage review = _reviews[reviewId];
-        require(review.user != address(0), "ReviewProcessor: Review does not exist");
         
         // Update transaction hashes
         if (submitHash != bytes32(0)) {
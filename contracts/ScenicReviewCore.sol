@@ -108,6 +108,16 @@ contract ScenicReviewCore is Ownable, ReentrancyGuard, IScenicReviewCore {
         IReviewProcessor(reviewProcessorAddr).updateReviewStatus(reviewId, isApproved);
     }
     
+    /**
+     * @dev Update status for multiple reviews in one transaction
+     * @param reviewIds Review ID list
+     * @param approvals Approval result for each review
+     */
+    function updateReviewStatusBatch(uint256[] calldata reviewIds, bool[] calldata approvals) external nonReentrant {
+        require(msg.sender == oracleAddress || msg.sender == owner(), "ScenicReviewCore: Only Oracle or owner can update review status");
+        IReviewProcessor(reviewProcessorAddr).updateReviewStatusBatch(reviewIds, approvals);
+    }
+    
     /**
      * @dev Oracle uploads AI summary
      * @param scenicId Scenic spot ID
@@ -148,6 +158,21 @@ contract ScenicReviewCore is Ownable, ReentrancyGuard, IScenicReviewCore {
         IReviewProcessor(reviewProcessorAddr).updateReviewTxHashes(reviewId, submitHash, approveHash);
     }
     
+    /**
+     * @dev Update transaction hashes for multiple reviews in one transaction (Oracle only)
+     * @param reviewIds Review ID list
+     * @param submitHashes Transaction hashes of user's review submissions
+     * @param approveHashes Transaction hashes of AI review status changes
+     */
+    function updateReviewTxHashesBatch(
+        uint256[] calldata reviewIds,
+        bytes32[] calldata submitHashes,
+        bytes32[] calldata approveHashes
+    ) external {
+        require(msg.sender == oracleAddress, "ScenicReviewCore: Only Oracle can update transaction hash");
+        IReviewProcessor(reviewProcessorAddr).updateReviewTxHashesBatch(reviewIds, submitHashes, approveHashes);
+    }
+    
     /**
      * @dev Update transaction hash for summary (Oracle only)
      * @param scenicId Scenic spot ID
@@ -29,6 +29,13 @@ interface IReviewProcessor {
      */
     function updateReviewStatus(uint256 reviewId, bool isApproved) external;
     
+    /**
+     * @dev Update status for multiple reviews in one transaction
+     * @param reviewIds Review ID list
+     * @param approvals Approval result for each review
+     */
+    function updateReviewStatusBatch(uint256[] calldata reviewIds, bool[] calldata approvals) external;
+    
     /**
      * @dev Distribute reward for review
      * @param reviewId Review ID
@@ -89,6 +96,14 @@ interface IReviewProcessor {
      */
     function updateReviewTxHashes(uint256 reviewId, bytes32 submitHash, bytes32 approveHash) external;
     
+    /**
+     * @dev Update transaction hashes for multiple reviews in one transaction
+     * @param reviewIds Review ID list
+     * @param submitHashes Transaction hashes of user's review submissions
+     * @param approveHashes Transaction hashes of AI review status changes
+     */
+    function updateReviewTxHashesBatch(uint256[] calldata reviewIds, bytes32[] calldata submitHashes, bytes32[] calldata approveHashes) external;
+    
     /**
      * @dev Get next review ID
      * @return uint256 Next review ID
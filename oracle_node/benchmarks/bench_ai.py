@@ -0,0 +1,62 @@
+import asyncio
+import json
+import time
+from benchmarks.harness import benchmark
+from benchmarks.mock_servers import MockAiServer
+from src.volc_engine_ai import AiRequest, AiRequestMessage, AiResponse, VolcEngineAI
+
+SUMMARY_INPUT = "ScenicSpotName:West Lake,top20reviews: " + ";".join(
+    f"content: The view from the summit was breathtaking and the staff were friendly {i},EvaluationScore: {i % 5 + 1}"
+    for i in range(40)
+)
+
+RESPONSE_BODY = json.dumps({
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 1_700_000_000, "model": "doubao-pro",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "A detailed summary. " * 60}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1200, "completion_tokens": 300, "total_tokens": 1500}
+})
+
+
+@benchmark("ai.request_serialize", operations=20000)
+async def bench_request_serialize(operations: int) -> float:
+    messages = [AiRequestMessage("system", "You are a professional tourist attraction review summary expert."),
+                AiRequestMessage("user", SUMMARY_INPUT)]
+    start = time.perf_counter()
+    for _ in range(operations):
+        json.dumps(AiRequest("doubao-pro", messages, temperature=0.7, max_tokens=2000).to_dict())
+    return time.perf_counter() - start
+
+
+@benchmark("ai.response_parse", operations=20000)
+async def bench_response_parse(operations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(operations):
+        AiResponse.from_dict(json.loads(RESPONSE_BODY)).content
+    return time.perf_counter() - start
+
+
+@benchmark("ai.audit_mock_server", operations=300)
+async def bench_audit_mock_server(operations: int) -> float:
+    """End-to-end audits through httpx against a local endpoint, 16 in flight"""
+    server = MockAiServer()
+    await server.start()
+    volc_ai = VolcEngineAI("bench-key", api_url=server.url)
+    semaphore = asyncio.Semaphore(16)
+
+    async def audit(i: int):
+        async with semaphore:
+            return await volc_ai.audit_review_content(
+                {"ScenicSpotName": "West Lake", "EvaluationScore": 5, "content": f"Lovely place, would visit again {i}"},
+                "doubao-lite"
+            )
+
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(audit(i) for i in range(operations)))
+        elapsed = time.perf_counter() - start
+        if not all(results):
+            raise RuntimeError("Mock audits were not all approved")
+        return elapsed
+    finally:
+        await volc_ai.close()
+        await server.stop()
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import time
+from benchmarks.harness import benchmark
+from src.db_manager import DatabaseManager
+
+EVENT_DATA = json.dumps({"reviewId": 1, "scenicSpotId": 7, "user": "0x" + "ab" * 20, "transaction_hash": "0x" + "cd" * 32})
+
+
+class TemporaryDatabase:
+    """Fresh on-disk database (WAL needs a real file) removed on exit"""
+    async def __aenter__(self) -> DatabaseManager:
+        self.directory = tempfile.TemporaryDirectory(prefix="oracle-bench-")
+        self.db_manager = DatabaseManager(os.path.join(self.directory.name, "bench.db"))
+        if not await self.db_manager.connect():
+            raise RuntimeError("Failed to open benchmark database")
+        return self.db_manager
+
+    async def __aexit__(self, *exc_info):
+        await self.db_manager.close()
+        self.directory.cleanup()
+
+
+@benchmark("db.mark_event_as_processed", operations=1000)
+async def bench_mark_event_as_processed(operations: int) -> float:
+    async with TemporaryDatabase() as db_manager:
+        start = time.perf_counter()
+        for i in range(operations):
+            await db_manager.mark_event_as_processed(
+                f"ReviewSubmitted_{i:064x}_0", "ReviewSubmitted", f"{i:064x}", i, EVENT_DATA, "success"
+            )
+        return time.perf_counter() - start
+
+
+@benchmark("db.enqueue_job", operations=1000)
+async def bench_enqueue_job(operations: int) -> float:
+    async with TemporaryDatabase() as db_manager:
+        start = time.perf_counter()
+        for i in range(operations):
+            await db_manager.enqueue_job(f"ReviewSubmitted_{i:064x}_0", "ReviewSubmitted", f"{i:064x}", i, 0, EVENT_DATA)
+        return time.perf_counter() - start
+
+
+@benchmark("db.is_event_processed", operations=5000)
+async def bench_is_event_processed(operations: int) -> float:
+    async with TemporaryDatabase() as db_manager:
+        rows = 1000
+        for i in range(rows):
+            await db_manager.mark_event_as_processed(
+                f"ReviewSubmitted_{i:064x}_0", "ReviewSubmitted", f"{i:064x}", i, EVENT_DATA, "success"
+            )
+        start = time.perf_counter()
+        for i in range(operations):
+            # Every other lookup misses, as for a newly seen event
+            await db_manager.is_event_processed(f"ReviewSubmitted_{(i * 2) % (rows * 2):064x}_0")
+        return time.perf_counter() - start
@@ -0,0 +1,76 @@
+import time
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from benchmarks.contract_abi import EVENTS_ABI
+from benchmarks.harness import benchmark
+from src.config import Config
+from src.event_listener import EventListener
+
+CONTRACT_ADDRESS = Web3.to_checksum_address("0x" + "12" * 20)
+USER_ADDRESS = Web3.to_checksum_address("0x" + "ab" * 20)
+
+
+class CollectingJobPool:
+    """Stands in for JobWorkerPool so only decoding and job construction are measured"""
+    def __init__(self):
+        self.jobs = []
+
+    async def enqueue(self, **job):
+        self.jobs.append(job)
+
+
+def _word(value) -> HexBytes:
+    return HexBytes(encode(["uint256"], [value]))
+
+
+def raw_log(event_abi: dict, index: int, topics: list, data: bytes = b"") -> AttributeDict:
+    """A log as eth_getLogs / a log subscription returns it"""
+    return AttributeDict({
+        "address": CONTRACT_ADDRESS,
+        "blockHash": HexBytes(index.to_bytes(32, "big")),
+        "blockNumber": 1_000_000 + index,
+        "data": HexBytes(data),
+        "logIndex": index % 8,
+        "removed": False,
+        "topics": [HexBytes(event_abi_to_log_topic(event_abi))] + topics,
+        "transactionHash": HexBytes((index + 1).to_bytes(32, "big")),
+        "transactionIndex": 0,
+    })
+
+
+def make_listener():
+    listener = EventListener(Config(), None, CollectingJobPool())
+    listener.contract = Web3().eth.contract(address=CONTRACT_ADDRESS, abi=EVENTS_ABI)
+    return listener
+
+
+@benchmark("events.decode_review_submitted", operations=5000)
+async def bench_decode_review_submitted(operations: int) -> float:
+    listener = make_listener()
+    event = listener.contract.events.ReviewSubmitted
+    logs = [
+        raw_log(event.abi, i, [_word(i), HexBytes(encode(["address"], [USER_ADDRESS])), _word(i % 50)])
+        for i in range(operations)
+    ]
+    start = time.perf_counter()
+    for log in logs:
+        # Decode, then build the event_id and job payload as the listener does
+        await listener._handle_review_submitted(event().process_log(log))
+    return time.perf_counter() - start
+
+
+@benchmark("events.decode_summary_update_required", operations=5000)
+async def bench_decode_summary_update_required(operations: int) -> float:
+    listener = make_listener()
+    event = listener.contract.events.SummaryUpdateRequired
+    logs = [
+        raw_log(event.abi, i, [_word(i % 50)], encode(["uint256", "uint256", "uint256"], [i, i + 20, i + 20]))
+        for i in range(operations)
+    ]
+    start = time.perf_counter()
+    for log in logs:
+        await listener._handle_summary_update_required(event().process_log(log))
+    return time.perf_counter() - start
@@ -0,0 +1,40 @@
+import json
+import random
+import time
+from benchmarks.harness import benchmark
+from src.config import Config
+from src.summary_input_builder import SummaryInputBuilder
+
+PHRASES = [
+    "The view from the summit was breathtaking", "queues at the entrance were long", "staff were friendly and helpful",
+    "tickets are a bit expensive", "great for families with children", "the cable car saves a lot of walking",
+    "food stalls near the gate are overpriced", "visit early in the morning to avoid crowds", "signs are clear",
+    "山顶的风景非常美", "排队时间太长了", "工作人员很热情",
+]
+
+
+def make_reviews(count: int, seed: int = 7):
+    """Review tuples as getReviewsForSummary returns them, with some near-duplicates"""
+    rng = random.Random(seed)
+    reviews = []
+    for i in range(count):
+        if reviews and rng.random() < 0.1:
+            text = json.loads(reviews[rng.randrange(len(reviews))][2])["content"]  # Copy-pasted review
+        else:
+            text = ", ".join(rng.choice(PHRASES) for _ in range(rng.randint(3, 12))) + "."
+        reviews.append((
+            "0x" + "ab" * 20, 7, json.dumps({"content": text}, ensure_ascii=False), rng.randint(1, 5),
+            1, False, 0, 1_700_000_000 + i * 60, b"\x00" * 32, b"\x00" * 32
+        ))
+    return reviews, list(range(1, count + 1))
+
+
+@benchmark("summary.build_input_100_reviews", operations=200)
+async def bench_build_input(operations: int) -> float:
+    config = Config()
+    builder = SummaryInputBuilder(config.summary_input_token_budget, config.summary_dedup_similarity)
+    reviews, review_ids = make_reviews(100)
+    start = time.perf_counter()
+    for _ in range(operations):
+        builder.build("West Lake", reviews, review_ids)
+    return time.perf_counter() - start
@@ -0,0 +1,91 @@
+# ScenicReviewSystem ABI subset the oracle node uses, written from contracts/*.sol. The compiled ABI
+# (ABI_PATH) is not in the repository; benchmarks and the load test run against these fragments instead.
+
+SCENIC_SPOT_COMPONENTS = [
+    {"name": "scenicId", "type": "uint256"},
+    {"name": "name", "type": "string"},
+    {"name": "location", "type": "string"},
+    {"name": "description", "type": "string"},
+    {"name": "tags", "type": "string"},
+    {"name": "reviewCount", "type": "uint256"},
+    {"name": "averageRating", "type": "uint256"},
+    {"name": "active", "type": "bool"},
+]
+
+REVIEW_COMPONENTS = [
+    {"name": "user", "type": "address"},
+    {"name": "scenicId", "type": "uint256"},
+    {"name": "content", "type": "string"},
+    {"name": "rating", "type": "uint256"},
+    {"name": "status", "type": "uint8"},
+    {"name": "rewarded", "type": "bool"},
+    {"name": "rewardAmount", "type": "uint256"},
+    {"name": "timestamp", "type": "uint256"},
+    {"name": "submitTxHash", "type": "bytes32"},
+    {"name": "approveTxHash", "type": "bytes32"},
+]
+
+SUMMARY_COMPONENTS = [
+    {"name": "scenicId", "type": "uint256"},
+    {"name": "content", "type": "string"},
+    {"name": "reviewIds", "type": "uint256[]"},
+    {"name": "timestamp", "type": "uint256"},
+    {"name": "lastReviewIndex", "type": "uint256"},
+    {"name": "version", "type": "uint256"},
+    {"name": "txHash", "type": "bytes32"},
+]
+
+
+def _function(name, inputs, outputs=(), mutability="nonpayable"):
+    return {
+        "type": "function", "name": name, "stateMutability": mutability,
+        "inputs": [{"name": arg, "type": arg_type} for arg, arg_type in inputs],
+        "outputs": list(outputs),
+    }
+
+
+def _event(name, inputs):
+    return {
+        "type": "event", "name": name, "anonymous": False,
+        "inputs": [{"name": arg, "type": arg_type, "indexed": indexed} for arg, arg_type, indexed in inputs],
+    }
+
+
+EVENTS_ABI = [
+    _event("ReviewSubmitted", [("reviewId", "uint256", True), ("user", "address", True), ("scenicId", "uint256", True)]),
+    _event("ReviewApproved", [("reviewId", "uint256", True), ("approved", "bool", False)]),
+    _event("SummaryGenerated", [
+        ("scenicId", "uint256", True), ("reviewIdsCount", "uint256", False), ("timestamp", "uint256", False),
+        ("version", "uint256", False), ("txHash", "bytes32", False),
+    ]),
+    _event("SummaryUpdateRequired", [
+        ("scenicId", "uint256", True), ("fromReviewIndex", "uint256", False), ("toReviewIndex", "uint256", False),
+        ("currentLastReviewIndex", "uint256", False),
+    ]),
+]
+
+FUNCTIONS_ABI = [
+    _function("oracleAddress", [], [{"name": "", "type": "address"}], "view"),
+    # Public mapping getter - the struct comes back as flat values
+    _function("reviews", [("reviewId", "uint256")], [dict(item) for item in REVIEW_COMPONENTS], "view"),
+    _function("getScenicSpot", [("scenicId", "uint256")], [
+        {"name": "scenicSpot", "type": "tuple", "components": SCENIC_SPOT_COMPONENTS},
+        {"name": "latestSummary", "type": "tuple", "components": SUMMARY_COMPONENTS},
+    ], "view"),
+    _function("getReviewsForSummary", [("scenicId", "uint256"), ("count", "uint256")], [
+        {"name": "", "type": "tuple[]", "components": REVIEW_COMPONENTS},
+        {"name": "", "type": "uint256[]"},
+    ], "view"),
+    _function("updateReviewStatus", [("reviewId", "uint256"), ("isApproved", "bool")]),
+    _function("updateReviewStatusBatch", [("reviewIds", "uint256[]"), ("approvals", "bool[]")]),
+    _function("updateReviewTxHashes", [("reviewId", "uint256"), ("submitHash", "bytes32"), ("approveHash", "bytes32")]),
+    _function("updateReviewTxHashesBatch", [
+        ("reviewIds", "uint256[]"), ("submitHashes", "bytes32[]"), ("approveHashes", "bytes32[]"),
+    ]),
+    _function("uploadSummary", [
+        ("scenicId", "uint256"), ("content", "string"), ("reviewIds", "uint256[]"), ("lastReviewIndex", "uint256"),
+    ]),
+    _function("updateSummaryTxHash", [("scenicId", "uint256"), ("hash", "bytes32")]),
+]
+
+SCENIC_REVIEW_SYSTEM_ABI = FUNCTIONS_ABI + EVENTS_ABI
@@ -0,0 +1,95 @@
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# name => (operations per run, async function(operations) returning the seconds its measured loop took)
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, operations: int):
+    """Register an async benchmark - it does its own setup and times only the loop under test"""
+    def register(func: Callable[[int], Awaitable[float]]):
+        BENCHMARKS[name] = (operations, func)
+        return func
+    return register
+
+
+class BenchmarkResult:
+    """Throughput of one benchmark over several runs"""
+    def __init__(self, name: str, operations: int, durations: List[float]):
+        self.name = name
+        self.operations = operations
+        self.durations = durations
+
+    @property
+    def best(self) -> float:
+        """Operations per second of the fastest run - the least noisy estimate of what the code can do"""
+        return self.operations / min(self.durations)
+
+    @property
+    def median(self) -> float:
+        return self.operations / statistics.median(self.durations)
+
+
+async def run_benchmark(name: str, repeat: int, scale: float = 1.0) -> BenchmarkResult:
+    operations, func = BENCHMARKS[name]
+    operations = max(1, int(operations * scale))
+    await func(max(1, operations // 10))  # Warm up caches, connections and lazy imports
+    durations = [await func(operations) for _ in range(repeat)]
+    return BenchmarkResult(name, operations, durations)
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "processor": platform.processor() or "unknown",
+    }
+
+
+def load_baselines(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"results": {}}
+
+
+def save_baselines(path: str, baselines: dict, results: List[BenchmarkResult]):
+    """Record the results as the new baselines, keeping entries for benchmarks that were not run"""
+    baselines.setdefault("results", {}).update({result.name: round(result.best, 1) for result in results})
+    baselines["environment"] = environment()
+    baselines["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results: List[BenchmarkResult], baselines: dict, tolerance: float) -> List[str]:
+    """Print a results table and return the names of benchmarks slower than baseline * (1 - tolerance)"""
+    recorded = baselines.get("results", {})
+    if recorded and baselines.get("environment") != environment():
+        print(f"Note: baselines were recorded on {baselines.get('environment')}, this is {environment()}",
+              file=sys.stderr)
+
+    regressions = []
+    width = max([len("benchmark")] + [len(result.name) for result in results])
+    print(f"{'benchmark':<{width}}  {'best ops/s':>12}  {'median ops/s':>12}  {'baseline':>12}  {'change':>8}  status")
+    for result in results:
+        baseline: Optional[float] = recorded.get(result.name)
+        if baseline:
+            change = result.best / baseline - 1
+            status = "ok"
+            if change < -tolerance:
+                status = "REGRESSION"
+                regressions.append(result.name)
+            elif change > tolerance:
+                status = "faster"
+            baseline_text, change_text = f"{baseline:>12.1f}", f"{change:>+8.1%}"
+        else:
+            status, baseline_text, change_text = "new", f"{'-':>12}", f"{'-':>8}"
+        print(f"{result.name:<{width}}  {result.best:>12.1f}  {result.median:>12.1f}  {baseline_text}  {change_text}  {status}")
+    return regressions
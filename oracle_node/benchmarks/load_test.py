@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from eth_account import Account
+from web3 import Web3
+from benchmarks.contract_abi import SCENIC_REVIEW_SYSTEM_ABI
+from benchmarks.mock_servers import MockAiServer, MockChain, MockServerThread
+
+CONTRACT_ADDRESS = Web3.to_checksum_address("0x" + "5c" * 20)
+PHRASES = [
+    "The view from the summit was breathtaking", "queues at the entrance were long", "staff were friendly",
+    "tickets are a bit expensive", "great for families with children", "the cable car saves a lot of walking",
+    "visit early in the morning to avoid crowds", "山顶的风景非常美", "排队时间太长了",
+]
+
+
+def configure_environment(args, workdir: str, chain: MockChain, ai: MockAiServer, oracle_key: str):
+    """Point the node at the mocks - set before the node loads its Config"""
+    abi_path = os.path.join(workdir, "ScenicReviewSystem.json")
+    with open(abi_path, "w", encoding="utf-8") as f:
+        json.dump(SCENIC_REVIEW_SYSTEM_ABI, f)
+    os.environ.update({
+        "RPC_URL": chain.url,
+        "RPC_URLS": chain.url,
+        "WEBSOCKET_URL": "",
+        "LISTENER_MODE": "polling",
+        "CHAIN_ID": str(chain.chain_id),
+        "ORACLE_PRIVATE_KEY": oracle_key,
+        "SCENIC_REVIEW_SYSTEM_ADDRESS": CONTRACT_ADDRESS,
+        "ABI_PATH": abi_path,
+        "DB_PATH": os.path.join(workdir, "oracle.db"),
+        "LOG_FILE": os.path.join(workdir, "oracle.log"),
+        "VOLC_AI_API_KEY": "load-test",
+        "VOLC_AI_API_URL": ai.url,
+        "AUDIT_ENDPOINTS": "",
+        "SUMMARY_ENDPOINTS": "",
+        "AUDIT_MODEL_ID": "mock-audit",
+        "SUMMARY_MODEL_ID": "mock-summary",
+    })
+    # Node tuning a load test usually wants - anything already in the environment wins over these and .env
+    for key, value in {
+        "LOG_LEVEL": "WARNING",
+        "METRICS_ENABLED": "false",
+        "POLL_INITIAL_INTERVAL": str(args.block_time),
+        "POLL_MIN_INTERVAL": str(min(0.5, args.block_time / 2)),
+        "SUMMARY_MIN_INTERVAL_SECONDS": "0",
+    }.items():
+        os.environ.setdefault(key, value)
+
+
+async def generate_traffic(mocks: MockServerThread, chain: MockChain, args):
+    """Submit reviews at a steady rate across scenic spots; summaries follow from the approvals"""
+    rng = random.Random(args.seed)
+    users = [Account.create().address for _ in range(50)]
+    interval = 1.0 / args.rate
+    started = time.monotonic()
+    next_at = started
+    while next_at < started + args.duration:
+        content = ", ".join(rng.choice(PHRASES) for _ in range(rng.randint(2, 8)))
+        await mocks.call(chain.submit_review, rng.randint(1, args.scenic_spots), content, rng.randint(1, 10), rng.choice(users))
+        next_at += interval
+        await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+
+async def drain(mocks: MockServerThread, chain: MockChain, timeout: float):
+    """Wait until every submitted review and summary request has been settled on the mock chain"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not await mocks.call(chain.unsettled):
+            return True
+        await asyncio.sleep(0.5)
+    return False
+
+
+def report(chain: MockChain, ai: MockAiServer, args, traffic_started: float):
+    from src.cli import percentile
+
+    def latency_line(label, pairs):
+        done = sorted(settled - mined for mined, settled in pairs if mined is not None and settled is not None)
+        if not done:
+            return f"{label}: 0/{len(pairs)} settled"
+        return (f"{label}: {len(done)}/{len(pairs)} settled, latency p50={percentile(done, 0.5):.2f}s "
+                f"p95={percentile(done, 0.95):.2f}s p99={percentile(done, 0.99):.2f}s max={done[-1]:.2f}s")
+
+    reviews = list(chain.review_latency.values())
+    settled_at = [settled for _, settled in reviews if settled is not None]
+    print(f"Load: {len(chain.reviews)} reviews over {args.duration:g}s ({args.rate:g}/s) across {args.scenic_spots} "
+          f"scenic spots, block time {args.block_time:g}s, RPC latency {args.rpc_latency * 1000:g}ms "
+          f"({args.rpc_error_rate:.0%} errors, {args.revert_rate:.0%} reverts), AI latency {args.ai_latency * 1000:g}ms")
+    if settled_at:
+        elapsed = max(settled_at) - traffic_started
+        print(f"Throughput: {len(settled_at) / elapsed * 60:.1f} reviews/min settled "
+              f"({len(chain.reviews) / args.duration * 60:.1f}/min offered)")
+    print(latency_line("Reviews (submitted block -> status update block)", reviews))
+    print(latency_line("Summaries (SummaryUpdateRequired block -> uploadSummary block)",
+                       [(request[2], request[3]) for request in chain.summary_latency]))
+    print(f"Oracle transactions: {dict(chain.transactions.most_common())}")
+    print(f"RPC requests: {chain.requests} ({chain.injected_errors} injected errors), "
+          f"by method: {dict(chain.calls.most_common())}")
+    print(f"AI requests: {ai.requests} ({ai.injected_errors} injected errors)")
+
+
+async def run(args):
+    workdir_context = tempfile.TemporaryDirectory(prefix="oracle-load-") if not args.workdir else None
+    workdir = args.workdir or workdir_context.name
+    os.makedirs(workdir, exist_ok=True)
+
+    oracle = Account.create()
+    chain = MockChain(
+        CONTRACT_ADDRESS, oracle.address, block_time=args.block_time, summary_every=args.summary_every,
+        revert_rate=args.revert_rate, seed=args.seed, latency=args.rpc_latency, error_rate=args.rpc_error_rate
+    )
+    ai = MockAiServer(latency=args.ai_latency, error_rate=args.ai_error_rate, reject_rate=args.reject_rate, seed=args.seed)
+    mocks = MockServerThread()
+    mocks.start()
+    await mocks.run(chain.start())
+    await mocks.run(ai.start())
+    configure_environment(args, workdir, chain, ai, oracle.key.hex())
+
+    from src.main import OracleNode
+    node = OracleNode(workers=args.workers)
+    node_task = None
+    settled = False
+    try:
+        if not await node.initialize():
+            print(f"Oracle node failed to initialize, see {os.environ['LOG_FILE']}")
+            return 1
+        node_task = asyncio.create_task(node.start())
+
+        traffic_started = time.monotonic()
+        await generate_traffic(mocks, chain, args)
+        settled = await drain(mocks, chain, args.drain_timeout)
+    finally:
+        await node.stop()
+        if node_task:
+            await asyncio.wait([node_task], timeout=30)
+        await mocks.run(ai.stop())
+        await mocks.run(chain.stop())
+        mocks.stop()
+
+    # The mocks are stopped, so their state can be read from this thread
+    if not settled:
+        print(f"Not everything settled within {args.drain_timeout:g}s after the load stopped")
+    report(chain, ai, args, traffic_started)
+    if workdir_context:
+        workdir_context.cleanup()
+    else:
+        print(f"Node database and logs kept in {workdir} (DB_PATH={os.environ['DB_PATH']} python src/cli.py stages)")
+    return 0 if settled else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run a full oracle node against a local mock chain and AI server under synthetic review traffic"
+    )
+    parser.add_argument("--rate", type=float, default=5, help="Reviews submitted per second (default: 5)")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of traffic (default: 60)")
+    parser.add_argument("--scenic-spots", type=int, default=10, help="Scenic spots the reviews are spread over (default: 10)")
+    parser.add_argument("--summary-every", type=int, default=5,
+                        help="Approved reviews per scenic spot that trigger SummaryUpdateRequired (default: 5)")
+    parser.add_argument("--block-time", type=float, default=2.0, help="Seconds between mock blocks (default: 2)")
+    parser.add_argument("--rpc-latency", type=float, default=0.02, help="Seconds added to every RPC response (default: 0.02)")
+    parser.add_argument("--rpc-error-rate", type=float, default=0.0, help="Fraction of RPC requests failing with HTTP 503")
+    parser.add_argument("--revert-rate", type=float, default=0.0, help="Fraction of oracle transactions that revert")
+    parser.add_argument("--ai-latency", type=float, default=0.5, help="Seconds per AI completion (default: 0.5)")
+    parser.add_argument("--ai-error-rate", type=float, default=0.0, help="Fraction of AI requests failing with HTTP 503")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="Fraction of audits the mock AI rejects")
+    parser.add_argument("--workers", type=int, default=1, help="Node worker processes, as in src/main.py --workers")
+    parser.add_argument("--drain-timeout", type=float, default=120, help="Seconds to wait for the backlog after the load stops")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for traffic and injected failures")
+    parser.add_argument("--workdir", help="Keep the node database and logs here instead of a temporary directory")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(build_parser().parse_args())))
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Per-call info logs would be measured too, and drown the results (Config sets up logging from the environment)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "oracle-benchmarks.log"))
+
+from benchmarks import bench_ai, bench_db, bench_events, bench_summary  # noqa: F401 - registers the benchmarks
+from benchmarks.harness import BENCHMARKS, compare, load_baselines, run_benchmark, save_baselines
+
+DEFAULT_BASELINES = str(Path(__file__).parent / "baselines.json")
+
+
+async def run(args):
+    names = [name for name in BENCHMARKS if not args.filter or any(pattern in name for pattern in args.filter)]
+    if not names:
+        print(f"No benchmark matches {args.filter}; available: {', '.join(BENCHMARKS)}")
+        return 2
+
+    results = []
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        results.append(await run_benchmark(name, args.repeat, args.scale))
+
+    baselines = load_baselines(args.baselines)
+    regressions = compare(results, baselines, args.tolerance)
+    if args.save:
+        save_baselines(args.baselines, baselines, results)
+        print(f"Saved baselines to {args.baselines}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Oracle node micro-benchmarks (offline, against local mocks)")
+    parser.add_argument("filter", nargs="*", help="Only benchmarks whose name contains one of these, e.g. db. ai.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark; the fastest counts (default: 5)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply each benchmark's operation count")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Fail when throughput drops by more than this fraction of the baseline (default: 0.25)")
+    parser.add_argument("--baselines", default=DEFAULT_BASELINES, help="Baselines file (default: benchmarks/baselines.json)")
+    parser.add_argument("--save", action="store_true", help="Record this run as the new baselines")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(build_parser().parse_args())))
@@ -0,0 +1,58 @@
+import random
+import time
+from typing import Optional
+
+
+class AdaptivePoller:
+    """Pick the next poll delay from the observed block interval, backlog and RPC health"""
+    def __init__(self, initial_interval: float = 5.0, min_delay: float = 0.5, max_delay: float = 30.0,
+                 alpha: float = 0.2):
+        self.block_interval = initial_interval  # EWMA of seconds per block
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.alpha = alpha
+        self.last_block: Optional[int] = None
+        self.last_block_at: Optional[float] = None
+        self.errors = 0  # Consecutive RPC errors
+        self.empty_polls = 0  # Consecutive polls that found no new block
+
+    def observe_block(self, block_number: int, now: Optional[float] = None):
+        """Record the chain head seen by a poll"""
+        now = time.monotonic() if now is None else now
+        self.errors = 0
+        if self.last_block is None:
+            self.last_block, self.last_block_at = block_number, now
+            return
+        if block_number <= self.last_block:
+            self.empty_polls += 1
+            return
+
+        interval = (now - self.last_block_at) / (block_number - self.last_block)
+        # A long gap in polling (backlog, errors) says nothing about block time - cap the sample
+        interval = min(interval, self.max_delay)
+        self.block_interval = self.alpha * interval + (1 - self.alpha) * self.block_interval
+        self.last_block, self.last_block_at = block_number, now
+        self.empty_polls = 0
+
+    def observe_error(self):
+        self.errors += 1
+
+    def next_delay(self, backlog: bool = False, now: Optional[float] = None) -> float:
+        """Seconds to sleep before the next poll"""
+        if self.errors:
+            # Exponential backoff with jitter while the RPC endpoint is failing
+            delay = min(self.max_delay, self.min_delay * 2 ** self.errors)
+            return delay / 2 + random.uniform(0, delay / 2)
+        if backlog:
+            return 0.0  # Catching up - query the next range straight away
+
+        now = time.monotonic() if now is None else now
+        if self.last_block_at is None:
+            return self.block_interval
+        # Poll just after the next block is expected, with a little slack for propagation
+        expected_at = self.last_block_at + self.block_interval * (1 + self.empty_polls) + 0.1 * self.block_interval
+        delay = expected_at - now
+        if self.empty_polls:
+            # The block is late - back off gradually instead of hammering the endpoint
+            delay = max(delay, self.block_interval * 0.5 * self.empty_polls)
+        return max(self.min_delay, min(self.max_delay, delay))
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AiEndpoint:
+    """AI endpoint (API URL + model) with latency and error statistics"""
+    def __init__(self, api_url: str, model_id: str, alpha: float = 0.2, window: int = 100):
+        self.api_url = api_url
+        self.model_id = model_id
+        self.alpha = alpha
+        self.ewma_latency: Optional[float] = None
+        self.ewma_error_rate = 0.0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+
+    @property
+    def name(self) -> str:
+        return f"{self.api_url}|{self.model_id}"
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+        self.ewma_error_rate = (1 - self.alpha) * self.ewma_error_rate
+
+    def record_error(self, latency: float):
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        self.ewma_error_rate = self.alpha + (1 - self.alpha) * self.ewma_error_rate
+
+    def record_cancelled(self, latency: float):
+        """A cancelled hedge loser took at least this long - only ever raises the estimate"""
+        if self.ewma_latency is None or latency > self.ewma_latency:
+            previous = latency if self.ewma_latency is None else self.ewma_latency
+            self.ewma_latency = self.alpha * latency + (1 - self.alpha) * previous
+
+    def score(self, default_latency: float) -> float:
+        """Lower is better - expected latency inflated by recent errors and current load"""
+        latency = default_latency if self.ewma_latency is None else self.ewma_latency
+        return latency * (1 + 4 * self.ewma_error_rate) * (1 + 0.1 * self.in_flight)
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        if len(self.latencies) < 10:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class AiRouter:
+    """Route AI requests to the best endpoint, optionally hedging slow requests"""
+    def __init__(self, task: str, endpoints: List[Tuple[str, str]], alpha: float = 0.2,
+                 hedge_enabled: bool = False, hedge_quantile: float = 0.95,
+                 hedge_min_delay: float = 0.2, hedge_default_delay: float = 2.0):
+        if not endpoints:
+            raise ValueError(f"At least one endpoint is required for AI task '{task}'")
+        self.task = task
+        self.endpoints = [AiEndpoint(api_url, model_id, alpha) for api_url, model_id in endpoints]
+        self.hedge_enabled = hedge_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+
+    def ranked(self) -> List[AiEndpoint]:
+        # Unmeasured endpoints start at the mean of the measured ones (the default hedge delay before any
+        # data), so a burst is spread by load instead of all landing on an endpoint without data
+        measured = [endpoint.ewma_latency for endpoint in self.endpoints if endpoint.ewma_latency is not None]
+        default_latency = sum(measured) / len(measured) if measured else self.hedge_default_delay
+        return sorted(self.endpoints, key=lambda endpoint: endpoint.score(default_latency))
+
+    def hedge_delay(self, endpoint: AiEndpoint) -> float:
+        delay = endpoint.latency_quantile(self.hedge_quantile)
+        if delay is None:
+            delay = self.hedge_default_delay
+        return max(delay, self.hedge_min_delay)
+
+    async def call(self, send: Callable[[AiEndpoint], Awaitable[Any]]) -> Any:
+        """Run send(endpoint) on the best endpoint, hedging or failing over to the next best"""
+        ranked = self.ranked()
+        primary = ranked[0]
+        backup = ranked[1] if len(ranked) > 1 else None
+
+        primary_task = self._launch(primary, send)
+        pending = {primary_task}
+        backup_started = False
+
+        try:
+            if self.hedge_enabled and backup is not None:
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay(primary))
+                if not done:
+                    logger.info("Hedging %s request: %s slower than %.2fs, firing %s", self.task, primary.name, self.hedge_delay(primary), backup.name)
+                    pending.add(self._launch(backup, send))
+                    backup_started = True
+
+            last_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+                # Fail over once to the next best endpoint when nothing else is in flight
+                if not pending and backup is not None and not backup_started:
+                    logger.warning(f"{self.task} request failed on {primary.name}, failing over to {backup.name}: {last_error}")
+                    pending.add(self._launch(backup, send))
+                    backup_started = True
+
+            raise last_error
+        finally:
+            # Cancel the losing request
+            for task in pending:
+                task.cancel()
+
+    def _launch(self, endpoint: AiEndpoint, send: Callable[[AiEndpoint], Awaitable[Any]]) -> asyncio.Task:
+        # Count the request as in flight before its task runs, so requests ranked in the same burst see the load
+        endpoint.in_flight += 1
+        task = asyncio.create_task(self._timed(endpoint, send))
+
+        def finished(_):
+            endpoint.in_flight -= 1
+        task.add_done_callback(finished)
+        return task
+
+    async def _timed(self, endpoint: AiEndpoint, send: Callable[[AiEndpoint], Awaitable[Any]]) -> Any:
+        start = time.monotonic()
+        try:
+            result = await send(endpoint)
+            endpoint.record_success(time.monotonic() - start)
+            return result
+        except asyncio.CancelledError:
+            endpoint.record_cancelled(time.monotonic() - start)
+            raise
+        except Exception:
+            endpoint.record_error(time.monotonic() - start)
+            raise
+
+    def snapshot(self) -> List[dict]:
+        return [
+            {
+                "endpoint": endpoint.name,
+                "ewma_latency": endpoint.ewma_latency,
+                "ewma_error_rate": endpoint.ewma_error_rate,
+                "p95_latency": endpoint.latency_quantile(0.95),
+                "in_flight": endpoint.in_flight
+            }
+            for endpoint in self.endpoints
+        ]
@@ -1,27 +1,72 @@
+import asyncio
 import logging
 import json
+import hashlib
 from src.config import Config
 from src.web3_manager import Web3Manager
 from src.db_manager import DatabaseManager
-from src.volc_engine_ai import VolcEngineAI
+from src.volc_engine_ai import VolcEngineAI, SUMMARY_PROMPT_VERSION
+from src.ai_router import AiRouter
+from src.summary_input_builder import SummaryInputBuilder
+from src.tracing import span
+from src.logging_setup import log_payload
 
 logger = logging.getLogger(__name__)
 
+# Checkpointed steps of review submission processing
+STEP_TX_HASH_SENT = "tx_hash_sent"
+STEP_AUDITED = "audited"
+STEP_STATUS_SENT = "status_sent"
+
 class BusinessLogic:
-    def __init__(self, config: Config, web3_manager: Web3Manager, db_manager: DatabaseManager):
+    def __init__(self, config: Config, web3_manager: Web3Manager, db_manager: DatabaseManager, tx_batcher=None, dry_run=False):
         self.config = config
         self.web3_manager = web3_manager
         self.db_manager = db_manager
+        self.tx_batcher = tx_batcher  # Settles review status / tx-hash writes in batches when set
+        # Dry run (replays): no transactions and no writes to the node's own tables - verdicts and
+        # summaries are returned as dicts instead
+        self.dry_run = dry_run
         
-        # Initialize Volc Engine AI service
+        # Initialize Volc Engine AI service with latency-aware routing per task
         self.volc_ai = VolcEngineAI(
             api_key=config.volc_ai_api_key,
-            api_url=config.volc_ai_api_url
+            api_url=config.volc_ai_api_url,
+            routers={
+                "audit": AiRouter(
+                    "audit", config.audit_endpoints,
+                    alpha=config.ai_ewma_alpha,
+                    hedge_enabled=config.audit_hedge_enabled,
+                    hedge_quantile=config.ai_hedge_quantile,
+                    hedge_min_delay=config.ai_hedge_min_delay,
+                    hedge_default_delay=config.ai_hedge_default_delay
+                ),
+                "summary": AiRouter(
+                    "summary", config.summary_endpoints,
+                    alpha=config.ai_ewma_alpha,
+                    hedge_enabled=config.summary_hedge_enabled,
+                    hedge_quantile=config.ai_hedge_quantile,
+                    hedge_min_delay=config.ai_hedge_min_delay,
+                    hedge_default_delay=config.ai_hedge_default_delay
+                )
+            }
+        )
+        
+        # Bounded prompt builder for summary generation
+        self.summary_input_builder = SummaryInputBuilder(
+            token_budget=config.summary_input_token_budget,
+            dedup_similarity=config.summary_dedup_similarity
         )
     
-    async def process_review_submitted(self, event_data):
+    async def process_review_submitted(self, event_data, event_id=None):
         """Process review submission event - update transaction hash and perform AI audit"""
         try:
+            # With an event_id each completed step is checkpointed, so an interrupted event
+            # resumes where it stopped instead of re-sending transactions or re-auditing
+            steps = await self.db_manager.get_event_steps(event_id) if event_id else {}
+            if steps:
+                logger.info("Resuming review submission %s after steps: %s", event_id, sorted(steps))
+            
             review_id = event_data['reviewId']
             scenic_spot_id = event_data['scenicSpotId']
             user_address = event_data['user']
@@ -29,53 +74,60 @@ class BusinessLogic:
             rating = event_data['rating']
             tx_hash = event_data['transaction_hash']  # Get the actual transaction hash from the event
             
-            logger.info(f"Processing review submission for review_id: {review_id}")
-            
-            # 1. Update review transaction hash - only update submitHash, use zero hash for approveHash
-            tx_hash_bytes32 = self.web3_manager.web3.to_bytes(hexstr=tx_hash)
+            logger.info("Processing review submission for review_id: %s", review_id)
             
-            func_call = self.web3_manager.contract.functions.updateReviewTxHashes(
-                review_id,  # reviewId
-                tx_hash_bytes32,  # submitHash (bytes32) - use actual transaction hash
-                self.web3_manager.web3.to_bytes(hexstr="0x" + "0" * 64)  # approveHash (bytes32) - initialize to zero hash
-            )
+            # Local read model, so summaries need not fetch the review structs from the chain again
+            if not self.dry_run:
+                await self.db_manager.save_scenic_review(
+                    review_id, scenic_spot_id, user_address, review_content, rating, event_data.get('submittedAt')
+                )
             
-            # Send transaction
-            update_tx_hash = self.web3_manager.send_transaction(func_call)
-            if update_tx_hash is None:
-                logger.error(f"Failed to update transaction hash for review_id: {review_id}")
-                return False, "Failed to update transaction hash"
+            # 1. Update review transaction hash - only update submitHash, use zero hash for approveHash
+            if STEP_TX_HASH_SENT in steps:
+                update_tx_hash = steps[STEP_TX_HASH_SENT]
+            elif self.dry_run:
+                update_tx_hash = None
+            else:
+                with span("tx.update_review_tx_hashes"):
+                    update_tx_hash = await self._update_review_tx_hashes(review_id, submit_hash=tx_hash)
+                if update_tx_hash is None:
+                    logger.error(f"Failed to update transaction hash for review_id: {review_id}")
+                    return False, "Failed to update transaction hash"
+                
+                logger.info("Successfully updated transaction hash for review_id: %s, tx_hash: %s", review_id, update_tx_hash)
+                if event_id:
+                    await self.db_manager.record_event_step(event_id, STEP_TX_HASH_SENT, update_tx_hash)
             
-            logger.info(f"Successfully updated transaction hash for review_id: {review_id}, tx_hash: {update_tx_hash}")
+            if STEP_AUDITED in steps:
+                is_approved = steps[STEP_AUDITED] == "approved"
+                logger.info("Reusing recorded audit result for review_id: %s, is_approved=%s", review_id, is_approved)
+                return await self._send_review_status(event_id, steps, review_id, is_approved, update_tx_hash)
             
             # 2. Get scenic spot information
-            scenic_spot_info = self.web3_manager.get_scenic_spot(scenic_spot_id)
+            with span("rpc.get_scenic_spot"):
+                scenic_spot_info = await asyncio.to_thread(self.web3_manager.get_scenic_spot, scenic_spot_id)
             # getScenicSpot returns a tuple (ScenicSpot, Summary), scenic spot name is in the ScenicSpot struct
             scenic_spot_name = scenic_spot_info[0][1] if scenic_spot_info and len(scenic_spot_info) > 0 else "Unknown Scenic Spot"
             
             # 3. Build AI audit structure
-            # Add detailed debug logs to check each field type
-            logger.info(f"scenic_spot_info type: {type(scenic_spot_info)}, scenic_spot_info: {scenic_spot_info}")
-            logger.info(f"scenic_spot_name type: {type(scenic_spot_name)}, value: {scenic_spot_name}")
-            logger.info(f"review_content type: {type(review_content)}, value: {review_content}")
-            logger.info(f"rating type: {type(rating)}, value: {rating}")
+            log_payload(logger, "Scenic spot info", scenic_spot_info)
                         
             # Process review_content
             if isinstance(review_content, bytes):
                 review_content = review_content.decode('utf-8')
-                logger.info(f"Converted review_content from bytes to string: {review_content}")
+                logger.info("Converted review_content from bytes to string: %s", review_content)
             elif not isinstance(review_content, (str, int, float, bool, type(None))):
                 review_content = str(review_content)
-                logger.info(f"Converted review_content to string: {review_content}")
+                logger.info("Converted review_content to string: %s", review_content)
             
             # Process rating
             if not isinstance(rating, (int, float)):
                 try:
                     rating = float(rating)
-                    logger.info(f"Converted rating to float: {rating}")
+                    logger.info("Converted rating to float: %s", rating)
                 except:
                     rating = 0
-                    logger.info(f"Failed to convert rating, using default: {rating}")
+                    logger.info("Failed to convert rating, using default: %s", rating)
             
             # Build audit_content dictionary
             audit_content = {
@@ -84,14 +136,10 @@ class BusinessLogic:
                 "content": review_content
             }
             
-            # Check types of audit_content dictionary
-            for key, value in audit_content.items():
-                logger.info(f"audit_content[{key}] type: {type(value)}, value: {value}")
-            
             # Use try-except to catch JSON serialization errors and print detailed information
             try:
                 audit_content_str = json.dumps(audit_content, ensure_ascii=False)
-                logger.info(f"----------------------audit_content: {audit_content_str}")
+                log_payload(logger, "Audit content", audit_content_str)
             except Exception as e:
                 logger.error(f"Failed to serialize audit_content to JSON: {e}")
                 logger.error(f"Detailed error information:")
@@ -99,9 +147,12 @@ class BusinessLogic:
                     logger.error(f"  {key}: type={type(value)}, repr={repr(value)}, str={str(value)}")
                 raise
             
-            is_approved = await self._audit_review_content(audit_content_str)
+            with span("ai.audit"):
+                is_approved = await self._audit_review_content(audit_content)
 
             audit_reason = "Content approved" if is_approved else "Content contains inappropriate information"
+            if self.dry_run:
+                return True, {"is_approved": is_approved, "audit_reason": audit_reason}
             
             # Save audit result
             await self.db_manager.save_review_audit(
@@ -113,28 +164,34 @@ class BusinessLogic:
                 is_approved=is_approved,
                 audit_reason=audit_reason
             )
+            if event_id:
+                await self.db_manager.record_event_step(event_id, STEP_AUDITED, "approved" if is_approved else "rejected")
             
             # 3. Call updateReviewStatus to update review status
-            logger.info(f"AI audit result: review_id={review_id}, is_approved={is_approved}")
+            logger.info("AI audit result: review_id=%s, is_approved=%s", review_id, is_approved)
             
-            func_call = self.web3_manager.contract.functions.updateReviewStatus(
-                review_id,
-                is_approved
-            )
+            return await self._send_review_status(event_id, steps, review_id, is_approved, update_tx_hash)
             
-            # Send transaction
-            approve_tx_hash = self.web3_manager.send_transaction(func_call)
+        except Exception as e:
+            logger.error(f"Error processing review_submitted event: {e}")
+            return False, str(e)
+    
+    async def _send_review_status(self, event_id, steps, review_id, is_approved, update_tx_hash):
+        """Final step of review submission - send updateReviewStatus unless it already went out"""
+        if STEP_STATUS_SENT in steps:
+            approve_tx_hash = steps[STEP_STATUS_SENT]
+        else:
+            with span("tx.update_review_status"):
+                approve_tx_hash = await self._update_review_status(review_id, is_approved)
             if approve_tx_hash is None:
                 logger.error(f"Failed to update review status for review_id: {review_id}")
                 return False, "Failed to update review status"
             
-            logger.info(f"Successfully updated review status for review_id: {review_id}, is_approved={is_approved}, tx_hash: {approve_tx_hash}")
-            
-            return True, f"tx_hash: {update_tx_hash}, approve_tx_hash: {approve_tx_hash}"
-            
-        except Exception as e:
-            logger.error(f"Error processing review_submitted event: {e}")
-            return False, str(e)
+            logger.info("Successfully updated review status for review_id: %s, is_approved=%s, tx_hash: %s", review_id, is_approved, approve_tx_hash)
+            if event_id:
+                await self.db_manager.record_event_step(event_id, STEP_STATUS_SENT, approve_tx_hash)
+        
+        return True, f"tx_hash: {update_tx_hash}, approve_tx_hash: {approve_tx_hash}"
     
     async def process_review_approved(self, event_data):
         """Process review approval event - update approval transaction hash"""
@@ -142,25 +199,15 @@ class BusinessLogic:
             review_id = event_data['reviewId']
             tx_hash = event_data['transaction_hash']  # Get the actual transaction hash from the event
             
-            logger.info(f"Processing review approval for review_id: {review_id}")
-            
-            # Convert transaction hash string to bytes32 type required by smart contract
-            tx_hash_bytes32 = self.web3_manager.web3.to_bytes(hexstr=tx_hash)
+            logger.info("Processing review approval for review_id: %s", review_id)
             
             # Update review transaction hash - only update approveHash, use zero hash for submitHash
-            func_call = self.web3_manager.contract.functions.updateReviewTxHashes(
-                review_id,  # reviewId
-                self.web3_manager.web3.to_bytes(hexstr="0x" + "0" * 64),  # submitHash (bytes32) - use zero hash
-                tx_hash_bytes32  # approveHash (bytes32) - use actual transaction hash
-            )
-            
-            # Send transaction
-            oracle_tx_hash = self.web3_manager.send_transaction(func_call)
+            oracle_tx_hash = await self._update_review_tx_hashes(review_id, approve_hash=tx_hash)
             if oracle_tx_hash is None:
                 logger.error(f"Failed to update approval transaction hash for review_id: {review_id}")
                 return False, "Failed to send transaction"
             
-            logger.info(f"Successfully updated approval transaction hash for review_id: {review_id}, tx_hash: {oracle_tx_hash}")
+            logger.info("Successfully updated approval transaction hash for review_id: %s, tx_hash: %s", review_id, oracle_tx_hash)
             return True, oracle_tx_hash
             
         except Exception as e:
@@ -175,15 +222,14 @@ class BusinessLogic:
             to_review_index = event_data['toReviewIndex']
             current_last_review_index = event_data['currentLastReviewIndex']
             
-            logger.info(f"Processing summary update for scenic_spot_id: {scenic_spot_id}")
-            logger.info(f"  fromReviewIndex: {from_review_index}, toReviewIndex: {to_review_index}, currentLastReviewIndex: {current_last_review_index}")
-            
-            # 1. Use getReviewsForSummary method to get approved reviews and corresponding review IDs
-            # Calculate the number of reviews needed (to_review_index - from_review_index + 1)
-            review_count = to_review_index - from_review_index + 1
+            logger.info("Processing summary update for scenic_spot_id: %s", scenic_spot_id)
+            logger.info("  fromReviewIndex: %s, toReviewIndex: %s, currentLastReviewIndex: %s", from_review_index, to_review_index, current_last_review_index)
             
-            # Call getReviewsForSummary method of the contract
-            reviews_result = self.web3_manager.get_reviews_for_summary(scenic_spot_id, review_count)
+            # 1. Get the approved reviews in the requested index range and their review IDs -
+            # from the local review store, or through getReviewsForSummary when it is incomplete
+            reviews_result = await self._get_reviews_for_summary(
+                scenic_spot_id, from_review_index, to_review_index, event_data.get('transaction_hash')
+            )
             
             if not reviews_result:
                 logger.warning(f"Failed to get reviews for summary for scenic_spot_id: {scenic_spot_id}")
@@ -191,7 +237,7 @@ class BusinessLogic:
             
             requested_reviews, requested_review_ids = reviews_result
             
-            logger.info(f"Found {len(requested_reviews)} reviews via getReviewsForSummary, corresponding IDs: {requested_review_ids}")
+            logger.info("Found %s reviews for summary, corresponding IDs: %s", len(requested_reviews), requested_review_ids)
             
             if not requested_reviews:
                 logger.warning(f"No reviews found for scenic_spot_id: {scenic_spot_id}")
@@ -199,45 +245,49 @@ class BusinessLogic:
             
             # 2. Use the retrieved approved reviews and review IDs
             approved_reviews = requested_reviews
-            review_ids = requested_review_ids
             
-            logger.info(f"Using {len(approved_reviews)} approved reviews for summary generation")
+            logger.info("Using %s approved reviews for summary generation", len(approved_reviews))
             
             # Get scenic spot information
-            scenic_spot_info = self.web3_manager.get_scenic_spot(scenic_spot_id)
+            scenic_spot_info = await asyncio.to_thread(self.web3_manager.get_scenic_spot, scenic_spot_id)
             scenic_spot_name = scenic_spot_info[0][1] if scenic_spot_info else "Unknown Scenic Spot"
             
-            # Build summary structure
-            # Format all approved reviews
-            all_reviews = []
-            for review in approved_reviews:  # Take all approved reviews
-                content = review[2]  # Third element is content
-                rating = review[3]  # Fourth element is rating
-                
-                # Parse content to JSON object and extract actual content
-                try:
-                    content_json = json.loads(content)
-                    actual_content = content_json.get("content", "")
-                except json.JSONDecodeError:
-                    actual_content = content
-                
-                all_reviews.append(f"content: {actual_content},EvaluationScore: {rating}")
+            # Build summary structure - deduplicate and pack reviews into the token budget;
+            # deduplication is quadratic in the review count, so keep it off the event loop
+            built_input = await asyncio.to_thread(
+                self.summary_input_builder.build, scenic_spot_name, approved_reviews, requested_review_ids
+            )
+            summary_input = built_input.summary_input
+            review_ids = built_input.review_ids
             
-            reviews_str = ";".join(all_reviews)
-            summary_input = f"ScenicSpotName:{scenic_spot_name},top20reviews: {reviews_str}"
+            logger.info(
+                f"Summary input for scenic_spot_id {scenic_spot_id}: {len(review_ids)}/{built_input.total_reviews} reviews, "
+                f"~{built_input.estimated_tokens} tokens, dropped {built_input.dropped} "
+                f"(duplicates: {built_input.duplicates_dropped}, over budget: {built_input.budget_dropped})"
+            )
+            log_payload(logger, "Summary input", summary_input)
             
-            logger.info(f"----------------------summary_input: {summary_input}")
+            if not review_ids:
+                # uploadSummary reverts on an empty review list - don't spend an AI call and a tx on it
+                logger.warning(f"No reviews left for the summary input of scenic_spot_id: {scenic_spot_id}")
+                return True, "No reviews to summarize"
             
-            # Generate AI summary
-            summary_content = await self._generate_ai_summary(summary_input)
+            # Generate AI summary, reusing a cached one for the same review set
+            summary_content = await self._get_or_generate_summary(scenic_spot_id, review_ids, summary_input)
             
             if not summary_content:
                 logger.error(f"Failed to generate summary for scenic_spot_id: {scenic_spot_id}")
                 return False, "Failed to generate summary"
             
-            logger.info(f"Generated summary: {summary_content}")
-            
-            logger.info(f"Using review_ids: {review_ids}")
+            log_payload(logger, "Generated summary", summary_content)
+            logger.info("Generated summary for scenic_spot_id: %s from review_ids: %s", scenic_spot_id, review_ids)
+            if self.dry_run:
+                return True, {
+                    "summary_content": summary_content,
+                    "review_ids": review_ids,
+                    "last_review_index": to_review_index,
+                    "total_reviews": built_input.total_reviews
+                }
             
             # Upload summary to contract
             func_call = self.web3_manager.contract.functions.uploadSummary(
@@ -248,7 +298,7 @@ class BusinessLogic:
             )
             
             # Send transaction
-            tx_hash = self.web3_manager.send_transaction(func_call)
+            tx_hash = await self._send_transaction(func_call)
             if tx_hash is None:
                 logger.error(f"Failed to upload summary for scenic_spot_id: {scenic_spot_id}")
                 return False, "Failed to send transaction"
@@ -261,12 +311,13 @@ class BusinessLogic:
             await self.db_manager.update_summary_generation(
                 scenic_spot_id=scenic_spot_id,
                 summary_id=new_summary_id,
-                summary_content=summary_content
+                summary_content=summary_content,
+                min_interval_seconds=self.config.summary_min_interval_seconds
             )
             
-            logger.info(f"Successfully uploaded summary for scenic_spot_id: {scenic_spot_id}")
-            logger.info(f"  Oracle transaction hash: {tx_hash}")
-            logger.info(f"  Summary version: {new_summary_id}")
+            logger.info("Successfully uploaded summary for scenic_spot_id: %s", scenic_spot_id)
+            logger.info("  Oracle transaction hash: %s", tx_hash)
+            logger.info("  Summary version: %s", new_summary_id)
             
             return True, f"summary_id: {new_summary_id}, tx_hash: {tx_hash}"
             
@@ -280,7 +331,7 @@ class BusinessLogic:
             scenic_spot_id = event_data['scenicSpotId']
             tx_hash = event_data['transaction_hash']  # Get the actual transaction hash from the event
             
-            logger.info(f"Processing SummaryGenerated event for scenic_spot_id: {scenic_spot_id}")
+            logger.info("Processing SummaryGenerated event for scenic_spot_id: %s", scenic_spot_id)
             
             # Convert transaction hash string to bytes32 type required by smart contract
             tx_hash_bytes32 = self.web3_manager.web3.to_bytes(hexstr=tx_hash)
@@ -292,12 +343,12 @@ class BusinessLogic:
             )
             
             # Send transaction
-            oracle_tx_hash = self.web3_manager.send_transaction(func_call)
+            oracle_tx_hash = await self._send_transaction(func_call)
             if oracle_tx_hash is None:
                 logger.error(f"Failed to update summary txHash for scenic_spot_id: {scenic_spot_id}")
                 return False, "Failed to send transaction"
             
-            logger.info(f"Successfully updated summary txHash for scenic_spot_id: {scenic_spot_id}, tx_hash: {oracle_tx_hash}")
+            logger.info("Successfully updated summary txHash for scenic_spot_id: %s, tx_hash: %s", scenic_spot_id, oracle_tx_hash)
             
             return True, oracle_tx_hash
             
@@ -305,12 +356,76 @@ class BusinessLogic:
             logger.error(f"Error processing summary_generated event: {e}")
             return False, str(e)
     
-    async def _audit_review_content(self, content):
+    def _ensure_live(self):
+        if self.dry_run:
+            raise RuntimeError("Transactions are disabled in dry-run mode")
+    
+    async def _send_transaction(self, func_call):
+        """Send a contract transaction, through the batcher when available so nonces stay in one place"""
+        self._ensure_live()
+        if self.tx_batcher is not None:
+            return await self.tx_batcher.send_transaction(func_call)
+        return self.web3_manager.send_transaction(func_call)
+    
+    async def _update_review_tx_hashes(self, review_id, submit_hash=None, approve_hash=None):
+        """Update review transaction hashes, through the batcher when available"""
+        self._ensure_live()
+        if self.tx_batcher is not None:
+            return await self.tx_batcher.update_review_tx_hashes(review_id, submit_hash, approve_hash)
+        
+        zero_hash = "0x" + "0" * 64
+        func_call = self.web3_manager.contract.functions.updateReviewTxHashes(
+            review_id,  # reviewId
+            self.web3_manager.web3.to_bytes(hexstr=submit_hash or zero_hash),  # submitHash (bytes32)
+            self.web3_manager.web3.to_bytes(hexstr=approve_hash or zero_hash)  # approveHash (bytes32)
+        )
+        return self.web3_manager.send_transaction(func_call)
+    
+    async def _update_review_status(self, review_id, is_approved):
+        """Update review status, through the batcher when available"""
+        self._ensure_live()
+        if self.tx_batcher is not None:
+            return await self.tx_batcher.update_review_status(review_id, is_approved)
+        
+        func_call = self.web3_manager.contract.functions.updateReviewStatus(
+            review_id,
+            is_approved
+        )
+        return self.web3_manager.send_transaction(func_call)
+    
+    async def _get_reviews_for_summary(self, scenic_spot_id, from_review_index, to_review_index, transaction_hash):
+        """(reviews, review IDs) for the index range, read locally when the store provably matches the chain"""
+        rows = await self.db_manager.get_scenic_reviews_by_index(scenic_spot_id, from_review_index, to_review_index)
+        # Local indexes equal the chain's only if no earlier approval was missed - then the review at
+        # toReviewIndex is the one approved in the transaction that emitted SummaryUpdateRequired
+        if (
+            transaction_hash
+            and [row['review_index'] for row in rows] == list(range(from_review_index, to_review_index + 1))
+            and rows[-1]['approve_tx_hash'] == transaction_hash
+        ):
+            logger.info("Read %s reviews for scenic_spot_id %s from the local review store", len(rows), scenic_spot_id)
+            # Shaped like the contract's Review struct; fields the summary does not use are left empty
+            reviews = [
+                (row['user_address'], scenic_spot_id, row['content'], row['rating'], None, None, None,
+                 row['submitted_at'], None, None)
+                for row in rows
+            ]
+            return reviews, [row['review_id'] for row in rows]
+        
+        logger.info("Local review store incomplete for scenic_spot_id %s, calling getReviewsForSummary", scenic_spot_id)
+        review_count = to_review_index - from_review_index + 1
+        with span("rpc.get_reviews_for_summary"):
+            return await asyncio.to_thread(self.web3_manager.get_reviews_for_summary, scenic_spot_id, review_count)
+    
+    async def _audit_review_content(self, audit_content):
         """Review content audit logic - using Volc Engine AI"""
         # Call Volc Engine AI service for content audit
         return await self.volc_ai.audit_review_content(
-            content=content,
-            model_id=self.config.audit_model_id
+            audit_content=audit_content,
+            model_id=self.config.audit_model_id,
+            chunk_size=self.config.audit_chunk_size,
+            chunk_overlap=self.config.audit_chunk_overlap,
+            max_concurrency=self.config.audit_max_concurrency
         )
     
     async def _generate_ai_summary(self, summary_input):
@@ -320,3 +435,29 @@ class BusinessLogic:
             summary_input=summary_input,
             model_id=self.config.summary_model_id
         )
+    
+    async def _get_or_generate_summary(self, scenic_spot_id, review_ids, summary_input):
+        """Return the cached summary for this review set, generating and caching it on a miss"""
+        if self.dry_run:
+            # A what-if run is about what the current prompt and model produce now
+            return await self._generate_ai_summary(summary_input)
+        
+        # Any configured summary model may answer, so the key covers the whole model set
+        model_id = ",".join(sorted(str(model) for _, model in self.config.summary_endpoints))
+        sorted_ids = ",".join(str(review_id) for review_id in sorted(review_ids))
+        review_ids_hash = hashlib.sha256(sorted_ids.encode('utf-8')).hexdigest()
+        
+        cached_summary = await self.db_manager.get_cached_summary(
+            scenic_spot_id, review_ids_hash, model_id, SUMMARY_PROMPT_VERSION
+        )
+        if cached_summary:
+            logger.info("Using cached summary for scenic_spot_id: %s, key: %s", scenic_spot_id, review_ids_hash[:16])
+            return cached_summary
+        
+        summary_content = await self._generate_ai_summary(summary_input)
+        if summary_content:
+            await self.db_manager.save_cached_summary(
+                scenic_spot_id, review_ids_hash, model_id, SUMMARY_PROMPT_VERSION,
+                sorted_ids, summary_content
+            )
+        return summary_content
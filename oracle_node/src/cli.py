@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import math
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config import Config
+from src.db_manager import DatabaseManager
+from src.web3_manager import Web3Manager
+from src.business_logic import BusinessLogic
+from src.replay import ReplayEngine, REPLAYABLE_EVENT_TYPES
+
+
+async def list_dead_letters(db_manager: DatabaseManager, args):
+    dead_letters = await db_manager.get_dead_letters(args.event_type, args.event_id)
+    for entry in dead_letters:
+        print(f"{entry['event_id']}  {entry['event_type']}  block={entry['block_number']}  "
+              f"attempts={entry['attempts']}  failed_at={entry['failed_at']}  error={entry['last_error']}")
+    print(f"{len(dead_letters)} dead-lettered events")
+
+
+async def requeue(db_manager: DatabaseManager, args):
+    if not (args.all or args.event_type or args.event_id):
+        print("Refusing to requeue without a filter - pass --event-id, --event-type or --all")
+        return 1
+
+    dead_letters = await db_manager.get_dead_letters(args.event_type, args.event_id)
+    event_ids = [entry['event_id'] for entry in dead_letters]
+    if args.dry_run:
+        for event_id in event_ids:
+            print(f"Would requeue {event_id}")
+        print(f"{len(event_ids)} events would be requeued")
+        return 0
+
+    requeued = await db_manager.requeue_dead_letters(event_ids)
+    print(f"Requeued {requeued} events - a running node picks them up on its next poll")
+    return 0
+
+
+def parse_duration(value):
+    """Seconds from a duration such as 90, 30m, 6h or 2d"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd]?)", value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+async def stage_stats(db_manager: DatabaseManager, args):
+    rows = await db_manager.get_span_durations(time.time() - args.since, args.event_type)
+    durations = {}
+    for name, duration_ms in rows:
+        durations.setdefault(name, []).append(duration_ms)
+    if not durations:
+        print("No spans recorded in this window")
+        return 0
+
+    # Stages that take the most time in total first
+    stages = sorted(durations.items(), key=lambda item: sum(item[1]), reverse=True)
+    width = max(len("stage"), max(len(name) for name in durations))
+    print(f"{'stage':<{width}}  {'count':>7}  {'p50 ms':>10}  {'p95 ms':>10}  {'p99 ms':>10}  {'max ms':>10}")
+    for name, values in stages:
+        values.sort()
+        print(f"{name:<{width}}  {len(values):>7}  {percentile(values, 0.5):>10.1f}  {percentile(values, 0.95):>10.1f}  "
+              f"{percentile(values, 0.99):>10.1f}  {values[-1]:>10.1f}")
+    return 0
+
+
+async def profile(db_manager: DatabaseManager, args):
+    config = Config()
+    # Shard worker N serves on METRICS_PORT + 1 + N
+    port = config.metrics_port if args.shard is None else config.metrics_port + 1 + args.shard
+    url = f"http://{config.metrics_host}:{port}/debug/profile?seconds={args.seconds:g}"
+    try:
+        response = await asyncio.to_thread(urllib.request.urlopen, urllib.request.Request(url, method="POST"), timeout=10)
+        print(f"Profiling for {args.seconds:g}s, output: {response.read().decode().strip()}")
+        return 0
+    except urllib.error.HTTPError as e:
+        print(f"Profile not started ({e.code}): {e.read().decode().strip()}")
+    except OSError as e:
+        print(f"Failed to reach {url}: {e}")
+    return 1
+
+
+async def replay(db_manager: DatabaseManager, args):
+    config = Config()
+    web3_manager = Web3Manager(config)
+    # Reviews and summaries are read from the chain as the live node does; nothing is sent
+    if not await asyncio.to_thread(web3_manager.connect):
+        print("Failed to connect to blockchain")
+        return 1
+    business_logic = BusinessLogic(config, web3_manager, db_manager, dry_run=True)
+    run_id = args.run_id or datetime.now().strftime("replay-%Y%m%d-%H%M%S")
+    engine = ReplayEngine(db_manager, business_logic, run_id, concurrency=args.concurrency)
+    now = datetime.now()
+    try:
+        counts = await engine.run(
+            event_types=[args.event_type] if args.event_type else REPLAYABLE_EVENT_TYPES,
+            limit=args.limit,
+            from_block=args.from_block,
+            to_block=args.to_block,
+            since=now - timedelta(seconds=args.since) if args.since is not None else None,
+            until=now - timedelta(seconds=args.until) if args.until is not None else None
+        )
+    finally:
+        await business_logic.volc_ai.close()
+
+    for (event_type, status), count in sorted(counts.items()):
+        print(f"{event_type}  {status}: {count}")
+    print(f"Replayed {sum(counts.values())} events as run {run_id} - compare with: python src/cli.py replay-diff {run_id}")
+    return 0 if counts else 1
+
+
+async def replay_diff(db_manager: DatabaseManager, args):
+    verdicts = await db_manager.get_replay_verdict_diff(args.run_id)
+    changed = [row for row in verdicts if row[3] is not None and bool(row[2]) != bool(row[3])]
+    for event_id, review_id, replayed, recorded in changed:
+        print(f"review {review_id}: {'approved' if recorded else 'rejected'} -> {'approved' if replayed else 'rejected'}  ({event_id})")
+    unrecorded = sum(1 for row in verdicts if row[3] is None)
+    print(f"Verdicts: {len(verdicts)} replayed, {len(changed)} changed, {unrecorded} without a recorded audit")
+
+    summaries = await db_manager.get_replay_summary_diff(args.run_id)
+    changed_summaries = 0
+    for event_id, scenic_spot_id, review_ids, replayed, recorded in summaries:
+        if recorded is not None and replayed == recorded:
+            continue
+        changed_summaries += recorded is not None
+        if args.show_summaries:
+            print(f"scenic spot {scenic_spot_id}, reviews {review_ids} ({event_id}):")
+            print(f"  recorded: {recorded if recorded is not None else '-'}")
+            print(f"  replayed: {replayed}")
+    unrecorded = sum(1 for row in summaries if row[4] is None)
+    print(f"Summaries: {len(summaries)} replayed, {changed_summaries} changed, {unrecorded} without a recorded summary for the same reviews")
+    return 0
+
+
+async def run(args):
+    config = Config()
+    db_manager = DatabaseManager(config.db_path)
+    if not await db_manager.connect():
+        print(f"Failed to open database: {config.db_path}")
+        return 1
+    try:
+        return await args.handler(db_manager, args) or 0
+    finally:
+        await db_manager.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Oracle node maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dead_letters_parser = subparsers.add_parser("dead-letters", help="List events that exhausted their retries")
+    dead_letters_parser.add_argument("--event-type", help="Only events of this type, e.g. ReviewSubmitted")
+    dead_letters_parser.add_argument("--event-id", action="append", help="Only this event (repeatable)")
+    dead_letters_parser.set_defaults(handler=list_dead_letters)
+
+    requeue_parser = subparsers.add_parser("requeue", help="Move dead-lettered events back onto the job queue")
+    requeue_parser.add_argument("--event-type", help="Only events of this type, e.g. ReviewSubmitted")
+    requeue_parser.add_argument("--event-id", action="append", help="Only this event (repeatable)")
+    requeue_parser.add_argument("--all", action="store_true", help="Requeue every dead-lettered event")
+    requeue_parser.add_argument("--dry-run", action="store_true", help="Show what would be requeued")
+    requeue_parser.set_defaults(handler=requeue)
+
+    stages_parser = subparsers.add_parser("stages", help="Latency percentiles per processing stage from recorded spans")
+    stages_parser.add_argument("--since", type=parse_duration, default=3600, help="Time window, e.g. 30m, 6h, 2d (default: 1h)")
+    stages_parser.add_argument("--event-type", help="Only spans of events of this type, e.g. ReviewSubmitted")
+    stages_parser.set_defaults(handler=stage_stats)
+
+    profile_parser = subparsers.add_parser("profile", help="Start a sampling profile of the running node")
+    profile_parser.add_argument("--seconds", type=float, default=30, help="How long to sample (default: 30)")
+    profile_parser.add_argument("--shard", type=int, help="Profile this shard worker instead of the main process")
+    profile_parser.set_defaults(handler=profile)
+
+    replay_parser = subparsers.add_parser(
+        "replay", help="Re-run stored events through dry-run business logic and record verdicts / summaries"
+    )
+    replay_parser.add_argument("--event-type", choices=REPLAYABLE_EVENT_TYPES, help="Only events of this type")
+    replay_parser.add_argument("--from-block", type=int, help="First block to replay")
+    replay_parser.add_argument("--to-block", type=int, help="Last block to replay")
+    replay_parser.add_argument("--since", type=parse_duration, help="Only events processed within this window, e.g. 6h, 2d")
+    replay_parser.add_argument("--until", type=parse_duration, help="Only events processed at least this long ago")
+    replay_parser.add_argument("--limit", type=int, help="Replay at most this many events")
+    replay_parser.add_argument("--concurrency", type=int, default=16, help="Events in flight at once (default: 16)")
+    replay_parser.add_argument("--run-id", help="Name of this run in replay_results (default: replay-<time>)")
+    replay_parser.set_defaults(handler=replay)
+
+    replay_diff_parser = subparsers.add_parser("replay-diff", help="Compare a replay run with the recorded verdicts and summaries")
+    replay_diff_parser.add_argument("run_id", help="Replay run to compare")
+    replay_diff_parser.add_argument("--show-summaries", action="store_true", help="Print replayed and recorded summaries that differ")
+    replay_diff_parser.set_defaults(handler=replay_diff)
+
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(build_parser().parse_args())))
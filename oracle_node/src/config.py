@@ -1,7 +1,7 @@
 import os
 from dotenv import load_dotenv
-import logging
 import pathlib
+from src.logging_setup import setup_logging
 
 class Config:
     def __init__(self):
@@ -13,6 +13,12 @@ class Config:
         self.websocket_url = os.getenv("WEBSOCKET_URL", "wss://ws.sepolia.mantle.xyz")
         self.chain_id = int(os.getenv("CHAIN_ID", "5003"))
         
+        # RPC Pool Configuration - comma-separated URLs, the first one is the write primary
+        self.rpc_urls = [url.strip() for url in os.getenv("RPC_URLS", self.rpc_url).split(",") if url.strip()]
+        self.rpc_probe_interval = float(os.getenv("RPC_PROBE_INTERVAL", "15"))
+        self.rpc_max_block_lag = int(os.getenv("RPC_MAX_BLOCK_LAG", "5"))
+        self.rpc_max_errors = int(os.getenv("RPC_MAX_ERRORS", "3"))
+        
         # Oracle Private Key
         self.oracle_private_key = os.getenv("ORACLE_PRIVATE_KEY")
         if not self.oracle_private_key:
@@ -26,6 +32,37 @@ class Config:
         # Application Configuration
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
         self.log_file = os.getenv("LOG_FILE", "logs/oracle.log")
+        self.log_format = os.getenv("LOG_FORMAT", "json").lower()  # "json" or "text" for the log file
+        self.log_max_bytes = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+        self.log_backup_count = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+        # Fraction of verbose DEBUG payload dumps (prompts, built transactions) that are written
+        self.log_payload_sample_rate = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+        
+        # Metrics Configuration - Prometheus text endpoint, shard workers listen on METRICS_PORT + 1 + shard index
+        self.metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        self.metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+        self.metrics_port = int(os.getenv("METRICS_PORT", "9108"))
+        
+        # Event Loop Monitor Configuration - lag is sampled every LOOP_MONITOR_INTERVAL seconds and the
+        # loop thread's stack is logged when a tick is late by more than LOOP_BLOCK_THRESHOLD seconds
+        self.loop_monitor_enabled = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+        self.loop_monitor_interval = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))
+        self.loop_block_threshold = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.25"))
+        self.loop_lag_report_interval = float(os.getenv("LOOP_LAG_REPORT_INTERVAL", "60"))
+        self.loop_lag_window_seconds = float(os.getenv("LOOP_LAG_WINDOW_SECONDS", "300"))
+        
+        # Profiler Configuration - SIGUSR1 or GET /debug/profile?seconds=N on the metrics port starts a
+        # sampling profile that writes collapsed stacks to PROFILE_OUTPUT_DIR
+        self.profile_duration = float(os.getenv("PROFILE_DURATION", "30"))
+        self.profile_max_duration = float(os.getenv("PROFILE_MAX_DURATION", "600"))
+        self.profile_interval = float(os.getenv("PROFILE_INTERVAL", "0.01"))
+        self.profile_output_dir = os.getenv("PROFILE_OUTPUT_DIR", "output")
+        
+        # Tracing Configuration - per-stage spans are buffered and written to the trace_spans table in batches
+        self.tracing_enabled = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+        self.trace_flush_interval = float(os.getenv("TRACE_FLUSH_INTERVAL", "5"))
+        self.trace_batch_size = int(os.getenv("TRACE_BATCH_SIZE", "500"))
+        self.trace_retention_days = float(os.getenv("TRACE_RETENTION_DAYS", "7"))
         
         # ABI Path Configuration
         self.abi_path = os.getenv("ABI_PATH", "src/abi/ScenicReviewSystem.json")
@@ -37,10 +74,40 @@ class Config:
         self.gas_multiplier = float(os.getenv("GAS_MULTIPLIER", "1.5"))
         self.max_retries = int(os.getenv("MAX_RETRIES", "3"))
         self.retry_delay = int(os.getenv("RETRY_DELAY", "5"))
+        self.retry_max_delay = int(os.getenv("RETRY_MAX_DELAY", "300"))  # Cap for exponential event retry backoff
         
         # Event Listening Configuration
         self.block_batch_size = int(os.getenv("BLOCK_BATCH_SIZE", "1000"))
         self.max_parallel_events = int(os.getenv("MAX_PARALLEL_EVENTS", "10"))
+        # "auto" subscribes to logs over WEBSOCKET_URL and falls back to polling; "polling" never uses WebSocket
+        self.listener_mode = os.getenv("LISTENER_MODE", "auto").lower()
+        # Adaptive polling - the interval follows the observed block time within these bounds
+        self.poll_initial_interval = float(os.getenv("POLL_INITIAL_INTERVAL", "5"))
+        self.poll_min_interval = float(os.getenv("POLL_MIN_INTERVAL", "0.5"))
+        self.poll_max_interval = float(os.getenv("POLL_MAX_INTERVAL", "30"))
+        
+        # Finality Configuration - only logs at least CONFIRMATION_DEPTH blocks deep are dispatched
+        self.confirmation_depth = int(os.getenv("CONFIRMATION_DEPTH", "3"))
+        self.use_finalized_tag = os.getenv("USE_FINALIZED_TAG", "false").lower() == "true"
+        self.reorg_window_size = int(os.getenv("REORG_WINDOW_SIZE", "64"))
+        
+        # Job Queue Configuration - number of workers processing queued events
+        self.job_workers = int(os.getenv("JOB_WORKERS", str(self.max_parallel_events)))
+        self.job_lease_seconds = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+        
+        # Recovery Configuration - events stuck in 'processing' longer than this are resumed
+        self.recovery_stale_seconds = int(os.getenv("RECOVERY_STALE_SECONDS", "600"))
+        self.recovery_interval_seconds = int(os.getenv("RECOVERY_INTERVAL_SECONDS", "300"))
+        
+        # Transaction Batching Configuration (TX_BATCH_MAX_ITEMS=1 sends every write individually -
+        # only raise it once the deployed contract has the updateReviewStatusBatch / updateReviewTxHashesBatch entry points)
+        self.tx_batch_max_items = int(os.getenv("TX_BATCH_MAX_ITEMS", "1"))
+        self.tx_batch_flush_seconds = float(os.getenv("TX_BATCH_FLUSH_SECONDS", "2"))
+        
+        # Deferred Bookkeeping Configuration (ReviewApproved / SummaryGenerated tx-hash writes)
+        self.deferred_idle_seconds = float(os.getenv("DEFERRED_IDLE_SECONDS", "3"))
+        self.deferred_max_interval_seconds = float(os.getenv("DEFERRED_MAX_INTERVAL_SECONDS", "60"))
+        self.deferred_batch_size = int(os.getenv("DEFERRED_BATCH_SIZE", "50"))
         
         # Volc Engine AI Configuration
         self.volc_ai_api_key = os.getenv("VOLC_AI_API_KEY")
@@ -48,29 +115,47 @@ class Config:
         self.summary_model_id = os.getenv("SUMMARY_MODEL_ID")
         self.volc_ai_api_url = os.getenv("VOLC_AI_API_URL", "YOU_AI_URL")
         
+        # AI Endpoint Routing Configuration - comma separated "api_url|model_id" pairs per task
+        self.audit_endpoints = self._parse_endpoints(os.getenv("AUDIT_ENDPOINTS"), self.audit_model_id)
+        self.summary_endpoints = self._parse_endpoints(os.getenv("SUMMARY_ENDPOINTS"), self.summary_model_id)
+        self.ai_ewma_alpha = float(os.getenv("AI_EWMA_ALPHA", "0.2"))
+        self.audit_hedge_enabled = os.getenv("AUDIT_HEDGE_ENABLED", "false").lower() == "true"
+        self.summary_hedge_enabled = os.getenv("SUMMARY_HEDGE_ENABLED", "false").lower() == "true"
+        self.ai_hedge_quantile = float(os.getenv("AI_HEDGE_QUANTILE", "0.95"))
+        self.ai_hedge_min_delay = float(os.getenv("AI_HEDGE_MIN_DELAY", "0.2"))
+        self.ai_hedge_default_delay = float(os.getenv("AI_HEDGE_DEFAULT_DELAY", "2.0"))
+        
+        # Chunked Audit Configuration (content longer than AUDIT_CHUNK_SIZE characters is audited in parallel chunks)
+        self.audit_chunk_size = int(os.getenv("AUDIT_CHUNK_SIZE", "2000"))
+        self.audit_chunk_overlap = int(os.getenv("AUDIT_CHUNK_OVERLAP", "200"))
+        self.audit_max_concurrency = int(os.getenv("AUDIT_MAX_CONCURRENCY", "4"))
+        
+        # Summary Scheduling Configuration
+        self.summary_debounce_seconds = float(os.getenv("SUMMARY_DEBOUNCE_SECONDS", "10"))
+        self.summary_max_wait_seconds = float(os.getenv("SUMMARY_MAX_WAIT_SECONDS", "60"))
+        self.summary_min_interval_seconds = int(os.getenv("SUMMARY_MIN_INTERVAL_SECONDS", "300"))
+        
+        # Summary Input Configuration
+        self.summary_input_token_budget = int(os.getenv("SUMMARY_INPUT_TOKEN_BUDGET", "4000"))
+        self.summary_dedup_similarity = float(os.getenv("SUMMARY_DEDUP_SIMILARITY", "0.9"))
+        
         # Setup logging
         self.setup_logging()
     
+    def _parse_endpoints(self, value, default_model_id):
+        """Parse "api_url|model_id" pairs, falling back to the single configured endpoint"""
+        if not value:
+            return [(self.volc_ai_api_url, default_model_id)]
+        
+        endpoints = []
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            api_url, _, model_id = item.partition("|")
+            endpoints.append((api_url.strip(), model_id.strip() or default_model_id))
+        return endpoints
+    
     def setup_logging(self):
-        """Configure logging system"""
-        # Ensure log directory exists
-        log_dir = os.path.dirname(self.log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        # Configure logging
-        logging.basicConfig(
-            level=getattr(logging, self.log_level),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_file),
-                logging.StreamHandler()
-            ]
-        )
-        
-        # Set web3 log level
-        logging.getLogger("web3").setLevel(logging.WARNING)
-        logging.getLogger("urllib3").setLevel(logging.WARNING)
-
-# Create global configuration instance
-config = Config()
\ No newline at end of file
+        """Configure logging system - a background thread formats and writes all records"""
+        setup_logging(self)
@@ -1,9 +1,20 @@
 import aiosqlite
+import functools
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from src.metrics import DB_WRITE_SECONDS
+from src.tracing import span
 
 logger = logging.getLogger(__name__)
 
+def timed_write(func):
+    """Record a write method's duration in the DB write histogram and as a span of the current trace"""
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        with DB_WRITE_SECONDS.time(operation=func.__name__), span(f"db.{func.__name__}"):
+            return await func(self, *args, **kwargs)
+    return wrapper
+
 class DatabaseManager:
     def __init__(self, db_path):
         self.db_path = db_path
@@ -12,13 +23,21 @@ class DatabaseManager:
     async def connect(self):
         try:
             self.conn = await aiosqlite.connect(self.db_path)
+            # WAL lets shard worker processes read while another process writes
+            await self.conn.execute("PRAGMA journal_mode=WAL")
             await self._create_tables()
-            logger.info(f"Connected to database: {self.db_path}")
+            logger.info("Connected to database: %s", self.db_path)
             return True
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
             return False
     
+    async def _add_missing_column(self, table, column, column_type):
+        async with self.conn.execute(f"PRAGMA table_info({table})") as cursor:
+            columns = [row[1] for row in await cursor.fetchall()]
+        if column not in columns:
+            await self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    
     async def close(self):
         if self.conn:
             await self.conn.close()
@@ -79,6 +98,150 @@ class DatabaseManager:
                 )
             ''')
             
+            # Generated summary cache - reused on retries and replays covering the same reviews
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    scenic_spot_id INTEGER NOT NULL,
+                    review_ids_hash TEXT NOT NULL,
+                    model_id TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    review_ids TEXT NOT NULL,
+                    summary_content TEXT NOT NULL,
+                    created_at TIMESTAMP,
+                    PRIMARY KEY (scenic_spot_id, review_ids_hash, model_id, prompt_version)
+                )
+            ''')
+            
+            # Deferred bookkeeping writes - low-priority tx-hash updates drained when the node is idle
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS deferred_writes (
+                    event_id TEXT PRIMARY KEY,
+                    event_type TEXT NOT NULL,
+                    transaction_hash TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    event_data TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at TIMESTAMP,
+                    result TEXT,
+                    created_at TIMESTAMP,
+                    updated_at TIMESTAMP
+                )
+            ''')
+            # Tables created before retry backoff have no next_attempt_at
+            await self._add_missing_column("deferred_writes", "next_attempt_at", "TIMESTAMP")
+            
+            # Durable job queue - decoded events waiting for (or leased by) a worker
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    event_id TEXT PRIMARY KEY,
+                    event_type TEXT NOT NULL,
+                    transaction_hash TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    event_data TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires_at TIMESTAMP,
+                    next_attempt_at TIMESTAMP,
+                    result TEXT,
+                    created_at TIMESTAMP,
+                    updated_at TIMESTAMP
+                )
+            ''')
+            await self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, block_number, log_index)"
+            )
+            
+            # Dead letters - events that failed on every retry, kept for inspection and manual requeue
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS dead_letters (
+                    event_id TEXT PRIMARY KEY,
+                    event_type TEXT NOT NULL,
+                    transaction_hash TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    event_data TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    last_error TEXT,
+                    failed_at TIMESTAMP
+                )
+            ''')
+            
+            # Completed steps of multi-step event handlers - lets interrupted events resume
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS event_steps (
+                    event_id TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    result TEXT,
+                    completed_at TIMESTAMP,
+                    PRIMARY KEY (event_id, step)
+                )
+            ''')
+            
+            # Per-stage timing spans - trace_id is the event ID, started_at is a unix timestamp
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS trace_spans (
+                    span_id TEXT PRIMARY KEY,
+                    trace_id TEXT NOT NULL,
+                    parent_id TEXT,
+                    name TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    duration_ms REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    attributes TEXT
+                )
+            ''')
+            await self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_trace_spans_started_at ON trace_spans (started_at)"
+            )
+            
+            # Local read model of reviews - review_index is the position among the scenic spot's approved
+            # reviews (the contract's per-spot review list), ranked by the ReviewApproved log position
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS scenic_reviews (
+                    review_id INTEGER PRIMARY KEY,
+                    scenic_spot_id INTEGER NOT NULL,
+                    review_index INTEGER,
+                    user_address TEXT,
+                    content TEXT NOT NULL,
+                    rating INTEGER NOT NULL,
+                    submitted_at INTEGER,
+                    status TEXT NOT NULL,
+                    approved_block INTEGER,
+                    approved_log_index INTEGER,
+                    approve_tx_hash TEXT,
+                    updated_at TIMESTAMP
+                )
+            ''')
+            await self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scenic_reviews_index ON scenic_reviews (scenic_spot_id, review_index)"
+            )
+            await self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scenic_reviews_position ON scenic_reviews "
+                "(scenic_spot_id, status, approved_block, approved_log_index)"
+            )
+            
+            # Outcomes of dry-run replays of stored events - one row per event and replay run
+            await self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS replay_results (
+                    run_id TEXT NOT NULL,
+                    event_id TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    review_id INTEGER,
+                    scenic_spot_id INTEGER,
+                    status TEXT NOT NULL,
+                    is_approved BOOLEAN,
+                    summary_content TEXT,
+                    review_ids TEXT,
+                    result TEXT,
+                    replayed_at TIMESTAMP,
+                    PRIMARY KEY (run_id, event_id)
+                )
+            ''')
+            
             await self.conn.commit()
             logger.info("Database tables created/updated successfully")
             
@@ -98,6 +261,62 @@ class DatabaseManager:
             logger.error(f"Failed to check if event is processed: {e}")
             return False
     
+    async def get_event_status(self, event_id):
+        try:
+            async with self.conn.execute(
+                "SELECT status FROM processed_events WHERE event_id = ?", 
+                (event_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to get event status: {e}")
+            return None
+    
+    async def get_stale_processing_events(self, older_than_seconds):
+        """Events left in 'processing' longer than older_than_seconds - typically after a crash"""
+        try:
+            cutoff = datetime.now() - timedelta(seconds=older_than_seconds)
+            async with self.conn.execute(
+                "SELECT event_id, event_type, transaction_hash, block_number, event_data FROM processed_events WHERE status = 'processing' AND processed_at < ? ORDER BY block_number",
+                (cutoff,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        'event_id': row[0],
+                        'event_type': row[1],
+                        'transaction_hash': row[2],
+                        'block_number': row[3],
+                        'event_data': row[4]
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            logger.error(f"Failed to get stale processing events: {e}")
+            return []
+    
+    async def get_events_by_status(self, event_type, status):
+        try:
+            async with self.conn.execute(
+                "SELECT event_id, transaction_hash, block_number, event_data FROM processed_events WHERE event_type = ? AND status = ? ORDER BY block_number",
+                (event_type, status)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        'event_id': row[0],
+                        'transaction_hash': row[1],
+                        'block_number': row[2],
+                        'event_data': row[3]
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            logger.error(f"Failed to get events by status: {e}")
+            return []
+    
+    @timed_write
     async def mark_event_as_processed(self, event_id, event_type, transaction_hash, block_number, event_data, status, result=None):
         try:
             await self.conn.execute('''
@@ -109,13 +328,14 @@ class DatabaseManager:
                 event_data, status, datetime.now(), result
             ))
             await self.conn.commit()
-            logger.info(f"Event marked as processed: {event_id}, status: {status}")
+            logger.info("Event marked as processed: %s, status: %s", event_id, status)
             return True
         except Exception as e:
             logger.error(f"Failed to mark event as processed: {e}")
             await self.conn.rollback()
             return False
     
+    @timed_write
     async def record_oracle_transaction(self, original_event_id, transaction_hash, function_name, parameters, status):
         try:
             await self.conn.execute('''
@@ -124,13 +344,14 @@ class DatabaseManager:
                 VALUES (?, ?, ?, ?, ?)
             ''', (original_event_id, transaction_hash, function_name, parameters, status))
             await self.conn.commit()
-            logger.info(f"Oracle transaction recorded: {transaction_hash}, function: {function_name}")
+            logger.info("Oracle transaction recorded: %s, function: %s", transaction_hash, function_name)
             return True
         except Exception as e:
             logger.error(f"Failed to record Oracle transaction: {e}")
             await self.conn.rollback()
             return False
     
+    @timed_write
     async def update_transaction_status(self, transaction_hash, status, confirmed_at=None):
         try:
             if confirmed_at is None:
@@ -144,13 +365,14 @@ class DatabaseManager:
                     (status, confirmed_at, transaction_hash)
                 )
             await self.conn.commit()
-            logger.info(f"Transaction status updated: {transaction_hash}, status: {status}")
+            logger.info("Transaction status updated: %s, status: %s", transaction_hash, status)
             return True
         except Exception as e:
             logger.error(f"Failed to update transaction status: {e}")
             await self.conn.rollback()
             return False
     
+    @timed_write
     async def save_review_audit(self, review_id, scenic_spot_id, user_address, review_content, rating, is_approved, audit_reason=None):
         try:
             await self.conn.execute('''
@@ -162,7 +384,7 @@ class DatabaseManager:
                 rating, is_approved, audit_reason, datetime.now()
             ))
             await self.conn.commit()
-            logger.info(f"Review audit saved: {review_id}, approved: {is_approved}")
+            logger.info("Review audit saved: %s, approved: %s", review_id, is_approved)
             return True
         except Exception as e:
             logger.error(f"Failed to save review audit: {e}")
@@ -192,16 +414,18 @@ class DatabaseManager:
             logger.error(f"Failed to get review audit: {e}")
             return None
     
-    async def update_summary_generation(self, scenic_spot_id, summary_id=None, summary_content=None):
+    @timed_write
+    async def update_summary_generation(self, scenic_spot_id, summary_id=None, summary_content=None, min_interval_seconds=86400):
         try:
             now = datetime.now()
+            next_generation_at = now + timedelta(seconds=min_interval_seconds)
             await self.conn.execute('''
                 INSERT OR REPLACE INTO summary_generation 
                 (scenic_spot_id, last_summary_id, last_summary_content, last_generated_at, next_generation_at)
-                VALUES (?, ?, ?, ?, datetime('now', '+1 day'))
-            ''', (scenic_spot_id, summary_id, summary_content, now))
+                VALUES (?, ?, ?, ?, ?)
+            ''', (scenic_spot_id, summary_id, summary_content, now, next_generation_at))
             await self.conn.commit()
-            logger.info(f"Summary generation updated for scenic spot: {scenic_spot_id}")
+            logger.info("Summary generation updated for scenic spot: %s", scenic_spot_id)
             return True
         except Exception as e:
             logger.error(f"Failed to update summary generation: {e}")
@@ -225,3 +449,592 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Failed to get last summary: {e}")
             return None
+    
+    async def get_next_generation_at(self, scenic_spot_id):
+        try:
+            async with self.conn.execute(
+                "SELECT next_generation_at FROM summary_generation WHERE scenic_spot_id = ?", 
+                (scenic_spot_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                if row and row[0]:
+                    return datetime.fromisoformat(str(row[0]))
+                return None
+        except Exception as e:
+            logger.error(f"Failed to get next generation time: {e}")
+            return None
+    
+    async def get_cached_summary(self, scenic_spot_id, review_ids_hash, model_id, prompt_version):
+        try:
+            async with self.conn.execute(
+                "SELECT summary_content FROM summary_cache WHERE scenic_spot_id = ? AND review_ids_hash = ? AND model_id = ? AND prompt_version = ?",
+                (scenic_spot_id, review_ids_hash, model_id, prompt_version)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to get cached summary: {e}")
+            return None
+    
+    @timed_write
+    async def save_cached_summary(self, scenic_spot_id, review_ids_hash, model_id, prompt_version, review_ids, summary_content):
+        try:
+            await self.conn.execute('''
+                INSERT OR REPLACE INTO summary_cache 
+                (scenic_spot_id, review_ids_hash, model_id, prompt_version, review_ids, summary_content, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                scenic_spot_id, review_ids_hash, model_id, prompt_version,
+                review_ids, summary_content, datetime.now()
+            ))
+            await self.conn.commit()
+            logger.info("Summary cached for scenic spot: %s, key: %s", scenic_spot_id, review_ids_hash[:16])
+            return True
+        except Exception as e:
+            logger.error(f"Failed to cache summary: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @timed_write
+    async def save_scenic_review(self, review_id, scenic_spot_id, user_address, content, rating, submitted_at):
+        """Store a submitted review in the local read model, keeping its approval state if already known"""
+        try:
+            now = datetime.now()
+            await self.conn.execute('''
+                INSERT INTO scenic_reviews
+                (review_id, scenic_spot_id, user_address, content, rating, submitted_at, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 'pending', ?)
+                ON CONFLICT(review_id) DO UPDATE SET
+                    user_address = excluded.user_address, content = excluded.content, rating = excluded.rating,
+                    submitted_at = excluded.submitted_at, updated_at = excluded.updated_at
+            ''', (review_id, scenic_spot_id, user_address, content, rating, submitted_at, now))
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save scenic review: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @timed_write
+    async def record_scenic_review_approval(self, review_id, is_approved, block_number, log_index, transaction_hash):
+        """Apply a ReviewApproved event to the read model - returns False when the review is not stored locally"""
+        try:
+            now = datetime.now()
+            if not is_approved:
+                cursor = await self.conn.execute(
+                    "UPDATE scenic_reviews SET status = 'rejected', review_index = NULL, updated_at = ? WHERE review_id = ?",
+                    (now, review_id)
+                )
+                await self.conn.commit()
+                return cursor.rowcount > 0
+            
+            cursor = await self.conn.execute('''
+                UPDATE scenic_reviews
+                SET status = 'approved', approved_block = ?, approved_log_index = ?, approve_tx_hash = ?, updated_at = ?
+                WHERE review_id = ?
+            ''', (block_number, log_index, transaction_hash, now, review_id))
+            if cursor.rowcount == 0:
+                await self.conn.commit()
+                return False
+            # Rank this and every later approval of the spot - usually just this one, unless events arrived out of order
+            await self.conn.execute('''
+                UPDATE scenic_reviews SET review_index = (
+                    SELECT COUNT(*) FROM scenic_reviews AS earlier
+                    WHERE earlier.scenic_spot_id = scenic_reviews.scenic_spot_id AND earlier.status = 'approved'
+                      AND (earlier.approved_block, earlier.approved_log_index)
+                          < (scenic_reviews.approved_block, scenic_reviews.approved_log_index)
+                )
+                WHERE scenic_spot_id = (SELECT scenic_spot_id FROM scenic_reviews WHERE review_id = ?)
+                  AND status = 'approved' AND (approved_block, approved_log_index) >= (?, ?)
+            ''', (review_id, block_number, log_index))
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to record scenic review approval: {e}")
+            await self.conn.rollback()
+            return False
+    
+    async def get_scenic_reviews_by_index(self, scenic_spot_id, from_index, to_index):
+        """Locally stored approved reviews of a scenic spot with review_index in [from_index, to_index]"""
+        try:
+            async with self.conn.execute('''
+                SELECT review_index, review_id, user_address, content, rating, submitted_at, approve_tx_hash
+                FROM scenic_reviews
+                WHERE scenic_spot_id = ? AND status = 'approved' AND review_index BETWEEN ? AND ?
+                ORDER BY review_index
+            ''', (scenic_spot_id, from_index, to_index)) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        'review_index': row[0],
+                        'review_id': row[1],
+                        'user_address': row[2],
+                        'content': row[3],
+                        'rating': row[4],
+                        'submitted_at': row[5],
+                        'approve_tx_hash': row[6]
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            logger.error(f"Failed to get scenic reviews: {e}")
+            return []
+    
+    @timed_write
+    async def enqueue_deferred_write(self, event_id, event_type, transaction_hash, block_number, event_data):
+        """Queue a bookkeeping write - one that failed before (requeued from dead letters) starts over"""
+        try:
+            now = datetime.now()
+            await self.conn.execute('''
+                INSERT INTO deferred_writes 
+                (event_id, event_type, transaction_hash, block_number, event_data, status, attempts, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 'pending', 0, ?, ?)
+                ON CONFLICT(event_id) DO UPDATE SET
+                    status = 'pending', attempts = 0, next_attempt_at = NULL, updated_at = excluded.updated_at
+                WHERE deferred_writes.status = 'failed'
+            ''', (event_id, event_type, transaction_hash, block_number, event_data, now, now))
+            await self.conn.commit()
+            logger.info("Deferred write queued: %s", event_id)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue deferred write: {e}")
+            await self.conn.rollback()
+            return False
+    
+    async def get_pending_deferred_writes(self, limit, due_only=True):
+        """Pending writes in queue order - due_only leaves out failed writes still backing off"""
+        try:
+            async with self.conn.execute(
+                "SELECT event_id, event_type, transaction_hash, block_number, event_data, attempts FROM deferred_writes "
+                "WHERE status = 'pending' AND (? OR next_attempt_at IS NULL OR next_attempt_at <= ?) ORDER BY created_at LIMIT ?",
+                (not due_only, datetime.now(), limit)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        'event_id': row[0],
+                        'event_type': row[1],
+                        'transaction_hash': row[2],
+                        'block_number': row[3],
+                        'event_data': row[4],
+                        'attempts': row[5]
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            logger.error(f"Failed to get pending deferred writes: {e}")
+            return []
+    
+    @timed_write
+    async def update_deferred_write(self, event_id, status, attempts, result=None, next_attempt_at=None):
+        try:
+            await self.conn.execute(
+                "UPDATE deferred_writes SET status = ?, attempts = ?, result = ?, next_attempt_at = ?, updated_at = ? WHERE event_id = ?",
+                (status, attempts, result, next_attempt_at, datetime.now(), event_id)
+            )
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update deferred write: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @timed_write
+    async def enqueue_job(self, event_id, event_type, transaction_hash, block_number, log_index, event_data):
+        """Insert a job, ignoring events that were already queued - returns True if newly queued"""
+        try:
+            now = datetime.now()
+            cursor = await self.conn.execute('''
+                INSERT OR IGNORE INTO jobs 
+                (event_id, event_type, transaction_hash, block_number, log_index, event_data, status, attempts, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 'queued', 0, ?, ?)
+            ''', (event_id, event_type, transaction_hash, block_number, log_index, event_data, now, now))
+            await self.conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Failed to enqueue job: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @timed_write
+    async def claim_job(self, lease_owner, lease_seconds):
+        """Lease the oldest queued job or due retry, or one whose lease has expired"""
+        try:
+            now = datetime.now()
+            # execute_fetchall steps the statement to completion in one call, so the
+            # RETURNING cursor never stays open across other coroutines' commits
+            rows = await self.conn.execute_fetchall('''
+                UPDATE jobs
+                SET status = 'leased', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ?
+                WHERE event_id = (
+                    SELECT event_id FROM jobs
+                    WHERE (status IN ('queued', 'retry') AND (next_attempt_at IS NULL OR next_attempt_at <= ?))
+                       OR (status = 'leased' AND lease_expires_at < ?)
+                    ORDER BY block_number, log_index
+                    LIMIT 1
+                )
+                RETURNING event_id, event_type, transaction_hash, block_number, log_index, event_data, attempts,
+                          COALESCE(next_attempt_at, created_at)
+            ''', (lease_owner, now + timedelta(seconds=lease_seconds), now, now, now))
+            await self.conn.commit()
+            if rows:
+                row = rows[0]
+                return {
+                    'event_id': row[0],
+                    'event_type': row[1],
+                    'transaction_hash': row[2],
+                    'block_number': row[3],
+                    'log_index': row[4],
+                    'event_data': row[5],
+                    'attempts': row[6],
+                    'queued_at': row[7]  # When the job became due, for queue wait tracing
+                }
+            return None
+        except Exception as e:
+            logger.error(f"Failed to claim job: {e}")
+            await self.conn.rollback()
+            return None
+    
+    @timed_write
+    async def requeue_job(self, event_id, event_type, transaction_hash, block_number, log_index, event_data):
+        """Queue a job again unless a worker currently holds a live lease on it - returns True if queued"""
+        try:
+            now = datetime.now()
+            cursor = await self.conn.execute('''
+                INSERT INTO jobs 
+                (event_id, event_type, transaction_hash, block_number, log_index, event_data, status, attempts, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 'queued', 0, ?, ?)
+                ON CONFLICT(event_id) DO UPDATE SET
+                    status = 'queued', next_attempt_at = excluded.updated_at, lease_owner = NULL,
+                    lease_expires_at = NULL, updated_at = excluded.updated_at
+                WHERE jobs.status != 'leased' OR jobs.lease_expires_at < excluded.updated_at
+            ''', (event_id, event_type, transaction_hash, block_number, log_index, event_data, now, now))
+            await self.conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Failed to requeue job: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @timed_write
+    async def renew_job_lease(self, event_id, lease_owner, lease_seconds):
+        try:
+            await self.conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE event_id = ? AND lease_owner = ? AND status = 'leased'",
+                (datetime.now() + timedelta(seconds=lease_seconds), event_id, lease_owner)
+            )
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to renew job lease: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @timed_write
+    async def ack_job(self, event_id, lease_owner, status, result=None):
+        try:
+            await self.conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ? WHERE event_id = ? AND lease_owner = ?",
+                (status, result, datetime.now(), event_id, lease_owner)
+            )
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to ack job: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @staticmethod
+    def _job_owner_condition(lease_owner):
+        """Match the job leased to lease_owner, or with no owner a job acked after handing its work off"""
+        if lease_owner is None:
+            return "status = 'done'", ()
+        return "lease_owner = ?", (lease_owner,)
+    
+    async def get_job_attempts(self, event_id):
+        try:
+            async with self.conn.execute("SELECT attempts FROM jobs WHERE event_id = ?", (event_id,)) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Failed to get job attempts: {e}")
+            return None
+    
+    @timed_write
+    async def schedule_job_retry(self, event_id, lease_owner, next_attempt_at, result=None):
+        """Put a failed job back on the queue for next_attempt_at - lease_owner None retries a handed-off job"""
+        try:
+            condition, params = self._job_owner_condition(lease_owner)
+            await self.conn.execute(
+                f"UPDATE jobs SET status = 'retry', next_attempt_at = ?, result = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ? WHERE event_id = ? AND {condition}",
+                (next_attempt_at, result, datetime.now(), event_id, *params)
+            )
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to schedule job retry: {e}")
+            await self.conn.rollback()
+            return False
+    
+    @timed_write
+    async def dead_letter_job(self, event_id, lease_owner, result=None, attempts=None):
+        """Move a job that exhausted its retries to the dead-letter table - lease_owner None for a handed-off job"""
+        try:
+            now = datetime.now()
+            condition, params = self._job_owner_condition(lease_owner)
+            await self.conn.execute(f'''
+                INSERT OR REPLACE INTO dead_letters 
+                (event_id, event_type, transaction_hash, block_number, log_index, event_data, attempts, last_error, failed_at)
+                SELECT event_id, event_type, transaction_hash, block_number, log_index, event_data, COALESCE(?, attempts), ?, ?
+                FROM jobs WHERE event_id = ? AND {condition}
+            ''', (attempts, result, now, event_id, *params))
+            await self.conn.execute(
+                f"UPDATE jobs SET status = 'dead', result = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ? WHERE event_id = ? AND {condition}",
+                (result, now, event_id, *params)
+            )
+            await self.conn.commit()
+            logger.warning(f"Job moved to dead letters: {event_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to dead-letter job: {e}")
+            await self.conn.rollback()
+            return False
+    
+    async def get_dead_letters(self, event_type=None, event_ids=None):
+        try:
+            query = "SELECT event_id, event_type, block_number, attempts, last_error, failed_at FROM dead_letters WHERE 1 = 1"
+            params = []
+            if event_type:
+                query += " AND event_type = ?"
+                params.append(event_type)
+            if event_ids:
+                query += f" AND event_id IN ({', '.join('?' * len(event_ids))})"
+                params.extend(event_ids)
+            async with self.conn.execute(query + " ORDER BY block_number", params) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        'event_id': row[0],
+                        'event_type': row[1],
+                        'block_number': row[2],
+                        'attempts': row[3],
+                        'last_error': row[4],
+                        'failed_at': row[5]
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            logger.error(f"Failed to get dead letters: {e}")
+            return []
+    
+    @timed_write
+    async def requeue_dead_letters(self, event_ids):
+        """Put dead-lettered jobs back on the queue with a fresh retry budget - returns the number requeued"""
+        try:
+            now = datetime.now()
+            requeued = 0
+            for event_id in event_ids:
+                cursor = await self.conn.execute('''
+                    INSERT INTO jobs 
+                    (event_id, event_type, transaction_hash, block_number, log_index, event_data, status, attempts, created_at, updated_at)
+                    SELECT event_id, event_type, transaction_hash, block_number, log_index, event_data, 'queued', 0, ?, ?
+                    FROM dead_letters WHERE event_id = ?
+                    ON CONFLICT(event_id) DO UPDATE SET
+                        status = 'queued', attempts = 0, next_attempt_at = excluded.updated_at, lease_owner = NULL,
+                        lease_expires_at = NULL, updated_at = excluded.updated_at
+                ''', (now, now, event_id))
+                await self.conn.execute("DELETE FROM dead_letters WHERE event_id = ?", (event_id,))
+                requeued += cursor.rowcount
+            await self.conn.commit()
+            return requeued
+        except Exception as e:
+            logger.error(f"Failed to requeue dead letters: {e}")
+            await self.conn.rollback()
+            return 0
+    
+    @timed_write
+    async def roll_back_events_from_block(self, block_number):
+        """Forget queued work from reorged blocks so the canonical logs are picked up again"""
+        try:
+            # Only jobs without on-chain side effects - leased jobs are in flight, done jobs already wrote
+            condition = "block_number >= ? AND status IN ('queued', 'retry')"
+            await self.conn.execute(
+                f"DELETE FROM event_steps WHERE event_id IN (SELECT event_id FROM jobs WHERE {condition})",
+                (block_number,)
+            )
+            await self.conn.execute(
+                f"DELETE FROM processed_events WHERE event_id IN (SELECT event_id FROM jobs WHERE {condition})",
+                (block_number,)
+            )
+            cursor = await self.conn.execute(f"DELETE FROM jobs WHERE {condition}", (block_number,))
+            await self.conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Failed to roll back events from block {block_number}: {e}")
+            await self.conn.rollback()
+            return 0
+    
+    async def count_jobs_by_status(self):
+        try:
+            async with self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status") as cursor:
+                rows = await cursor.fetchall()
+                return {row[0]: row[1] for row in rows}
+        except Exception as e:
+            logger.error(f"Failed to count jobs: {e}")
+            return {}
+    
+    @timed_write
+    async def record_event_step(self, event_id, step, result=None):
+        try:
+            await self.conn.execute(
+                "INSERT OR REPLACE INTO event_steps (event_id, step, result, completed_at) VALUES (?, ?, ?, ?)",
+                (event_id, step, result, datetime.now())
+            )
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to record event step: {e}")
+            await self.conn.rollback()
+            return False
+    
+    async def get_event_steps(self, event_id):
+        """Completed steps for an event as {step: result}"""
+        try:
+            async with self.conn.execute(
+                "SELECT step, result FROM event_steps WHERE event_id = ?",
+                (event_id,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return {row[0]: row[1] for row in rows}
+        except Exception as e:
+            logger.error(f"Failed to get event steps: {e}")
+            return {}
+    
+    async def save_trace_spans(self, records):
+        """Insert a batch of (trace_id, span_id, parent_id, name, started_at, duration_ms, status, attributes)"""
+        try:
+            await self.conn.executemany('''
+                INSERT OR IGNORE INTO trace_spans
+                (trace_id, span_id, parent_id, name, started_at, duration_ms, status, attributes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', records)
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save trace spans: {e}")
+            await self.conn.rollback()
+            return False
+    
+    async def delete_trace_spans_before(self, timestamp):
+        try:
+            cursor = await self.conn.execute("DELETE FROM trace_spans WHERE started_at < ?", (timestamp,))
+            await self.conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Failed to prune trace spans: {e}")
+            await self.conn.rollback()
+            return 0
+    
+    async def get_span_durations(self, since, event_type=None):
+        """(name, duration_ms) of spans started after the given unix timestamp, optionally for one event type"""
+        try:
+            query = "SELECT name, duration_ms FROM trace_spans WHERE started_at >= ?"
+            params = [since]
+            if event_type:
+                # Trace IDs are event IDs, which start with the event type
+                query += " AND trace_id LIKE ? ESCAPE '\\'"
+                params.append(f"{event_type}\\_%")
+            async with self.conn.execute(query, params) as cursor:
+                return await cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get span durations: {e}")
+            return []
+    
+    async def get_processed_events_page(self, event_types, statuses, after=None, limit=500,
+                                        from_block=None, to_block=None, since=None, until=None):
+        """Page of processed events ordered by (block_number, event_id), starting after the given pair"""
+        try:
+            query = (
+                "SELECT event_id, event_type, transaction_hash, block_number, event_data, status, processed_at "
+                f"FROM processed_events WHERE event_type IN ({', '.join('?' * len(event_types))}) "
+                f"AND status IN ({', '.join('?' * len(statuses))}) AND event_data IS NOT NULL"
+            )
+            params = list(event_types) + list(statuses)
+            for condition, value in (
+                ("(block_number, event_id) > (?, ?)", after),
+                ("block_number >= ?", from_block),
+                ("block_number <= ?", to_block),
+                ("processed_at >= ?", since),
+                ("processed_at <= ?", until)
+            ):
+                if value is not None:
+                    query += f" AND {condition}"
+                    params.extend(value if isinstance(value, tuple) else (value,))
+            query += " ORDER BY block_number, event_id LIMIT ?"
+            params.append(limit)
+            async with self.conn.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {
+                        'event_id': row[0],
+                        'event_type': row[1],
+                        'transaction_hash': row[2],
+                        'block_number': row[3],
+                        'event_data': row[4],
+                        'status': row[5],
+                        'processed_at': row[6]
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            logger.error(f"Failed to get processed events: {e}")
+            return []
+    
+    async def save_replay_results(self, records):
+        """Insert or replace a batch of (run_id, event_id, event_type, block_number, review_id, scenic_spot_id,
+        status, is_approved, summary_content, review_ids, result, replayed_at)"""
+        try:
+            await self.conn.executemany('''
+                INSERT OR REPLACE INTO replay_results
+                (run_id, event_id, event_type, block_number, review_id, scenic_spot_id,
+                 status, is_approved, summary_content, review_ids, result, replayed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', records)
+            await self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save replay results: {e}")
+            await self.conn.rollback()
+            return False
+    
+    async def get_replay_verdict_diff(self, run_id):
+        """(event_id, review_id, replayed is_approved, recorded is_approved or None) for a replay run's reviews"""
+        try:
+            async with self.conn.execute('''
+                SELECT r.event_id, r.review_id, r.is_approved, a.is_approved
+                FROM replay_results r LEFT JOIN review_audit a ON a.review_id = r.review_id
+                WHERE r.run_id = ? AND r.event_type = 'ReviewSubmitted' AND r.status = 'success'
+                ORDER BY r.block_number, r.event_id
+            ''', (run_id,)) as cursor:
+                return await cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get replay verdict diff: {e}")
+            return []
+    
+    async def get_replay_summary_diff(self, run_id):
+        """(event_id, scenic_spot_id, review_ids, replayed summary, latest cached summary of the same review set or None)"""
+        try:
+            async with self.conn.execute('''
+                SELECT r.event_id, r.scenic_spot_id, r.review_ids, r.summary_content, (
+                    SELECT c.summary_content FROM summary_cache c
+                    WHERE c.scenic_spot_id = r.scenic_spot_id AND c.review_ids = r.review_ids
+                    ORDER BY c.created_at DESC LIMIT 1
+                )
+                FROM replay_results r
+                WHERE r.run_id = ? AND r.event_type = 'SummaryUpdateRequired' AND r.status = 'success'
+                ORDER BY r.block_number, r.event_id
+            ''', (run_id,)) as cursor:
+                return await cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get replay summary diff: {e}")
+            return []
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+from src.config import Config
+from src.db_manager import DatabaseManager
+from src.business_logic import BusinessLogic
+from src.job_worker import retry_backoff, retry_handed_off_job
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredWriter:
+    """Drain low-priority tx-hash bookkeeping writes when the node is idle or on a timer"""
+    def __init__(self, config: Config, db_manager: DatabaseManager, business_logic: BusinessLogic,
+                 is_busy: Callable[[], bool] = lambda: False):
+        self.config = config
+        self.db_manager = db_manager
+        self.business_logic = business_logic
+        self.is_busy = is_busy  # True while moderation / summary work is in flight
+        self.idle_seconds = config.deferred_idle_seconds
+        self.max_interval_seconds = config.deferred_max_interval_seconds
+        self.batch_size = config.deferred_batch_size
+        self.max_attempts = max(0, config.max_retries) + 1  # Same budget as a job: the first try plus max_retries
+        self.retry_delay = config.retry_delay
+        self.retry_max_delay = config.retry_max_delay
+        self.handlers = {
+            "ReviewApproved": business_logic.process_review_approved,
+            "SummaryGenerated": business_logic.process_summary_generated
+        }
+        self.running = False
+        self._drain_lock = asyncio.Lock()  # The run loop and the summary scheduler both drain
+
+    async def defer(self, event_id, event_type, transaction_hash, block_number, event_data):
+        """Queue a bookkeeping event instead of processing it inline"""
+        await self.db_manager.enqueue_deferred_write(event_id, event_type, transaction_hash, block_number, json.dumps(event_data))
+        await self.db_manager.mark_event_as_processed(
+            event_id=event_id,
+            event_type=event_type,
+            transaction_hash=transaction_hash,
+            block_number=block_number,
+            event_data=json.dumps(event_data),
+            status='deferred'
+        )
+
+    async def run(self):
+        """Drain loop - runs after idle_seconds without main work, or at least every max_interval_seconds"""
+        self.running = True
+        logger.info("Deferred writer started (idle: %ss, max interval: %ss)", self.idle_seconds, self.max_interval_seconds)
+
+        last_drain = time.monotonic()
+        idle_since = None
+        while self.running:
+            try:
+                await asyncio.sleep(0.5)
+                now = time.monotonic()
+
+                if self.is_busy():
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = now
+
+                idle_long_enough = idle_since is not None and now - idle_since >= self.idle_seconds
+                overdue = now - last_drain >= self.max_interval_seconds
+                if not (idle_long_enough or overdue):
+                    continue
+
+                drained = await self.drain()
+                last_drain = time.monotonic()
+                if drained:
+                    # Give main work a chance to arrive before the next batch
+                    idle_since = None
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in deferred writer: {e}")
+                await asyncio.sleep(1)
+
+        logger.info("Deferred writer stopped")
+
+    async def drain(self, due_only=True):
+        """Process one batch of pending writes concurrently so the tx batcher can merge them -
+        due_only=False also takes writes still backing off after a failure"""
+        async with self._drain_lock:
+            rows = await self.db_manager.get_pending_deferred_writes(self.batch_size, due_only)
+            if not rows:
+                return 0
+
+            logger.info("Draining %s deferred writes", len(rows))
+            await asyncio.gather(*(self._process(row) for row in rows))
+            return len(rows)
+
+    async def _process(self, row):
+        event_id = row['event_id']
+        event_type = row['event_type']
+        event_data = json.loads(row['event_data'])
+        attempts = row['attempts'] + 1
+
+        handler = self.handlers.get(event_type)
+        if handler is None:
+            success, result = False, f"No deferred handler for {event_type}"
+        else:
+            success, result = await handler(event_data)
+
+        next_attempt_at = None
+        if success:
+            status = 'done'
+        elif attempts >= self.max_attempts:
+            status = 'failed'
+        else:
+            status = 'pending'
+            # Same backoff as the job queue, so a failing write is not re-sent on every drain
+            next_attempt_at = datetime.now() + timedelta(seconds=retry_backoff(attempts, self.retry_delay, self.retry_max_delay))
+        await self.db_manager.update_deferred_write(event_id, status, attempts, str(result), next_attempt_at)
+
+        if status != 'pending':
+            await self.db_manager.mark_event_as_processed(
+                event_id=event_id,
+                event_type=event_type,
+                transaction_hash=row['transaction_hash'],
+                block_number=row['block_number'],
+                event_data=row['event_data'],
+                status='success' if success else 'failed',
+                result=str(result)
+            )
+        logger.info("Deferred write %s: %s (attempt %s/%s)", event_id, status, attempts, self.max_attempts)
+        if status == 'failed':
+            # Out of retries - dead-letter the job so it shows up in `cli.py dead-letters` and can be requeued
+            await retry_handed_off_job(self.db_manager, self.config, event_id, event_type, result, attempts)
+
+    async def stop(self):
+        self.running = False
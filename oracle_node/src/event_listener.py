@@ -1,46 +1,66 @@
 import logging
 import asyncio
-import json
-from web3 import AsyncWeb3, Web3
+from eth_utils import event_abi_to_log_topic
+from web3 import AsyncWeb3, Web3, WebSocketProvider
 from src.config import Config
 from src.db_manager import DatabaseManager
-from src.business_logic import BusinessLogic
+from src.adaptive_poller import AdaptivePoller
+from src.finality import FinalityTracker
+from src.rpc_pool import RpcProviderPool, AsyncPooledHTTPProvider
+from src.job_worker import JobWorkerPool
+from src.web3_manager import load_contract_abi
+from src.metrics import BLOCK_LAG
+from src.tracing import span
+from src.logging_setup import log_payload
 
 logger = logging.getLogger(__name__)
 
 class EventListener:
-    def __init__(self, config: Config, db_manager: DatabaseManager, business_logic: BusinessLogic):
+    def __init__(self, config: Config, db_manager: DatabaseManager, job_pool: JobWorkerPool,
+                 rpc_pool: RpcProviderPool = None, abi=None):
         self.config = config
+        self.rpc_pool = rpc_pool or RpcProviderPool(config)
+        self.abi = abi  # Parsed contract ABI, shared with Web3Manager when passed in
         self.db_manager = db_manager
-        self.business_logic = business_logic
+        self.job_pool = job_pool  # Decoded events are queued here and processed by workers
         self.web3 = None
         self.contract = None
         self.listening = False
         self.reconnect_delay = 5  # seconds
         self.max_reconnect_attempts = 10
         self.filters = []  # Used to store all filters
+        self.finality = None
+        self.last_seen_block = None  # Highest block whose logs were queued by the WebSocket listener
+        self.unconfirmed_logs = {}  # (tx hash, log index) => decoded log waiting for confirmations
+        self.subscription_task = None
+        self._stop_requested = asyncio.Event()  # Cuts poll and reconnect sleeps short on shutdown
+        self._stopped = asyncio.Event()  # Set while start_listening is not running
+        self._stopped.set()
     
     async def connect(self):
         try:
             # Create async Web3 connection
-            self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(self.config.rpc_url))
+            self.web3 = AsyncWeb3(AsyncPooledHTTPProvider(self.rpc_pool))
             
             # Check connection
             if not await self.web3.is_connected():
                 raise Exception("Failed to connect to RPC endpoint")
             
-            logger.info(f"Connected to blockchain (async): {self.config.rpc_url}")
+            logger.info("Connected to blockchain (async): %s", ', '.join(self.config.rpc_urls))
             
             # Load contract
-            with open(self.config.abi_path, 'r') as f:
-                abi = f.read()
+            if self.abi is None:
+                self.abi = load_contract_abi(self.config.abi_path)
             
             self.contract = self.web3.eth.contract(
                 address=Web3.to_checksum_address(self.config.scenic_review_system_address),
-                abi=abi
+                abi=self.abi
             )
             
-            logger.info(f"Contract loaded (async): {self.config.scenic_review_system_address}")
+            logger.info("Contract loaded (async): %s", self.config.scenic_review_system_address)
+            
+            # Only logs below the safe head are dispatched; reorgs above the window are rolled back
+            self.finality = FinalityTracker(self.config, self.db_manager, self.web3)
             
             return True
             
@@ -50,105 +70,281 @@ class EventListener:
     
     async def start_listening(self):
         self.listening = True
+        self._stop_requested.clear()
+        self._stopped.clear()
+        try:
+            await self._listen()
+        finally:
+            self._stopped.set()
+    
+    async def _listen(self):
         reconnect_attempts = 0
         
-        while self.listening and reconnect_attempts < self.max_reconnect_attempts:
+        # Never give up - the RPC pool fails over between endpoints, and an outage of all of them
+        # is retried with a capped backoff until it clears
+        while self.listening:
             try:
                 if not await self.web3.is_connected():
                     logger.warning("Blockchain connection lost, attempting to reconnect...")
                     if not await self.connect():
                         reconnect_attempts += 1
-                        await asyncio.sleep(self.reconnect_delay)
+                        await self._sleep(self._reconnect_backoff(reconnect_attempts))
                         continue
                     reconnect_attempts = 0
                 
                 # Get latest block number
                 current_block = await self.web3.eth.block_number
-                logger.info(f"Current block: {current_block}")
-                
-                # Use concurrent tasks to start all event listeners
-                tasks = []
+                logger.info("Current block: %s", current_block)
                 
                 # Calculate from which block to start listening (use a larger range to ensure previous events are captured)
                 from_block = max(0, current_block - 500)  # Start listening from the most recent 500 blocks
                 
-                # Listen for ReviewSubmitted events
-                logger.info("Starting to listen for ReviewSubmitted events...")
-                tasks.append(asyncio.create_task(self._listen_for_events(
-                    self.contract.events.ReviewSubmitted,
-                    from_block,  # Start listening from earlier blocks to ensure previous events are captured
-                    self._handle_review_submitted
-                )))
-                
-                # Listen for SummaryUpdateRequired events
-                logger.info("Starting to listen for SummaryUpdateRequired events...")
-                tasks.append(asyncio.create_task(self._listen_for_events(
-                    self.contract.events.SummaryUpdateRequired,
-                    from_block,
-                    self._handle_summary_update_required
-                )))
-                
-                # Listen for ReviewApproved events
-                logger.info("Starting to listen for ReviewApproved events...")
-                tasks.append(asyncio.create_task(self._listen_for_events(
-                    self.contract.events.ReviewApproved,
-                    from_block,
-                    self._handle_review_approved
-                )))
-                
-                # Listen for SummaryGenerated events
-                logger.info("Starting to listen for SummaryGenerated events...")
-                tasks.append(asyncio.create_task(self._listen_for_events(
-                    self.contract.events.SummaryGenerated,
-                    from_block,
-                    self._handle_summary_generated
-                )))
+                # Push-based ingestion - logs arrive about one block after they are mined
+                if self.config.listener_mode != "polling" and self.config.websocket_url:
+                    if await self._listen_websocket(from_block):
+                        continue
+                    logger.warning("WebSocket log subscription unavailable, falling back to polling")
                 
-                # Wait for all tasks to complete (this will never happen as they are infinite loops)
-                # But we will stop them when self.listening becomes False
-                await asyncio.gather(*tasks, return_exceptions=True)
+                await self._listen_polling(from_block)
                 
             except Exception as e:
                 logger.error(f"Error in event listener: {e}")
                 reconnect_attempts += 1
-                await asyncio.sleep(self.reconnect_delay)
+                await self._sleep(self._reconnect_backoff(reconnect_attempts))
+    
+    async def _sleep(self, delay):
+        """Sleep for delay seconds, or until stop_listening is called"""
+        try:
+            await asyncio.wait_for(self._stop_requested.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+    
+    def _reconnect_backoff(self, attempts):
+        if attempts == self.max_reconnect_attempts:
+            logger.critical(f"{attempts} reconnection attempts failed, still retrying: {self.rpc_pool.snapshot()}")
+        return min(self.reconnect_delay * 2 ** min(attempts - 1, 6), 120)
+    
+    async def _listen_polling(self, from_block):
+        """Poll each event type with eth_getLogs"""
+        # Use concurrent tasks to start all event listeners
+        tasks = []
+        
+        # Listen for ReviewSubmitted events
+        logger.info("Starting to listen for ReviewSubmitted events...")
+        tasks.append(asyncio.create_task(self._listen_for_events(
+            self.contract.events.ReviewSubmitted,
+            from_block,  # Start listening from earlier blocks to ensure previous events are captured
+            self._handle_review_submitted
+        )))
+        
+        # Listen for SummaryUpdateRequired events
+        logger.info("Starting to listen for SummaryUpdateRequired events...")
+        tasks.append(asyncio.create_task(self._listen_for_events(
+            self.contract.events.SummaryUpdateRequired,
+            from_block,
+            self._handle_summary_update_required
+        )))
+        
+        # Listen for ReviewApproved events
+        logger.info("Starting to listen for ReviewApproved events...")
+        tasks.append(asyncio.create_task(self._listen_for_events(
+            self.contract.events.ReviewApproved,
+            from_block,
+            self._handle_review_approved
+        )))
+        
+        # Listen for SummaryGenerated events
+        logger.info("Starting to listen for SummaryGenerated events...")
+        tasks.append(asyncio.create_task(self._listen_for_events(
+            self.contract.events.SummaryGenerated,
+            from_block,
+            self._handle_summary_generated
+        )))
+        
+        # Wait for all tasks to complete (this will never happen as they are infinite loops)
+        # But we will stop them when self.listening becomes False
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _event_routes(self):
+        """topic0 => (contract event, handler) for every event the node consumes"""
+        routes = {}
+        for event, handler in (
+            (self.contract.events.ReviewSubmitted, self._handle_review_submitted),
+            (self.contract.events.SummaryUpdateRequired, self._handle_summary_update_required),
+            (self.contract.events.ReviewApproved, self._handle_review_approved),
+            (self.contract.events.SummaryGenerated, self._handle_summary_generated)
+        ):
+            routes[event_abi_to_log_topic(event.abi)] = (event, handler)
+        return routes
+    
+    async def _listen_websocket(self, from_block):
+        """Subscribe to contract logs over WebSocket, reconnecting and backfilling gaps over HTTP"""
+        # Returns True once listening stops, False if the endpoint cannot serve log subscriptions
+        routes = self._event_routes()
+        address = Web3.to_checksum_address(self.config.scenic_review_system_address)
+        self.last_seen_block = from_block - 1
+        self.unconfirmed_logs = {}
+        failures = 0
+        
+        while self.listening:
+            try:
+                async with AsyncWeb3(WebSocketProvider(self.config.websocket_url)) as ws_web3:
+                    try:
+                        log_subscription = await ws_web3.eth.subscribe("logs", {"address": address})
+                        # New heads release buffered logs once they are deep enough
+                        head_subscription = await ws_web3.eth.subscribe("newHeads")
+                    except Exception as e:
+                        logger.warning(f"WebSocket endpoint rejected log subscription: {e}")
+                        return False
+                    logger.info("Subscribed to contract logs via %s (subscription: %s)", self.config.websocket_url, log_subscription)
+                    failures = 0
+                    
+                    # Subscribe first, then backfill - the overlap is harmless because queueing is idempotent
+                    await self._backfill(routes, self.last_seen_block + 1)
+                    
+                    # Run as a task so stop_listening can interrupt a quiet subscription
+                    self.subscription_task = asyncio.create_task(
+                        self._consume_subscription(ws_web3, routes, head_subscription)
+                    )
+                    try:
+                        await self.subscription_task
+                    except asyncio.CancelledError:
+                        if self.listening:
+                            raise
+                    finally:
+                        self.subscription_task = None
+                
+            except Exception as e:
+                failures += 1
+                if failures >= self.max_reconnect_attempts:
+                    logger.error(f"WebSocket listener failed {failures} times in a row: {e}")
+                    return False
+                delay = min(self.reconnect_delay * 2 ** (failures - 1), 60)
+                logger.warning(f"WebSocket connection lost ({e}), reconnecting in {delay}s")
+                await self._sleep(delay)
+        
+        return True
+    
+    async def _consume_subscription(self, ws_web3, routes, head_subscription):
+        async for message in ws_web3.socket.process_subscriptions():
+            if message["subscription"] == head_subscription:
+                await self._on_new_head(routes, message["result"]["number"])
+            else:
+                await self._route_log(message["result"], routes)
+        raise ConnectionError("WebSocket subscription stream ended")
+    
+    async def _on_new_head(self, routes, block_number):
+        generation = self.finality.generation
+        await self.finality.refresh(block_number)
+        if self.finality.generation != generation:
+            # Reorg below the safe head - forget buffered logs from the fork and re-read the canonical ones
+            fork_block = self.finality.fork_block
+            self.unconfirmed_logs = {
+                key: log for key, log in self.unconfirmed_logs.items() if log.blockNumber < fork_block
+            }
+            self.last_seen_block = min(self.last_seen_block, fork_block - 1)
+            await self._backfill(routes, self.last_seen_block + 1)
+        else:
+            await self._release_confirmed_logs(routes)
+        for event, _ in routes.values():
+            BLOCK_LAG.set(max(0, block_number - self.last_seen_block), event_type=event.event_name)
+    
+    async def _backfill(self, routes, from_block):
+        """Fetch logs from from_block to the chain head over HTTP, in block_batch_size chunks"""
+        current_block = await self.web3.eth.block_number
+        await self.finality.refresh(current_block)
+        if from_block <= current_block:
+            logger.info("Backfilling logs from block %s to %s", from_block, current_block)
         
-        if reconnect_attempts >= self.max_reconnect_attempts:
-            logger.critical("Max reconnection attempts reached, event listener stopped")
+        for chunk_start in range(from_block, current_block + 1, self.config.block_batch_size):
+            chunk_end = min(chunk_start + self.config.block_batch_size - 1, current_block)
+            for event, _ in routes.values():
+                for log in await event.get_logs(from_block=chunk_start, to_block=chunk_end):
+                    self.unconfirmed_logs[(bytes(log.transactionHash), log.logIndex)] = log
+        await self._release_confirmed_logs(routes)
+    
+    async def _route_log(self, log, routes):
+        """Decode a raw subscription log and hold it until it is deep enough to dispatch"""
+        if log.get("removed"):
+            # Dropped by a reorg before we dispatched it
+            self.unconfirmed_logs = {
+                key: pending for key, pending in self.unconfirmed_logs.items()
+                if not (pending.blockHash == log["blockHash"] and pending.logIndex == log["logIndex"])
+            }
+            logger.warning(f"Discarded log removed by reorg in block {log['blockNumber']}")
+            return
+        route = routes.get(bytes(log["topics"][0])) if log["topics"] else None
+        if route is None:
+            return  # Not an event the node consumes
+        event, _ = route
+        decoded = event().process_log(log)
+        self.unconfirmed_logs[(bytes(decoded.transactionHash), decoded.logIndex)] = decoded
+        await self._release_confirmed_logs(routes)
+    
+    async def _release_confirmed_logs(self, routes):
+        """Queue buffered logs at or below the safe head, in chain order"""
+        safe_head = self.finality.safe_head
+        if safe_head is None:
+            return
+        handlers = {event.event_name: handler for event, handler in routes.values()}
+        confirmed = sorted(
+            (key for key, log in self.unconfirmed_logs.items() if log.blockNumber <= safe_head),
+            key=lambda key: (self.unconfirmed_logs[key].blockNumber, self.unconfirmed_logs[key].logIndex)
+        )
+        for key in confirmed:
+            log = self.unconfirmed_logs.pop(key)
+            await handlers[log.event](log)
+        self.last_seen_block = max(self.last_seen_block, safe_head)
     
     async def stop_listening(self):
+        """Stop listening and wait for the listen loop to exit, so no handler queues events after this returns"""
         self.listening = False
+        self._stop_requested.set()
+        if self.subscription_task:
+            self.subscription_task.cancel()
+        await self._stopped.wait()
         logger.info("Event listener stopped")
     
     async def _listen_for_events(self, event, from_block, handler):
         try:
-            # Get historical events
-            events = await event.get_logs(from_block=from_block)
-            logger.info(f"Found {len(events)} historical {event.event_name} events")
+            # Get historical events up to the safe head - newer logs wait for confirmations
+            safe_head = await self.finality.refresh(await self.web3.eth.block_number)
+            events = await event.get_logs(from_block=from_block, to_block=safe_head) if safe_head >= from_block else []
+            logger.info("Found %s historical %s events", len(events), event.event_name)
             
-            # Process historical events
+            # Queue historical events
             for evt in events:
                 await handler(evt)
             
             # Use polling mechanism to listen for new events (because Mantle Sepolia RPC doesn't support persistent filters)
-            logger.info(f"Starting to poll for {event.event_name} events from block {from_block}")
+            logger.info("Starting to poll for %s events from block %s", event.event_name, from_block)
+            
+            # Poll right after the next block is expected, loop while behind, back off on errors
+            poller = AdaptivePoller(
+                initial_interval=self.config.poll_initial_interval,
+                min_delay=self.config.poll_min_interval,
+                max_delay=self.config.poll_max_interval
+            )
             
-            last_processed_block = from_block
+            last_processed_block = max(from_block - 1, safe_head)
+            generation = self.finality.generation
             while self.listening:
+                backlog = False
                 try:
                     # Get latest block number
                     current_block = await self.web3.eth.block_number
+                    poller.observe_block(current_block)
                     
-                    if current_block > last_processed_block:
-                        # Ensure from_block is not greater than to_block
+                    # Highest block with enough confirmations; a detected reorg rewinds our cursor
+                    safe_head = await self.finality.refresh(current_block)
+                    if self.finality.generation != generation:
+                        generation = self.finality.generation
+                        last_processed_block = min(last_processed_block, self.finality.fork_block - 1)
+                    
+                    if safe_head > last_processed_block:
+                        # Catch up in block_batch_size ranges when far behind
                         query_from_block = last_processed_block + 1
-                        query_to_block = current_block
-                        
-                        if query_from_block > query_to_block:
-                            logger.warning(f"Invalid block range: from_block={query_from_block} > to_block={query_to_block}")
-                            last_processed_block = current_block
-                            await asyncio.sleep(5)
-                            continue
+                        query_to_block = min(safe_head, last_processed_block + self.config.block_batch_size)
                         
                         # Get events in new blocks, add error handling
                         try:
@@ -156,289 +352,84 @@ class EventListener:
                                 from_block=query_from_block,
                                 to_block=query_to_block
                             )
-                            logger.debug(f"Found {len(new_events)} new {event.event_name} events in blocks {query_from_block} to {query_to_block}")
+                            logger.debug("Found %s new %s events in blocks %s to %s", len(new_events), event.event_name, query_from_block, query_to_block)
                             
-                            # Process new events
+                            # Queue new events
                             for evt in new_events:
                                 await handler(evt)
                             
-                            last_processed_block = current_block
+                            last_processed_block = query_to_block
                         except Exception as e:
                             # Handle "block not found" and "invalid block range params" errors
                             error_msg = str(e)
                             if "block not found" in error_msg or "invalid block range params" in error_msg:
                                 logger.warning(f"Block range error, adjusting: {error_msg}")
-                                # Only process up to the current latest block
-                                last_processed_block = current_block
+                                # Only process up to the current safe block
+                                last_processed_block = safe_head
                             else:
                                 # Other errors, re-raise
                                 raise
+                        
+                        backlog = last_processed_block < safe_head
                     
-                    # Check for new blocks every 5 seconds
-                    await asyncio.sleep(5)
+                    BLOCK_LAG.set(max(0, current_block - last_processed_block), event_type=event.event_name)
                     
                 except Exception as e:
                     logger.error(f"Error polling for {event.event_name} events: {e}")
-                    # Continue after a brief pause
-                    await asyncio.sleep(1)
+                    poller.observe_error()
+                
+                await self._sleep(poller.next_delay(backlog))
                 
         except Exception as e:
             logger.error(f"Error listening for {event.event_name} events: {e}")
     
-    async def _handle_review_submitted(self, event):
+    async def _enqueue(self, event, event_name, event_data):
+        """Durably queue a decoded event for the worker pool - processing happens off the polling loop"""
         try:
-            # Event name is fixed as ReviewSubmitted
-            event_name = "ReviewSubmitted"
-            
             # Generate unique event ID
             event_id = f"{event_name}_{event.transactionHash.hex()}_{event.logIndex}"
-            
-            # Print event processing start log, regardless of whether it has been processed before
-            logger.info(f"Starting to process ReviewSubmitted event: {event_id}")
-            
-            # Check if it has been processed
-            if await self.db_manager.is_event_processed(event_id):
-                logger.info(f"Event already processed, skipping: {event_id}")
-                return
-            
-            logger.info(f"Processing ReviewSubmitted event: {event_id}")
-            
-            # Print the structure of the event object to understand the actual property names
-            logger.info(f"Event args: {dir(event.args)}")
-            logger.info(f"Event args dict: {event.args.__dict__}")
-            
-            # Extract directly available properties from the event
-            review_id = event.args.reviewId
-            scenic_id = event.args.scenicId
-            user = event.args.user
-            
-            # Call the contract's getReview method to get the complete review information
-            logger.info(f"Calling getReview for review_id: {review_id}")
-            try:
-                # Execute synchronous method in a separate thread to avoid blocking the async event loop
-                review = await asyncio.to_thread(self.business_logic.web3_manager.get_review_by_id, review_id)
-                logger.info(f"Review details: {review}")
-                
-                # Extract complete review information
-                if review is not None:
-                    content = review[2]  # Review struct: (user, scenicId, content, rating, status, rewarded, timestamp, submitTxHash, approveTxHash)
-                    rating = review[3]
-                    timestamp = review[6]
-                    
-                    # Ensure content is a string type, handle bytes type case
-                    if isinstance(content, bytes):
-                        content = content.decode('utf-8')
-                        
-                    logger.info(f"Extracted content: '{content}', rating: {rating}, timestamp: {timestamp}")
-                else:
-                    logger.error(f"get_review_by_id returned None for review_id: {review_id}")
-                    # If the retrieval fails, use default values
-                    content = ''
-                    rating = 0
-                    timestamp = 0
-                    logger.info(f"Using default values: content: '{content}', rating: {rating}, timestamp: {timestamp}")
-            except Exception as e:
-                logger.error(f"Failed to get review details: {e}")
-                # If retrieval fails, use default values
-                content = ''
-                rating = 0
-                timestamp = 0
-                logger.info(f"Using default values due to error: content: '{content}', rating: {rating}, timestamp: {timestamp}")
-            
-            # Build complete event data
-            event_data = {
-                'reviewId': review_id,
-                'scenicSpotId': scenic_id,
-                'user': user,
-                'content': content,
-                'rating': rating,
-                'submittedAt': timestamp,
-                'transaction_hash': event.transactionHash.hex()  # Add transaction hash
-            }
-            
-            # Record the event as processing
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status='processing'
-            )
-            
-            # Process business logic
-            success, result = await self.business_logic.process_review_submitted(event_data)
-            
-            # Update event status
-            status = 'success' if success else 'failed'
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,  # Fix: Use the previously defined event_name variable
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status=status,
-                result=str(result)
-            )
-            
-            logger.info(f"Processed ReviewSubmitted event: {event_id}, status: {status}")
-            
+            log_payload(logger, f"{event_name} event args", dict(event.args))
+            
+            with span("detect", trace_id=event_id, block_number=event.blockNumber):
+                await self.job_pool.enqueue(
+                    event_id=event_id,
+                    event_type=event_name,
+                    transaction_hash=event.transactionHash.hex(),
+                    block_number=event.blockNumber,
+                    log_index=event.logIndex,
+                    event_data=event_data
+                )
         except Exception as e:
-            logger.error(f"Error handling ReviewSubmitted event: {e}")
+            logger.error(f"Error queueing {event_name} event: {e}")
+    
+    async def _handle_review_submitted(self, event):
+        # Review content is fetched by the worker, keeping ingestion free of extra RPC calls
+        await self._enqueue(event, "ReviewSubmitted", {
+            'reviewId': event.args.reviewId,
+            'scenicSpotId': event.args.scenicId,
+            'user': event.args.user,
+            'transaction_hash': event.transactionHash.hex()  # Add transaction hash
+        })
     
     async def _handle_summary_update_required(self, event):
-        try:
-            # Event name is fixed as SummaryUpdateRequired
-            event_name = "SummaryUpdateRequired"
-            
-            # Generate unique event ID
-            event_id = f"{event_name}_{event.transactionHash.hex()}_{event.logIndex}"
-            
-            # Check if it has been processed
-            if await self.db_manager.is_event_processed(event_id):
-                logger.info(f"Event already processed: {event_id}")
-                return
-            
-            logger.info(f"Processing SummaryUpdateRequired event: {event_id}")
-            
-            # Extract event data
-            event_data = {
-                'scenicSpotId': event.args.scenicId,
-                'fromReviewIndex': event.args.fromReviewIndex,
-                'toReviewIndex': event.args.toReviewIndex,
-                'currentLastReviewIndex': event.args.currentLastReviewIndex
-            }
-            
-            # Record the event as processing
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status='processing'
-            )
-            
-            # Process business logic
-            success, result = await self.business_logic.process_summary_update_required(event_data)
-            
-            # Update event status
-            status = 'success' if success else 'failed'
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status=status,
-                result=str(result)
-            )
-            
-            logger.info(f"Processed SummaryUpdateRequired event: {event_id}, status: {status}")
-            
-        except Exception as e:
-            logger.error(f"Error handling SummaryUpdateRequired event: {e}")
+        await self._enqueue(event, "SummaryUpdateRequired", {
+            'scenicSpotId': event.args.scenicId,
+            'fromReviewIndex': event.args.fromReviewIndex,
+            'toReviewIndex': event.args.toReviewIndex,
+            'currentLastReviewIndex': event.args.currentLastReviewIndex,
+            'transaction_hash': event.transactionHash.hex()  # Same transaction as the approval at toReviewIndex
+        })
     
     async def _handle_review_approved(self, event):
-        try:
-            # Event name is fixed as ReviewApproved
-            event_name = "ReviewApproved"
-            
-            # Generate unique event ID
-            event_id = f"{event_name}_{event.transactionHash.hex()}_{event.logIndex}"
-            
-            # Check if it has been processed
-            if await self.db_manager.is_event_processed(event_id):
-                logger.debug(f"Event already processed: {event_id}")
-                return
-            
-            logger.info(f"Processing ReviewApproved event: {event_id}")
-            
-            # Extract event data - only access properties that actually exist in the event
-            # ReviewApproved event only contains reviewId and approved properties
-            event_data = {
-                'reviewId': event.args.reviewId,
-                'isApproved': event.args.approved,  # Use the correct property name 'approved'
-                'transaction_hash': event.transactionHash.hex()  # Add transaction hash
-            }
-            
-            # Record the event as processing
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status='processing'
-            )
-            
-            # Process business logic
-            success, result = await self.business_logic.process_review_approved(event_data)
-            
-            # Update event status
-            status = 'success' if success else 'failed'
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status=status,
-                result=str(result)
-            )
-            
-            logger.info(f"Processed ReviewApproved event: {event_id}, status: {status}")
-            
-        except Exception as e:
-            logger.error(f"Error handling ReviewApproved event: {e}")
+        # ReviewApproved event only contains reviewId and approved properties
+        await self._enqueue(event, "ReviewApproved", {
+            'reviewId': event.args.reviewId,
+            'isApproved': event.args.approved,  # Use the correct property name 'approved'
+            'transaction_hash': event.transactionHash.hex()  # Add transaction hash
+        })
     
     async def _handle_summary_generated(self, event):
-        try:
-            # Event name is fixed as SummaryGenerated
-            event_name = "SummaryGenerated"
-            
-            # Generate unique event ID
-            event_id = f"{event_name}_{event.transactionHash.hex()}_{event.logIndex}"
-            
-            # Check if it has been processed
-            if await self.db_manager.is_event_processed(event_id):
-                logger.debug(f"Event already processed: {event_id}")
-                return
-            
-            logger.info(f"Processing SummaryGenerated event: {event_id}")
-            
-            # Extract event data
-            event_data = {
-                'scenicSpotId': event.args.scenicId,
-                'transaction_hash': event.transactionHash.hex()  # Add transaction hash
-            }
-            
-            # Record the event as processing
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status='processing'
-            )
-            
-            # Process business logic
-            success, result = await self.business_logic.process_summary_generated(event_data)
-            
-            # Update event status
-            status = 'success' if success else 'failed'
-            await self.db_manager.mark_event_as_processed(
-                event_id=event_id,
-                event_type=event_name,
-                transaction_hash=event.transactionHash.hex(),
-                block_number=event.blockNumber,
-                event_data=json.dumps(event_data),
-                status=status,
-                result=str(result)
-            )
-            
-            logger.info(f"Processed SummaryGenerated event: {event_id}, status: {status}")
-            
-        except Exception as e:
-            logger.error(f"Error handling SummaryGenerated event: {e}")
+        await self._enqueue(event, "SummaryGenerated", {
+            'scenicSpotId': event.args.scenicId,
+            'transaction_hash': event.transactionHash.hex()  # Add transaction hash
+        })
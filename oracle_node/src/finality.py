@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional
+from src.config import Config
+from src.db_manager import DatabaseManager
+from src.metrics import CHAIN_HEAD_BLOCK, SAFE_HEAD_BLOCK
+
+logger = logging.getLogger(__name__)
+
+
+class FinalityTracker:
+    """Decide which blocks are safe to dispatch and detect reorgs below that point"""
+    def __init__(self, config: Config, db_manager: DatabaseManager, web3):
+        self.config = config
+        self.db_manager = db_manager
+        self.web3 = web3
+        self.confirmation_depth = max(0, config.confirmation_depth)
+        self.use_finalized = config.use_finalized_tag
+        self.window_size = max(2, config.reorg_window_size)
+        self.block_hashes = OrderedDict()  # block number => hash, oldest first
+        self.safe_head: Optional[int] = None
+        self.generation = 0  # Bumped on every detected reorg
+        self.fork_block: Optional[int] = None  # First block to re-scan after the latest reorg
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, latest_block: int) -> int:
+        """Advance the safe head for a newly seen chain head - returns the highest dispatchable block"""
+        async with self._lock:
+            CHAIN_HEAD_BLOCK.set(latest_block)
+            safe_head = await self._safe_head(latest_block)
+            SAFE_HEAD_BLOCK.set(safe_head)
+            if safe_head == self.safe_head:
+                return safe_head
+
+            fork_block = await self._find_fork()
+            if fork_block is not None:
+                await self._roll_back(fork_block)
+
+            block = await self.web3.eth.get_block(safe_head)
+            self.block_hashes[safe_head] = bytes(block['hash'])
+            while len(self.block_hashes) > self.window_size:
+                self.block_hashes.popitem(last=False)
+            self.safe_head = safe_head
+            return safe_head
+
+    async def _safe_head(self, latest_block: int) -> int:
+        if self.use_finalized:
+            try:
+                block = await self.web3.eth.get_block('finalized')
+                return block['number']
+            except Exception as e:
+                logger.warning(f"'finalized' block tag not supported, using confirmation depth {self.confirmation_depth}: {e}")
+                self.use_finalized = False
+        return max(0, latest_block - self.confirmation_depth)
+
+    async def _find_fork(self) -> Optional[int]:
+        """Compare recorded hashes with the chain, newest first - returns the first block to re-scan, or None"""
+        if not self.block_hashes:
+            return None
+        fork_block = None
+        for block_number, block_hash in reversed(self.block_hashes.items()):
+            block = await self.web3.eth.get_block(block_number)
+            if bytes(block['hash']) == block_hash:
+                return fork_block
+            fork_block = block_number
+        logger.critical(f"Reorg deeper than the {len(self.block_hashes)}-entry hash window, re-scanning from block {fork_block}")
+        return fork_block
+
+    async def _roll_back(self, fork_block: int):
+        logger.warning(f"Chain reorganization detected, rolling back to block {fork_block}")
+        for block_number in [number for number in self.block_hashes if number >= fork_block]:
+            del self.block_hashes[block_number]
+        rolled_back = await self.db_manager.roll_back_events_from_block(fork_block)
+        if rolled_back:
+            logger.warning(f"Rolled back {rolled_back} queued events from block {fork_block} onwards")
+        self.fork_block = fork_block
+        self.generation += 1
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from src.config import Config
+from src.db_manager import DatabaseManager
+from src.business_logic import BusinessLogic
+from src.metrics import EVENTS_TOTAL, JOBS_BY_STATUS
+from src.tracing import TRACER, span
+from src.logging_setup import log_payload
+from src.summary_input_builder import REVIEW_CONTENT_INDEX, REVIEW_RATING_INDEX, REVIEW_TIMESTAMP_INDEX
+
+logger = logging.getLogger(__name__)
+
+
+def retry_backoff(attempts, base_delay, max_delay):
+    """Exponential backoff with jitter - half the delay is fixed, half random, so retries spread out"""
+    delay = min(max_delay, base_delay * 2 ** max(0, attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def retry_handed_off_job(db_manager: DatabaseManager, config: Config, event_id, event_type, result, attempts=None):
+    """Retry or dead-letter a job that was acked after handing its work off, once that work fails
+
+    The summary scheduler and the deferred writer finish jobs after the worker acked them, so their
+    failures go through the same backoff and dead letters as jobs that fail inline.
+    """
+    job_attempts = await db_manager.get_job_attempts(event_id)
+    if job_attempts is None:
+        logger.error(f"No job found for failed {event_type} event {event_id}: {result}")
+        return
+    attempts = attempts or job_attempts
+    max_retries = max(0, config.max_retries)
+    if attempts <= max_retries:
+        EVENTS_TOTAL.inc(event_type=event_type, outcome='retried')
+        delay = retry_backoff(attempts, config.retry_delay, config.retry_max_delay)
+        logger.warning(f"Job {event_id} failed (attempt {attempts}/{max_retries + 1}), retrying in {delay:.1f}s: {result}")
+        await db_manager.schedule_job_retry(event_id, None, datetime.now() + timedelta(seconds=delay), str(result))
+    else:
+        EVENTS_TOTAL.inc(event_type=event_type, outcome='dead_lettered')
+        logger.error(f"Job {event_id} failed after {attempts} attempts: {result}")
+        await db_manager.dead_letter_job(event_id, None, str(result), attempts)
+
+
+class JobWorkerPool:
+    """Async workers that lease queued events from the jobs table and run the matching business logic"""
+    def __init__(self, config: Config, db_manager: DatabaseManager, business_logic: BusinessLogic,
+                 summary_scheduler=None, deferred_writer=None, executor=None):
+        self.config = config
+        self.db_manager = db_manager
+        self.business_logic = business_logic
+        self.summary_scheduler = summary_scheduler  # Coalesces SummaryUpdateRequired bursts when set
+        self.deferred_writer = deferred_writer  # Takes over ReviewApproved / SummaryGenerated bookkeeping when set
+        self.executor = executor or self.process  # Runs a leased job - the shard coordinator forwards jobs to worker processes
+        self.worker_count = max(1, config.job_workers)
+        self.lease_seconds = config.job_lease_seconds
+        self.max_retries = max(0, config.max_retries)
+        self.retry_delay = config.retry_delay
+        self.retry_max_delay = config.retry_max_delay
+        self.recovery_stale_seconds = config.recovery_stale_seconds
+        self.recovery_interval_seconds = config.recovery_interval_seconds
+        self.owner_prefix = f"{os.getpid()}"
+        self.active_jobs = 0
+        self.running = False
+        self.tasks = []
+        self.recovery_task = None
+        self._wakeup = asyncio.Event()
+        self.handlers = {
+            "ReviewSubmitted": self._process_review_submitted,
+            "SummaryUpdateRequired": self._process_summary_update_required,
+            "ReviewApproved": self._process_review_approved,
+            "SummaryGenerated": self._process_summary_generated
+        }
+
+    async def enqueue(self, event_id, event_type, transaction_hash, block_number, log_index, event_data):
+        """Durably queue a decoded event - idempotent on event_id"""
+        queued = await self.db_manager.enqueue_job(
+            event_id, event_type, transaction_hash, block_number, log_index, json.dumps(event_data)
+        )
+        if queued:
+            EVENTS_TOTAL.inc(event_type=event_type, outcome='enqueued')
+            logger.info("Queued %s event: %s", event_type, event_id)
+            self._wakeup.set()
+        return queued
+
+    async def run(self):
+        """Start the workers and wait until they stop"""
+        self.running = True
+        # Pick up events a previous run left half-done before taking new work
+        await self.recover_stale_events()
+        self.tasks = [asyncio.create_task(self._worker(f"{self.owner_prefix}-{index}")) for index in range(self.worker_count)]
+        self.recovery_task = asyncio.create_task(self._recovery_loop())
+        logger.info("Job worker pool started with %s workers", self.worker_count)
+        await asyncio.gather(*self.tasks, self.recovery_task, return_exceptions=True)
+        logger.info("Job worker pool stopped")
+
+    async def stop(self):
+        self.running = False
+        self._wakeup.set()
+        if self.recovery_task:
+            self.recovery_task.cancel()
+
+    async def recover_stale_events(self):
+        """Requeue events stuck in 'processing' longer than recovery_stale_seconds - returns the number requeued"""
+        stale_events = await self.db_manager.get_stale_processing_events(self.recovery_stale_seconds)
+        requeued = 0
+        for event in stale_events:
+            # Event IDs are "<EventName>_<txHash>_<logIndex>"
+            log_index = int(event['event_id'].rsplit('_', 1)[-1])
+            if await self.db_manager.requeue_job(
+                event['event_id'], event['event_type'], event['transaction_hash'],
+                event['block_number'], log_index, event['event_data']
+            ):
+                requeued += 1
+                logger.warning(f"Requeued stale processing event: {event['event_id']}")
+        if requeued:
+            self._wakeup.set()
+        return requeued
+
+    async def _recovery_loop(self):
+        while self.running:
+            try:
+                await asyncio.sleep(self.recovery_interval_seconds)
+                await self.recover_stale_events()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error recovering stale events: {e}")
+
+    async def _worker(self, owner):
+        while self.running:
+            try:
+                job = await self.db_manager.claim_job(owner, self.lease_seconds)
+                if job is None:
+                    # Nothing queued - wait for a new event or poll again shortly
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=1)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self.active_jobs += 1
+                try:
+                    await self._execute(owner, job)
+                finally:
+                    self.active_jobs -= 1
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in job worker {owner}: {e}")
+                await asyncio.sleep(1)
+
+    async def _execute(self, owner, job):
+        event_id = job['event_id']
+        if job['event_type'] not in self.handlers:
+            logger.error(f"No handler for job {event_id} of type {job['event_type']}")
+            EVENTS_TOTAL.inc(event_type=job['event_type'], outcome='dead_lettered')
+            await self.db_manager.dead_letter_job(event_id, owner, "Unknown event type")
+            return
+
+        # Keep the lease alive while slow AI / transaction work runs
+        renew_task = asyncio.create_task(self._renew_lease(event_id, owner))
+        try:
+            with span("job", trace_id=event_id, event_type=job['event_type'], attempt=job['attempts']):
+                if job.get('queued_at'):
+                    queue_wait = (datetime.now() - datetime.fromisoformat(str(job['queued_at']))).total_seconds()
+                    TRACER.record("queue_wait", event_id, max(0.0, queue_wait))
+                success, result = await self.executor(job)
+        except Exception as e:
+            logger.error(f"Error processing job {event_id}: {e}")
+            success, result = False, str(e)
+        finally:
+            renew_task.cancel()
+
+        if success:
+            EVENTS_TOTAL.inc(event_type=job['event_type'], outcome='succeeded')
+            await self.db_manager.ack_job(event_id, owner, 'done', str(result))
+        elif job['attempts'] <= self.max_retries:
+            EVENTS_TOTAL.inc(event_type=job['event_type'], outcome='retried')
+            delay = retry_backoff(job['attempts'], self.retry_delay, self.retry_max_delay)
+            logger.warning(f"Job {event_id} failed (attempt {job['attempts']}/{self.max_retries + 1}), retrying in {delay:.1f}s: {result}")
+            await self.db_manager.schedule_job_retry(event_id, owner, datetime.now() + timedelta(seconds=delay), str(result))
+        else:
+            EVENTS_TOTAL.inc(event_type=job['event_type'], outcome='dead_lettered')
+            logger.error(f"Job {event_id} failed after {job['attempts']} attempts: {result}")
+            await self.db_manager.dead_letter_job(event_id, owner, str(result))
+
+    async def collect_metrics(self):
+        """Metrics collector - refresh the queue depth gauge before a scrape"""
+        counts = await self.db_manager.count_jobs_by_status()
+        for status in {'queued', 'retry', 'leased', 'done', 'dead'} | set(counts):
+            JOBS_BY_STATUS.set(counts.get(status, 0), status=status)
+
+    async def process(self, job):
+        """Run the business logic for a leased job - returns (success, result)"""
+        event_id = job['event_id']
+        status = await self.db_manager.get_event_status(event_id)
+        # 'failed' events come back through retries or a manual requeue
+        if status not in (None, 'processing', 'failed'):
+            logger.info("Event already processed, skipping: %s", event_id)
+            return True, "already processed"
+        if status == 'processing':
+            # The job is leased to us, so the previous attempt died mid-flight - resume it
+            logger.warning(f"Resuming interrupted event: {event_id}")
+        # Nests under the "job" span in-process; a root of the same trace in a shard worker
+        with span("process", trace_id=event_id):
+            return await self.handlers[job['event_type']](job, json.loads(job['event_data']))
+
+    async def _renew_lease(self, event_id, owner):
+        while True:
+            await asyncio.sleep(max(1, self.lease_seconds / 3))
+            await self.db_manager.renew_job_lease(event_id, owner, self.lease_seconds)
+
+    async def _run_inline(self, job, event_data, process):
+        """Mark processing, run business logic and record the outcome in processed_events"""
+        await self.db_manager.mark_event_as_processed(
+            event_id=job['event_id'],
+            event_type=job['event_type'],
+            transaction_hash=job['transaction_hash'],
+            block_number=job['block_number'],
+            event_data=json.dumps(event_data),
+            status='processing'
+        )
+
+        success, result = await process(event_data)
+
+        status = 'success' if success else 'failed'
+        await self.db_manager.mark_event_as_processed(
+            event_id=job['event_id'],
+            event_type=job['event_type'],
+            transaction_hash=job['transaction_hash'],
+            block_number=job['block_number'],
+            event_data=json.dumps(event_data),
+            status=status,
+            result=str(result)
+        )
+        logger.info("Processed %s event: %s, status: %s", job['event_type'], job['event_id'], status)
+        return success, result
+
+    async def _process_review_submitted(self, job, event_data):
+        review_id = event_data['reviewId']
+
+        # Call the contract's getReview method to get the complete review information
+        logger.info("Calling getReview for review_id: %s", review_id)
+        try:
+            # Execute synchronous method in a separate thread to avoid blocking the async event loop
+            with span("rpc.get_review_by_id"):
+                review = await asyncio.to_thread(self.business_logic.web3_manager.get_review_by_id, review_id)
+            log_payload(logger, "Review details", review)
+
+            # Extract complete review information
+            if review is not None:
+                content = review[REVIEW_CONTENT_INDEX]
+                rating = review[REVIEW_RATING_INDEX]
+                timestamp = review[REVIEW_TIMESTAMP_INDEX]
+
+                # Ensure content is a string type, handle bytes type case
+                if isinstance(content, bytes):
+                    content = content.decode('utf-8')
+            else:
+                logger.error(f"get_review_by_id returned None for review_id: {review_id}")
+                # If the retrieval fails, use default values
+                content = ''
+                rating = 0
+                timestamp = 0
+        except Exception as e:
+            logger.error(f"Failed to get review details: {e}")
+            # If retrieval fails, use default values
+            content = ''
+            rating = 0
+            timestamp = 0
+
+        # Build complete event data
+        event_data = dict(event_data, content=content, rating=rating, submittedAt=timestamp)
+        return await self._run_inline(
+            job, event_data,
+            lambda data: self.business_logic.process_review_submitted(data, event_id=job['event_id'])
+        )
+
+    async def _process_summary_update_required(self, job, event_data):
+        # Hand over to the summary scheduler, which debounces and merges requests per scenic spot
+        if self.summary_scheduler is not None:
+            await self.summary_scheduler.schedule(
+                event_id=job['event_id'],
+                transaction_hash=job['transaction_hash'],
+                block_number=job['block_number'],
+                event_data=event_data
+            )
+            return True, "scheduled"
+        return await self._run_inline(job, event_data, self.business_logic.process_summary_update_required)
+
+    async def _process_review_approved(self, job, event_data):
+        # The local review store is updated right away, so summaries can read it before the bookkeeping runs
+        if not await self.db_manager.record_scenic_review_approval(
+            event_data['reviewId'], event_data['isApproved'], job['block_number'], job['log_index'], job['transaction_hash']
+        ):
+            logger.info("Review %s is not in the local review store, summaries of its scenic spot use the chain", event_data['reviewId'])
+        return await self._defer_or_run(job, event_data, self.business_logic.process_review_approved)
+
+    async def _process_summary_generated(self, job, event_data):
+        return await self._defer_or_run(job, event_data, self.business_logic.process_summary_generated)
+
+    async def _defer_or_run(self, job, event_data, process):
+        # Bookkeeping only - hand over to the deferred writer so it does not compete with moderation
+        if self.deferred_writer is not None:
+            await self.deferred_writer.defer(
+                event_id=job['event_id'],
+                event_type=job['event_type'],
+                transaction_hash=job['transaction_hash'],
+                block_number=job['block_number'],
+                event_data=event_data
+            )
+            return True, "deferred"
+        return await self._run_inline(job, event_data, process)
@@ -0,0 +1,116 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from src.tracing import current_trace_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+_payload_sample_rate = 0.0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line - timestamp, level, logger, message and the event being traced"""
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "process": record.processName,
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves %-formatting to the listener thread instead of the event loop"""
+    def prepare(self, record):
+        # The stock handler formats here; the record stays in-process, so args can travel as they are
+        record.trace_id = current_trace_id()
+        return record
+
+
+class _LazyJson:
+    """Serializes its payload only if the record is actually written"""
+    __slots__ = ("payload",)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __str__(self):
+        if isinstance(self.payload, str):
+            return self.payload
+        return json.dumps(self.payload, ensure_ascii=False, default=str)
+
+
+def log_payload(logger: logging.Logger, label: str, payload):
+    """DEBUG-log a verbose payload (prompts, built transactions, raw responses) for a sample of calls"""
+    if _payload_sample_rate <= 0 or not logger.isEnabledFor(logging.DEBUG):
+        return
+    if _payload_sample_rate < 1 and random.random() >= _payload_sample_rate:
+        return
+    logger.debug("%s: %s", label, _LazyJson(payload))
+
+
+def _process_log_file(log_file: str) -> str:
+    # Rotation is not safe across processes, so shard workers write their own file
+    name = multiprocessing.current_process().name
+    if name == "MainProcess":
+        return log_file
+    root, ext = os.path.splitext(log_file)
+    return f"{root}.{name}{ext or '.log'}"
+
+
+def setup_logging(config):
+    """Route all records through a queue to a background thread that formats and writes them"""
+    global _listener, _payload_sample_rate
+    _payload_sample_rate = config.log_payload_sample_rate
+    if _listener is not None:
+        return  # Already configured in this process
+
+    log_file = _process_log_file(config.log_file)
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=config.log_max_bytes, backupCount=config.log_backup_count, encoding='utf-8'
+    )
+    file_handler.setFormatter(JsonFormatter() if config.log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(getattr(logging, config.log_level.upper(), logging.INFO))
+
+    # Quieten chatty libraries
+    logging.getLogger("web3").setLevel(logging.WARNING)
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from src.config import Config
+from src.metrics import LOOP_BLOCKED_TOTAL, LOOP_LAG_QUANTILE, LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LoopLagMonitor:
+    """Measure event loop scheduling lag and capture the stack of whatever blocks the loop"""
+    def __init__(self, config: Config):
+        self.interval = config.loop_monitor_interval
+        self.block_threshold = config.loop_block_threshold
+        self.report_interval = config.loop_lag_report_interval
+        self.samples = deque(maxlen=max(10, int(config.loop_lag_window_seconds / self.interval)))
+        self.running = False
+        self.last_tick = None  # Monotonic time of the loop's latest tick, read by the watchdog thread
+        self.loop_thread_id = None
+        self.watchdog = None
+        self._stop_watchdog = threading.Event()
+
+    async def run(self):
+        self.running = True
+        self.loop_thread_id = threading.get_ident()
+        self.last_tick = time.monotonic()
+        self._stop_watchdog.clear()
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+        logger.info("Event loop monitor started (tick: %ss, block threshold: %ss)", self.interval, self.block_threshold)
+
+        next_report = time.monotonic() + self.report_interval
+        while self.running:
+            try:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self.last_tick = now
+                lag = max(0.0, now - expected)
+                self.samples.append(lag)
+                LOOP_LAG_SECONDS.observe(lag)
+                if now >= next_report:
+                    next_report = now + self.report_interval
+                    self._report()
+            except asyncio.CancelledError:
+                break
+
+    def _watch(self):
+        """Watchdog thread - when the loop misses its tick, dump the loop thread's current stack once per stall"""
+        reported_tick = None
+        while not self._stop_watchdog.wait(self.block_threshold / 2):
+            last_tick = self.last_tick
+            blocked_for = time.monotonic() - last_tick
+            if blocked_for < self.block_threshold + self.interval or reported_tick == last_tick:
+                continue
+            reported_tick = last_tick
+            LOOP_BLOCKED_TOTAL.inc()
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no frame>"
+            logger.warning("Event loop blocked for %.2fs, loop thread stack:\n%s", blocked_for, stack)
+
+    def quantiles(self):
+        """{quantile: lag seconds} over the sample window"""
+        values = sorted(self.samples)
+        if not values:
+            return {}
+        return {q: values[max(0, math.ceil(q * len(values)) - 1)] for q in QUANTILES}
+
+    def _report(self):
+        quantiles = self.quantiles()
+        if quantiles:
+            logger.info(
+                "Event loop lag p50=%.1fms p95=%.1fms p99=%.1fms max=%.1fms",
+                quantiles[0.5] * 1000, quantiles[0.95] * 1000, quantiles[0.99] * 1000, max(self.samples) * 1000
+            )
+
+    async def collect_metrics(self):
+        """Metrics collector - publish lag percentiles before a scrape"""
+        for quantile, value in self.quantiles().items():
+            LOOP_LAG_QUANTILE.set(value, quantile=quantile)
+
+    async def stop(self):
+        self.running = False
+        self._stop_watchdog.set()
+        logger.info("Event loop monitor stopped")
@@ -1,7 +1,9 @@
+import argparse
 import asyncio
 import logging
 import signal
 import sys
+import time
 from pathlib import Path
 
 # Add project root directory to Python path
@@ -9,68 +11,149 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.config import Config
 from src.db_manager import DatabaseManager
-from src.web3_manager import Web3Manager
+from src.web3_manager import Web3Manager, load_contract_abi
 from src.event_listener import EventListener
 from src.business_logic import BusinessLogic
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('oracle_node.log', encoding='utf-8')
-    ]
-)
+from src.summary_scheduler import SummaryScheduler
+from src.tx_batcher import TransactionBatcher
+from src.deferred_writer import DeferredWriter
+from src.job_worker import JobWorkerPool
+from src.sharding import ShardCoordinator
+from src.rpc_pool import RpcProviderPool
+from src.metrics import REGISTRY, MetricsServer
+from src.tracing import TRACER
+from src.loop_monitor import LoopLagMonitor
+from src.profiler import SamplingProfiler
 
 logger = logging.getLogger(__name__)
 
 class OracleNode:
-    def __init__(self):
+    def __init__(self, workers=1):
+        self.workers = workers  # > 1 runs business logic in worker processes sharded by scenic spot
+        self.shard_coordinator = None
         self.config = None
         self.db_manager = None
         self.web3_manager = None
         self.event_listener = None
+        self.event_listener_task = None
         self.business_logic = None
+        self.summary_scheduler = None
+        self.summary_scheduler_task = None
+        self.tx_batcher = None
+        self.tx_batcher_task = None
+        self.deferred_writer = None
+        self.deferred_writer_task = None
+        self.job_pool = None
+        self.job_pool_task = None
+        self.rpc_pool = None
+        self.rpc_pool_task = None
+        self.metrics_server = None
+        self.profiler = None
+        self.tracer_task = None
+        self.loop_monitor = None
+        self.loop_monitor_task = None
         self.running = False
+        self.stopped = asyncio.Event()  # Set once stop() has finished cleaning up
     
     async def initialize(self):
         """Initialize Oracle Node"""
         try:
-            logger.info("Initializing Oracle Node...")
+            started = time.monotonic()
+            timings = {}  # Startup step => seconds, logged as one breakdown
             
-            # Load configuration
+            # Load configuration - also sets up logging
             self.config = Config()
-            logger.info("Configuration loaded successfully")
+            timings["config"] = time.monotonic() - started
+            logger.info("Initializing Oracle Node...")
+            ensure_directories(self.config)
             
-            # Initialize database
+            # Parse the contract ABI once for both the sync and the async contract
+            step_started = time.monotonic()
+            abi = load_contract_abi(self.config.abi_path)
+            timings["abi"] = time.monotonic() - step_started
+            
+            # Sampling profiler, started on demand by SIGUSR1 or the admin route
+            step_started = time.monotonic()
+            self.profiler = SamplingProfiler(self.config, asyncio.get_running_loop())
+            
+            # Components are wired up first - none of the constructors touch the database or the network
             self.db_manager = DatabaseManager(self.config.db_path)
-            if not await self.db_manager.connect():
-                logger.error("Failed to connect to database")
-                return False
-            logger.info("Database connected successfully")
             
-            # Initialize Web3 connection
-            self.web3_manager = Web3Manager(self.config)
-            if not self.web3_manager.connect():
-                logger.error("Failed to connect to blockchain")
-                await self.db_manager.close()
-                return False
-            logger.info("Blockchain connection established")
+            # Persist stage tracing spans to the database
+            TRACER.configure(self.config, self.db_manager)
             
-            # Initialize business logic
-            self.business_logic = BusinessLogic(self.config, self.web3_manager, self.db_manager)
-            logger.info("Business logic initialized")
+            # Initialize event loop lag monitor
+            if self.config.loop_monitor_enabled:
+                self.loop_monitor = LoopLagMonitor(self.config)
+                REGISTRY.add_collector(self.loop_monitor.collect_metrics)
             
-            # Initialize event listener
-            self.event_listener = EventListener(self.config, self.db_manager, self.business_logic)
-            if not await self.event_listener.connect():
-                logger.error("Failed to initialize event listener")
-                await self.db_manager.close()
+            # Initialize RPC provider pool shared by the sync and async web3 stacks
+            self.rpc_pool = RpcProviderPool(self.config)
+            self.web3_manager = Web3Manager(self.config, self.rpc_pool, abi)
+            
+            # Initialize transaction batcher
+            self.tx_batcher = TransactionBatcher(self.config, self.web3_manager)
+            
+            if self.workers > 1:
+                # Coordinator mode - this process keeps ingestion and the nonce, worker processes run the jobs
+                self.shard_coordinator = ShardCoordinator(self.config, self.tx_batcher, self.workers)
+                self.job_pool = JobWorkerPool(
+                    self.config, self.db_manager, None,
+                    executor=self.shard_coordinator.execute
+                )
+                logger.info(f"Job worker pool initialized in coordinator mode with {self.workers} worker processes")
+            else:
+                self.business_logic = BusinessLogic(self.config, self.web3_manager, self.db_manager, self.tx_batcher)
+                self.summary_scheduler = SummaryScheduler(self.config, self.db_manager, self.business_logic)
+                self.deferred_writer = DeferredWriter(self.config, self.db_manager, self.business_logic, self.is_busy)
+                self.summary_scheduler.deferred_writer = self.deferred_writer
+                self.job_pool = JobWorkerPool(
+                    self.config, self.db_manager, self.business_logic,
+                    self.summary_scheduler, self.deferred_writer
+                )
+            REGISTRY.add_collector(self.job_pool.collect_metrics)
+            
+            self.event_listener = EventListener(self.config, self.db_manager, self.job_pool, self.rpc_pool, abi)
+            if self.config.metrics_enabled:
+                self.metrics_server = MetricsServer(self.config.metrics_host, self.config.metrics_port)
+                self.metrics_server.add_route("/debug/profile", self.profiler.handle_request)
+            timings["components"] = time.monotonic() - step_started
+            
+            # Independent connections run concurrently - the blocking web3 checks on a thread
+            async def timed(name, awaitable):
+                step_started = time.monotonic()
+                try:
+                    return await awaitable
+                finally:
+                    timings[name] = time.monotonic() - step_started
+            
+            step_started = time.monotonic()
+            steps = [
+                ("database", timed("database", self.db_manager.connect())),
+                ("blockchain", timed("web3", asyncio.to_thread(self.web3_manager.connect))),
+                ("event listener", timed("listener", self.event_listener.connect()))
+            ]
+            if self.business_logic:
+                steps.append(("AI client", timed("ai", self.business_logic.volc_ai.connect())))
+            if self.metrics_server:
+                steps.append(("metrics endpoint", timed("metrics", self._start_metrics_server())))
+            results = await asyncio.gather(*(awaitable for _, awaitable in steps), return_exceptions=True)
+            timings["connect"] = time.monotonic() - step_started
+            
+            failures = [(name, result) for (name, _), result in zip(steps, results) if result is not True]
+            if failures:
+                for name, result in failures:
+                    # Connect methods log their own errors and return False
+                    detail = f": {result}" if isinstance(result, BaseException) else ""
+                    logger.error(f"Failed to initialize {name}{detail}")
+                await self.cleanup()
                 return False
-            logger.info("Event listener initialized")
             
-            logger.info("Oracle Node initialized successfully")
+            logger.info(
+                "Oracle Node initialized in %.0fms (%s)",
+                (time.monotonic() - started) * 1000,
+                ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
+            )
             return True
             
         except Exception as e:
@@ -78,6 +161,10 @@ class OracleNode:
             await self.cleanup()
             return False
     
+    async def _start_metrics_server(self):
+        await self.metrics_server.start()
+        return True
+    
     async def start(self):
         """Start Oracle Node"""
         if not self.running:
@@ -85,17 +172,45 @@ class OracleNode:
                 self.running = True
                 logger.info("Starting Oracle Node...")
                 
+                # Start event loop monitor
+                if self.loop_monitor:
+                    self.loop_monitor_task = asyncio.create_task(self.loop_monitor.run())
+                
+                # Start span writer
+                self.tracer_task = asyncio.create_task(TRACER.run())
+                
+                # Start RPC health probes
+                self.rpc_pool_task = asyncio.create_task(self.rpc_pool.run())
+                
+                # Start transaction batcher
+                self.tx_batcher_task = asyncio.create_task(self.tx_batcher.run())
+                
+                # Start shard worker processes
+                if self.shard_coordinator:
+                    await self.shard_coordinator.start()
+                
+                # Start deferred writer
+                if self.deferred_writer:
+                    self.deferred_writer_task = asyncio.create_task(self.deferred_writer.run())
+                
+                # Start summary scheduler
+                if self.summary_scheduler:
+                    self.summary_scheduler_task = asyncio.create_task(self.summary_scheduler.run())
+                
+                # Start job workers
+                self.job_pool_task = asyncio.create_task(self.job_pool.run())
+                
                 # Start event listener
-                await self.event_listener.start_listening()
+                self.event_listener_task = asyncio.create_task(self.event_listener.start_listening())
                 
                 logger.info("Oracle Node started")
                 
-                # Keep running state
-                while self.running:
-                    await asyncio.sleep(1)
+                # Keep running until stop() has finished shutting everything down
+                await self.stopped.wait()
                     
             except Exception as e:
                 logger.error(f"Error running Oracle Node: {e}")
+                self.running = False
                 await self.cleanup()
     
     async def stop(self):
@@ -105,9 +220,56 @@ class OracleNode:
                 self.running = False
                 logger.info("Stopping Oracle Node...")
                 
-                # Stop event listener
+                # Stop event listener - waits for the listen loop, so nothing is queued after this
                 if self.event_listener:
                     await self.event_listener.stop_listening()
+                if self.event_listener_task:
+                    await self.event_listener_task
+                
+                # Stop job workers
+                if self.job_pool:
+                    await self.job_pool.stop()
+                if self.job_pool_task:
+                    await self.job_pool_task
+                
+                # Stop shard worker processes
+                if self.shard_coordinator:
+                    await self.shard_coordinator.stop()
+                
+                # Stop summary scheduler
+                if self.summary_scheduler:
+                    await self.summary_scheduler.stop()
+                if self.summary_scheduler_task:
+                    await self.summary_scheduler_task
+                
+                # Stop deferred writer
+                if self.deferred_writer:
+                    await self.deferred_writer.stop()
+                if self.deferred_writer_task:
+                    await self.deferred_writer_task
+                
+                # Stop transaction batcher, settling queued writes
+                if self.tx_batcher:
+                    await self.tx_batcher.stop()
+                if self.tx_batcher_task:
+                    await self.tx_batcher_task
+                
+                # Stop RPC health probes
+                if self.rpc_pool:
+                    await self.rpc_pool.stop()
+                if self.rpc_pool_task:
+                    self.rpc_pool_task.cancel()
+                
+                # Stop event loop monitor
+                if self.loop_monitor:
+                    await self.loop_monitor.stop()
+                if self.loop_monitor_task:
+                    self.loop_monitor_task.cancel()
+                
+                # Write remaining spans
+                await TRACER.stop()
+                if self.tracer_task:
+                    await self.tracer_task
                 
                 # Clean up resources
                 await self.cleanup()
@@ -116,10 +278,27 @@ class OracleNode:
                 
             except Exception as e:
                 logger.error(f"Error stopping Oracle Node: {e}")
+            finally:
+                self.stopped.set()
+    
+    def is_busy(self):
+        """Whether moderation or summary work is in flight"""
+        if self.job_pool and self.job_pool.active_jobs > 0:
+            return True
+        if self.summary_scheduler and self.summary_scheduler.flushing:
+            return True
+        if self.tx_batcher and len(self.tx_batcher.status_batch) > 0:
+            return True
+        return False
     
     async def cleanup(self):
         """Clean up resources"""
         try:
+            # Stop metrics endpoint
+            if self.metrics_server:
+                await self.metrics_server.stop()
+                self.metrics_server = None
+            
             # Close database connection
             if self.db_manager:
                 await self.db_manager.close()
@@ -129,46 +308,66 @@ class OracleNode:
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="TravelTrust oracle node")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of worker processes; jobs are sharded by scenic spot (default: 1, single process)"
+    )
+    return parser.parse_args()
+
 async def main():
     """Main function"""
-    oracle_node = OracleNode()
+    args = parse_args()
+    oracle_node = OracleNode(workers=args.workers)
     
     # Initialize Oracle Node
     if not await oracle_node.initialize():
         logger.error("Failed to initialize Oracle Node")
         return
     
-    # Set up signal handling
+    # Set up signal handling - the handler only flags the request, main() runs and awaits the shutdown
+    loop = asyncio.get_running_loop()
+    stop_requested = asyncio.Event()
+    
     def signal_handler(signum, frame):
         logger.info(f"Received signal {signum}, shutting down...")
-        asyncio.create_task(oracle_node.stop())
+        loop.call_soon_threadsafe(stop_requested.set)
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Start Oracle Node
-    await oracle_node.start()
+    # kill -USR1 <pid> profiles the running node
+    def profile_handler(signum, frame):
+        oracle_node.profiler.start()
+    
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, profile_handler)
+    
+    # Start Oracle Node and run until a signal asks it to stop
+    start_task = asyncio.create_task(oracle_node.start())
+    stop_task = asyncio.create_task(stop_requested.wait())
+    await asyncio.wait([start_task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+    stop_task.cancel()
+    
+    # Shut down in the foreground, so asyncio.run does not cancel it halfway through
+    await oracle_node.stop()
+    await start_task
 
-def ensure_directories():
-    """Ensure necessary directories exist"""
+def ensure_directories(config: Config):
+    """Ensure necessary directories exist - the log directory is created by the logging setup"""
     import os
     
-    # Create log directory
-    log_file = os.getenv("LOG_FILE", "logs/oracle.log")
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
     # Create database directory
-    db_path = os.getenv("DB_PATH", "db/oracle.db")
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    db_dir = os.path.dirname(config.db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
     
     # Create output directory (if needed)
     os.makedirs("output", exist_ok=True)
 
 if __name__ == "__main__":
     try:
-        # Ensure necessary directories exist
-        ensure_directories()
-        
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt received, exiting...")
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlsplit
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds - spans a fast local RPC call up to a slow transaction confirmation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metric:
+    """Base for a labelled metric family - values are keyed by the label values tuple"""
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()  # Sync web3 calls record from executor threads
+
+    def _key(self, labels) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self.values[()] = 0  # Expose unlabelled gauges before their first update
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                # [per-bucket counts (non-cumulative), sum, count]
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide set of metrics rendered in the Prometheus text format"""
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], Awaitable[None]]] = []  # Refresh gauges just before a scrape
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]):
+        self.collectors.append(collector)
+
+    async def render(self) -> str:
+        for collector in self.collectors:
+            try:
+                await collector()
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+EVENTS_TOTAL = REGISTRY.register(Counter(
+    "oracle_events_total", "Contract events by type and outcome (enqueued, succeeded, retried, dead_lettered)",
+    ["event_type", "outcome"]
+))
+RPC_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "oracle_rpc_request_seconds", "JSON-RPC request latency per attempt", ["method", "outcome"]
+))
+AI_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "oracle_ai_request_seconds", "AI completion request latency", ["model", "outcome"]
+))
+DB_WRITE_SECONDS = REGISTRY.register(Histogram(
+    "oracle_db_write_seconds", "SQLite write latency including commit", ["operation"]
+))
+TX_CONFIRMATION_SECONDS = REGISTRY.register(Histogram(
+    "oracle_tx_confirmation_seconds", "Time from sending a transaction to its receipt", ["status"]
+))
+TX_IN_FLIGHT = REGISTRY.register(Gauge(
+    "oracle_transactions_in_flight", "Oracle transactions sent and awaiting a receipt"
+))
+CHAIN_HEAD_BLOCK = REGISTRY.register(Gauge(
+    "oracle_chain_head_block", "Latest block number seen on the chain"
+))
+SAFE_HEAD_BLOCK = REGISTRY.register(Gauge(
+    "oracle_safe_head_block", "Highest block considered final enough to dispatch"
+))
+BLOCK_LAG = REGISTRY.register(Gauge(
+    "oracle_block_lag", "Blocks between the chain head and the last block scanned for events", ["event_type"]
+))
+JOBS_BY_STATUS = REGISTRY.register(Gauge(
+    "oracle_jobs", "Durable job queue depth by status", ["status"]
+))
+LOOP_LAG_SECONDS = REGISTRY.register(Histogram(
+    "oracle_event_loop_lag_seconds", "Delay between when the loop monitor tick was due and when it ran", [],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+))
+LOOP_LAG_QUANTILE = REGISTRY.register(Gauge(
+    "oracle_event_loop_lag_quantile_seconds", "Event loop lag percentiles over the recent sample window", ["quantile"]
+))
+LOOP_BLOCKED_TOTAL = REGISTRY.register(Counter(
+    "oracle_event_loop_blocked_total", "Times the event loop was blocked for longer than the threshold"
+))
+
+
+class MetricsServer:
+    """Minimal HTTP server answering GET /metrics, plus local admin routes, from the event loop"""
+    def __init__(self, host: str, port: int, registry: MetricsRegistry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.server = None
+        self.routes = {}  # path => async handler(query params) returning (status line, body text)
+
+    def add_route(self, path: str, handler: Callable[[dict], Awaitable[Tuple[str, str]]]):
+        self.routes[path] = handler
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            # Drain headers - scrapes never carry a body
+            while (await asyncio.wait_for(reader.readline(), timeout=10)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            target = urlsplit(parts[1]) if len(parts) >= 2 else None
+            if target and parts[0] == "GET" and target.path in ("/metrics", "/"):
+                status, body = "200 OK", (await self.registry.render()).encode("utf-8")
+            elif target and parts[0] in ("GET", "POST") and target.path in self.routes:
+                query = {key: values[-1] for key, values in parse_qs(target.query).items()}
+                status, text = await self.routes[target.path](query)
+                body = text.encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            logger.info("Metrics endpoint stopped")
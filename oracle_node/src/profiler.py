@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frames) -> str:
+    """Outermost-first frames as a semicolon-joined stack"""
+    return ";".join(_frame_label(frame.f_code) for frame in frames)
+
+
+def _root_label(kind: str, name) -> str:
+    # Fold numbered threads / tasks ("Task-812", "ThreadPoolExecutor-0_3") into one root each
+    return f"{kind}:{re.sub(r'[0-9]+', '#', str(name))}"
+
+
+def _thread_frames(frame):
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class SamplingProfiler:
+    """Time-boxed statistical profiler - samples every thread and asyncio task into collapsed stacks"""
+    # Nothing runs while idle; a sampling thread exists only for the duration of a profile. The output is
+    # one "stack count" line per unique stack, readable by flamegraph.pl, speedscope and inferno
+    def __init__(self, config: Config, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.interval = config.profile_interval
+        self.default_duration = config.profile_duration
+        self.max_duration = config.profile_max_duration
+        self.output_dir = config.profile_output_dir
+        self.loop = loop  # Tasks of this loop are sampled too
+        self.thread = None
+        self.output_path = None
+
+    @property
+    def active(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration: Optional[float] = None) -> Optional[str]:
+        """Start a profile in the background - returns the output path, or None if one is already running"""
+        if self.active:
+            logger.warning("Profile already running, writing to %s", self.output_path)
+            return None
+        duration = duration or self.default_duration
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.output_path = os.path.join(
+            self.output_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.collapsed"
+        )
+        self.thread = threading.Thread(
+            target=self._run, args=(duration, self.output_path), name="sampling-profiler", daemon=True
+        )
+        self.thread.start()
+        logger.info("Sampling profiler started for %ss (interval %ss), writing %s", duration, self.interval, self.output_path)
+        return self.output_path
+
+    async def handle_request(self, query: dict):
+        """Admin route - /debug/profile?seconds=N starts a profile and answers with the output path"""
+        try:
+            duration = min(float(query["seconds"]), self.max_duration) if "seconds" in query else None
+        except ValueError:
+            return "400 Bad Request", "seconds must be a number\n"
+        output_path = self.start(duration)
+        if output_path is None:
+            return "409 Conflict", f"Profile already running: {self.output_path}\n"
+        return "202 Accepted", f"{output_path}\n"
+
+    def _run(self, duration: float, output_path: str):
+        stacks = Counter()
+        own_id = threading.get_ident()
+        names = {}
+        samples = 0
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                names = {thread.ident: thread.name for thread in threading.enumerate()} if samples % 100 == 0 else names
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_id:
+                        stacks[f"{_root_label('thread', names.get(thread_id, thread_id))};{_collapse(_thread_frames(frame))}"] += 1
+                self._sample_tasks(stacks)
+                samples += 1
+            except Exception as e:
+                logger.debug("Profiler sample failed: %s", e)
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+        try:
+            with open(output_path, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            logger.info("Sampling profiler wrote %s samples (%s unique stacks) to %s", samples, len(stacks), output_path)
+        except Exception as e:
+            logger.error(f"Failed to write profile {output_path}: {e}")
+
+    def _sample_tasks(self, stacks: Counter):
+        """Where each asyncio task is suspended (or running) - shows what the pipeline is waiting on"""
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            tasks = list(asyncio.all_tasks(self.loop))
+        except RuntimeError:
+            return  # Task set changed while copying - skip this sample
+        for task in tasks:
+            try:
+                frames = task.get_stack()
+            except Exception:
+                continue
+            if frames:
+                stacks[f"{_root_label('task', task.get_name())};{_collapse(frames)}"] += 1
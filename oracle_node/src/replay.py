@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from src.db_manager import DatabaseManager
+from src.business_logic import BusinessLogic
+
+logger = logging.getLogger(__name__)
+
+# Events whose processing produces a verdict or a summary - the others only send tx-hash bookkeeping
+REPLAYABLE_EVENT_TYPES = ("ReviewSubmitted", "SummaryUpdateRequired")
+# Coalesced summary requests were merged into the event that ran, scheduled / processing ones never finished
+REPLAYABLE_STATUSES = ("success", "failed")
+
+
+class ReplayEngine:
+    """Re-run stored events through dry-run business logic and record the outcomes in replay_results"""
+    def __init__(self, db_manager: DatabaseManager, business_logic: BusinessLogic, run_id: str,
+                 concurrency: int = 16, page_size: int = 500):
+        if not business_logic.dry_run:
+            raise ValueError("Replays need a dry-run BusinessLogic")
+        self.db_manager = db_manager
+        self.business_logic = business_logic
+        self.run_id = run_id
+        self.concurrency = max(1, concurrency)
+        self.page_size = page_size
+        self.handlers = {
+            "ReviewSubmitted": business_logic.process_review_submitted,
+            "SummaryUpdateRequired": business_logic.process_summary_update_required
+        }
+        self.counts = Counter()
+        self.pending = []  # Result rows not written yet
+
+    async def run(self, event_types=REPLAYABLE_EVENT_TYPES, limit=None, **filters):
+        """Replay events matching the block / time filters, returning counts by event type and status"""
+        started = time.monotonic()
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            async for event in self._read_events(event_types, limit, filters):
+                await queue.put(event)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self._flush()
+
+        total = sum(self.counts.values())
+        elapsed = time.monotonic() - started
+        logger.info("Replay %s finished: %s events in %.1fs (%.1f/s)", self.run_id, total, elapsed, total / elapsed if elapsed else 0)
+        return self.counts
+
+    async def _read_events(self, event_types, limit, filters):
+        """Stream processed events page by page, so memory stays flat however large the range is"""
+        after = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = self.page_size if remaining is None else min(self.page_size, remaining)
+            page = await self.db_manager.get_processed_events_page(
+                event_types, REPLAYABLE_STATUSES, after=after, limit=page_size, **filters
+            )
+            for event in page:
+                yield event
+            if len(page) < page_size:
+                return
+            after = (page[-1]['block_number'], page[-1]['event_id'])
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            event = await queue.get()
+            if event is None:
+                return
+            self.pending.append(await self._replay(event))
+            if len(self.pending) >= self.page_size:
+                await self._flush()
+
+    async def _replay(self, event):
+        event_type = event['event_type']
+        event_data = json.loads(event['event_data'])
+        try:
+            success, result = await self.handlers[event_type](event_data)
+        except Exception as e:
+            success, result = False, str(e)
+
+        status = 'success' if success else 'failed'
+        self.counts[(event_type, status)] += 1
+        outcome = result if isinstance(result, dict) else {}
+        review_ids = outcome.get('review_ids')
+        return (
+            self.run_id, event['event_id'], event_type, event['block_number'],
+            event_data.get('reviewId'), event_data.get('scenicSpotId'), status,
+            outcome.get('is_approved'), outcome.get('summary_content'),
+            # Same form as summary_cache.review_ids, so replayed summaries can be matched with live ones
+            ",".join(str(review_id) for review_id in sorted(review_ids)) if review_ids is not None else None,
+            json.dumps(result, ensure_ascii=False) if isinstance(result, dict) else str(result),
+            datetime.now()
+        )
+
+    async def _flush(self):
+        records, self.pending = self.pending, []
+        if records:
+            await self.db_manager.save_replay_results(records)
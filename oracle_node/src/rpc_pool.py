@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, List, Optional
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+from src.config import Config
+from src.metrics import RPC_REQUEST_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Requests that must hit the primary so nonces and pending state stay consistent
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount"}
+
+# JSON-RPC error codes that mean "try another node" rather than "bad request"
+RATE_LIMIT_CODES = {-32005, 429}
+
+
+class RateLimitedError(Exception):
+    pass
+
+
+def _check_rate_limit(response):
+    error = response.get("error") if isinstance(response, dict) else None
+    if isinstance(error, dict) and error.get("code") in RATE_LIMIT_CODES:
+        raise RateLimitedError(error.get("message", "rate limited"))
+    return response
+
+
+class RpcEndpoint:
+    """One RPC URL with its sync/async providers and health statistics"""
+    def __init__(self, url: str, alpha: float = 0.2):
+        self.url = url
+        self.alpha = alpha
+        # The pool fails over itself, so the per-provider retry loop is disabled
+        self.sync_provider = HTTPProvider(url, exception_retry_configuration=None)
+        self.async_provider = AsyncHTTPProvider(url, exception_retry_configuration=None)
+        self.ewma_latency: Optional[float] = None
+        self.healthy = True
+        self.consecutive_errors = 0
+        self.block_number: Optional[int] = None
+
+    def record_success(self, latency: float):
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+        self.consecutive_errors = 0
+
+    def record_error(self, max_errors: int):
+        self.consecutive_errors += 1
+        if self.healthy and self.consecutive_errors >= max_errors:
+            self.healthy = False
+            logger.warning(f"RPC endpoint marked unhealthy: {self.url}")
+
+    def score(self):
+        # Recently failing endpoints sort after working ones; unmeasured ones after measured ones
+        return (self.consecutive_errors, self.ewma_latency if self.ewma_latency is not None else float('inf'))
+
+
+class RpcProviderPool:
+    """Shared endpoint health for the sync and async web3 stacks"""
+    def __init__(self, config: Config):
+        self.config = config
+        self.endpoints = [RpcEndpoint(url) for url in config.rpc_urls]
+        self.primary = self.endpoints[0]  # Writes go here first
+        self.max_errors = max(1, config.rpc_max_errors)
+        self.probe_interval = config.rpc_probe_interval
+        self.max_block_lag = config.rpc_max_block_lag
+        self.running = False
+        self._lock = threading.Lock()  # Sync calls run on executor threads too
+
+    def candidates(self, method: str) -> List[RpcEndpoint]:
+        """Endpoints to try in order - primary first for writes, fastest healthy first for reads"""
+        with self._lock:
+            healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+            others = [endpoint for endpoint in self.endpoints if not endpoint.healthy]
+        if method in WRITE_METHODS:
+            ordered = [self.primary] + [endpoint for endpoint in healthy if endpoint is not self.primary]
+        else:
+            ordered = sorted(healthy, key=lambda endpoint: endpoint.score())
+        # Unhealthy endpoints are a last resort rather than never tried
+        return ordered + [endpoint for endpoint in others if endpoint not in ordered]
+
+    def make_request(self, method, params):
+        last_error = None
+        for endpoint in self.candidates(method):
+            start = time.monotonic()
+            try:
+                response = _check_rate_limit(endpoint.sync_provider.make_request(method, params))
+                endpoint.record_success(time.monotonic() - start)
+                RPC_REQUEST_SECONDS.observe(time.monotonic() - start, method=method, outcome="ok")
+                return response
+            except Exception as e:
+                endpoint.record_error(self.max_errors)
+                RPC_REQUEST_SECONDS.observe(time.monotonic() - start, method=method, outcome="error")
+                last_error = e
+                logger.warning(f"RPC {method} failed on {endpoint.url}, failing over: {e}")
+        raise last_error
+
+    async def make_request_async(self, method, params):
+        last_error = None
+        for endpoint in self.candidates(method):
+            start = time.monotonic()
+            try:
+                response = _check_rate_limit(await endpoint.async_provider.make_request(method, params))
+                endpoint.record_success(time.monotonic() - start)
+                RPC_REQUEST_SECONDS.observe(time.monotonic() - start, method=method, outcome="ok")
+                return response
+            except Exception as e:
+                endpoint.record_error(self.max_errors)
+                RPC_REQUEST_SECONDS.observe(time.monotonic() - start, method=method, outcome="error")
+                last_error = e
+                logger.warning(f"RPC {method} failed on {endpoint.url}, failing over: {e}")
+        raise last_error
+
+    async def run(self):
+        """Probe loop - measures latency and block height, marks lagging or failing nodes unhealthy"""
+        self.running = True
+        logger.info("RPC provider pool started with %s endpoints (primary: %s)", len(self.endpoints), self.primary.url)
+        while self.running:
+            try:
+                await self.probe()
+                await asyncio.sleep(self.probe_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error probing RPC endpoints: {e}")
+                await asyncio.sleep(self.probe_interval)
+
+    async def probe(self):
+        await asyncio.gather(*(self._probe(endpoint) for endpoint in self.endpoints))
+        heights = [endpoint.block_number for endpoint in self.endpoints if endpoint.block_number is not None]
+        best_height = max(heights) if heights else None
+        for endpoint in self.endpoints:
+            if endpoint.consecutive_errors:
+                continue
+            lagging = best_height is not None and endpoint.block_number is not None and best_height - endpoint.block_number > self.max_block_lag
+            if lagging and endpoint.healthy:
+                logger.warning(f"RPC endpoint {endpoint.url} is {best_height - endpoint.block_number} blocks behind, marked unhealthy")
+            elif not lagging and not endpoint.healthy:
+                logger.info("RPC endpoint recovered: %s", endpoint.url)
+            endpoint.healthy = not lagging
+
+    async def _probe(self, endpoint: RpcEndpoint):
+        start = time.monotonic()
+        try:
+            response = await endpoint.async_provider.make_request("eth_blockNumber", [])
+            if "error" in response:
+                raise ValueError(response["error"])
+            endpoint.block_number = int(response["result"], 16)
+            endpoint.record_success(time.monotonic() - start)
+        except Exception as e:
+            endpoint.record_error(self.max_errors)
+            logger.debug("Probe failed for %s: %s", endpoint.url, e)
+
+    async def stop(self):
+        self.running = False
+
+    def snapshot(self) -> List[dict]:
+        return [
+            {
+                "url": endpoint.url,
+                "healthy": endpoint.healthy,
+                "primary": endpoint is self.primary,
+                "ewma_latency": endpoint.ewma_latency,
+                "block_number": endpoint.block_number
+            }
+            for endpoint in self.endpoints
+        ]
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """Sync web3 provider backed by an RpcProviderPool"""
+    def __init__(self, pool: RpcProviderPool, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    def make_request(self, method, params):
+        return self.pool.make_request(method, params)
+
+
+class AsyncPooledHTTPProvider(AsyncJSONBaseProvider):
+    """Async web3 provider backed by an RpcProviderPool"""
+    def __init__(self, pool: RpcProviderPool, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    async def make_request(self, method, params):
+        return await self.pool.make_request_async(method, params)
@@ -0,0 +1,330 @@
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import signal
+import zlib
+from src.config import Config
+from src.db_manager import DatabaseManager
+from src.web3_manager import Web3Manager
+from src.business_logic import BusinessLogic
+from src.summary_scheduler import SummaryScheduler
+from src.tx_batcher import TransactionBatcher
+from src.job_worker import JobWorkerPool
+from src.metrics import REGISTRY, MetricsServer
+from src.tracing import TRACER
+from src.loop_monitor import LoopLagMonitor
+from src.profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+STREAM_LIMIT = 16 * 1024 * 1024  # Review content and summaries travel inside single messages
+
+
+def shard_key(event_data):
+    """Scenic spot for spot-scoped events, review for ReviewApproved which carries no scenic ID"""
+    if 'scenicSpotId' in event_data:
+        return f"scenic:{event_data['scenicSpotId']}"
+    return f"review:{event_data.get('reviewId')}"
+
+
+def shard_for(event_data, shard_count):
+    # crc32 rather than hash() - stable across processes and restarts
+    return zlib.crc32(shard_key(event_data).encode('utf-8')) % shard_count
+
+
+def _encode_value(value):
+    if isinstance(value, bytes):
+        return {'__bytes__': value.hex()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and '__bytes__' in value:
+        return bytes.fromhex(value['__bytes__'])
+    if isinstance(value, list):
+        return [_decode_value(item) for item in value]
+    return value
+
+
+async def _send_message(writer: asyncio.StreamWriter, message):
+    writer.write(json.dumps(message).encode('utf-8') + b'\n')
+    await writer.drain()
+
+
+async def _read_message(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class ShardCoordinator:
+    """Owns the worker processes - forwards jobs by shard and settles their transactions with the local nonce"""
+    def __init__(self, config: Config, tx_batcher: TransactionBatcher, worker_count: int):
+        self.config = config
+        self.tx_batcher = tx_batcher
+        self.worker_count = worker_count
+        self.processes = {}  # shard index => multiprocessing.Process
+        self.connections = {}  # shard index => StreamWriter
+        self.pending = {}  # shard index => {message id: future}
+        self.server = None
+        self.port = None
+        self.running = False
+        self._ids = itertools.count(1)
+        self._ready = asyncio.Event()
+
+    async def start(self, timeout=60):
+        """Start the IPC server and spawn one process per shard"""
+        self.running = True
+        self.server = await asyncio.start_server(self._handle_connection, '127.0.0.1', 0, limit=STREAM_LIMIT)
+        self.port = self.server.sockets[0].getsockname()[1]
+        for index in range(self.worker_count):
+            self._spawn(index)
+        await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        logger.info("Shard coordinator started with %s worker processes on port %s", self.worker_count, self.port)
+
+    def _spawn(self, index):
+        process = multiprocessing.get_context('spawn').Process(
+            target=run_shard_worker, args=(index, self.worker_count, self.port),
+            name=f"oracle-shard-{index}", daemon=True
+        )
+        process.start()
+        self.processes[index] = process
+        logger.info("Spawned shard worker %s (pid %s)", index, process.pid)
+
+    async def execute(self, job):
+        """JobWorkerPool executor - run the job on the worker process that owns its shard"""
+        index = shard_for(json.loads(job['event_data']), self.worker_count)
+        writer = self.connections.get(index)
+        if writer is None:
+            return False, f"Shard worker {index} unavailable"
+
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[index][message_id] = future
+        try:
+            await _send_message(writer, {'type': 'job', 'id': message_id, 'job': job})
+            return await future
+        finally:
+            self.pending[index].pop(message_id, None)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = await _read_message(reader)
+        if not hello or hello.get('type') != 'hello':
+            writer.close()
+            return
+        index = hello['shard']
+        self.connections[index] = writer
+        self.pending[index] = {}
+        logger.info("Shard worker %s connected", index)
+        if len(self.connections) == self.worker_count:
+            self._ready.set()
+
+        try:
+            while True:
+                message = await _read_message(reader)
+                if message is None:
+                    break
+                if message['type'] == 'job_result':
+                    future = self.pending[index].get(message['id'])
+                    if future is not None and not future.done():
+                        future.set_result((message['success'], message['result']))
+                elif message['type'] == 'tx':
+                    asyncio.create_task(self._handle_transaction(writer, message))
+        except Exception as e:
+            logger.error(f"Error reading from shard worker {index}: {e}")
+        finally:
+            self.connections.pop(index, None)
+            for future in self.pending.pop(index, {}).values():
+                if not future.done():
+                    future.set_result((False, f"Shard worker {index} disconnected"))
+            logger.warning(f"Shard worker {index} disconnected")
+            if self.running:
+                # Jobs that were in flight go through the normal retry path; bring the shard back
+                await asyncio.to_thread(self.processes[index].join, 5)
+                self._spawn(index)
+
+    async def _handle_transaction(self, writer: asyncio.StreamWriter, message):
+        """Settle a worker's write through the local batcher, which owns the oracle nonce"""
+        try:
+            args = _decode_value(message['args'])
+            if message['op'] == 'update_review_status':
+                tx_hash = await self.tx_batcher.update_review_status(*args)
+            elif message['op'] == 'update_review_tx_hashes':
+                tx_hash = await self.tx_batcher.update_review_tx_hashes(*args)
+            else:
+                functions = self.tx_batcher.web3_manager.contract.functions
+                tx_hash = await self.tx_batcher.send_transaction(getattr(functions, message['function'])(*args))
+        except Exception as e:
+            logger.error(f"Failed to send transaction for shard worker: {e}")
+            tx_hash = None
+        try:
+            await _send_message(writer, {'type': 'tx_result', 'id': message['id'], 'tx_hash': tx_hash})
+        except Exception as e:
+            logger.error(f"Failed to return transaction result to shard worker: {e}")
+
+    async def stop(self):
+        self.running = False
+        for writer in list(self.connections.values()):
+            try:
+                await _send_message(writer, {'type': 'stop'})
+            except Exception:
+                pass
+        for index, process in self.processes.items():
+            await asyncio.to_thread(process.join, 30)
+            if process.is_alive():
+                logger.warning(f"Shard worker {index} did not exit, terminating")
+                process.terminate()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        logger.info("Shard coordinator stopped")
+
+
+class RemoteTransactionClient:
+    """Worker-side stand-in for the TransactionBatcher - writes are signed and sent by the coordinator"""
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.pending = {}  # message id => future
+        self._ids = itertools.count(1)
+
+    async def update_review_status(self, review_id, is_approved):
+        return await self._request({'op': 'update_review_status', 'args': [review_id, is_approved]})
+
+    async def update_review_tx_hashes(self, review_id, submit_hash=None, approve_hash=None):
+        return await self._request({'op': 'update_review_tx_hashes', 'args': [review_id, submit_hash, approve_hash]})
+
+    async def send_transaction(self, func_call):
+        return await self._request({
+            'op': 'send',
+            'function': func_call.fn_name,
+            'args': _encode_value(list(func_call.args))
+        })
+
+    async def _request(self, message):
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message_id] = future
+        try:
+            await _send_message(self.writer, dict(message, type='tx', id=message_id))
+            return await future
+        finally:
+            self.pending.pop(message_id, None)
+
+    def resolve(self, message):
+        future = self.pending.get(message['id'])
+        if future is not None and not future.done():
+            future.set_result(message['tx_hash'])
+
+
+class ShardWorker:
+    """Worker process - runs its own DB, web3 (reads only) and AI clients for one shard"""
+    def __init__(self, shard_index: int, shard_count: int, port: int):
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.port = port
+        self.locks = {}  # shard key => [lock keeping jobs of one scenic spot in order, jobs using it]
+        self.tasks = set()
+        self.profiler = None
+
+    async def run(self):
+        config = Config()
+        db_manager = DatabaseManager(config.db_path)
+        if not await db_manager.connect():
+            logger.error(f"Shard worker {self.shard_index} failed to connect to database")
+            return
+        web3_manager = Web3Manager(config)
+        if not web3_manager.connect():
+            logger.error(f"Shard worker {self.shard_index} failed to connect to blockchain")
+            await db_manager.close()
+            return
+
+        # AI and DB metrics are recorded in this process, so each shard serves its own endpoint
+        self.profiler = SamplingProfiler(config, asyncio.get_running_loop())
+        metrics_server = None
+        if config.metrics_enabled:
+            metrics_server = MetricsServer(config.metrics_host, config.metrics_port + 1 + self.shard_index)
+            metrics_server.add_route("/debug/profile", self.profiler.handle_request)
+            await metrics_server.start()
+        
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port, limit=STREAM_LIMIT)
+        tx_client = RemoteTransactionClient(writer)
+        business_logic = BusinessLogic(config, web3_manager, db_manager, tx_client)
+        summary_scheduler = SummaryScheduler(
+            config, db_manager, business_logic,
+            owns_scenic_spot=lambda scenic_spot_id: shard_for({'scenicSpotId': scenic_spot_id}, self.shard_count) == self.shard_index
+        )
+        # Bookkeeping events run inline here - a deferred writer per process would drain the same rows twice
+        job_pool = JobWorkerPool(config, db_manager, business_logic, summary_scheduler)
+        scheduler_task = asyncio.create_task(summary_scheduler.run())
+        TRACER.configure(config, db_manager)
+        tracer_task = asyncio.create_task(TRACER.run())
+        loop_monitor = LoopLagMonitor(config) if config.loop_monitor_enabled else None
+        loop_monitor_task = None
+        if loop_monitor:
+            REGISTRY.add_collector(loop_monitor.collect_metrics)
+            loop_monitor_task = asyncio.create_task(loop_monitor.run())
+
+        await _send_message(writer, {'type': 'hello', 'shard': self.shard_index})
+        logger.info("Shard worker %s/%s ready", self.shard_index, self.shard_count)
+
+        try:
+            while True:
+                message = await _read_message(reader)
+                if message is None or message['type'] == 'stop':
+                    break
+                if message['type'] == 'tx_result':
+                    tx_client.resolve(message)
+                elif message['type'] == 'job':
+                    task = asyncio.create_task(self._run_job(job_pool, writer, message))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+        finally:
+            if self.tasks:
+                await asyncio.gather(*self.tasks, return_exceptions=True)
+            await summary_scheduler.stop()
+            await scheduler_task
+            await TRACER.stop()
+            await tracer_task
+            if loop_monitor:
+                await loop_monitor.stop()
+                loop_monitor_task.cancel()
+            writer.close()
+            if metrics_server:
+                await metrics_server.stop()
+            await db_manager.close()
+            logger.info("Shard worker %s stopped", self.shard_index)
+
+    async def _run_job(self, job_pool: JobWorkerPool, writer: asyncio.StreamWriter, message):
+        job = message['job']
+        key = shard_key(json.loads(job['event_data']))
+        entry = self.locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            # asyncio locks are FIFO, so jobs for one scenic spot run in the order they were dispatched
+            async with entry[0]:
+                success, result = await job_pool.process(job)
+        except Exception as e:
+            logger.error(f"Error processing job {job['event_id']} in shard {self.shard_index}: {e}")
+            success, result = False, str(e)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self.locks.pop(key, None)
+        await _send_message(writer, {'type': 'job_result', 'id': message['id'], 'success': success, 'result': str(result)})
+
+
+def run_shard_worker(shard_index, shard_count, port):
+    """Process entry point for a shard worker"""
+    # Signals reach the whole process group - let the coordinator drive shutdown
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    worker = ShardWorker(shard_index, shard_count, port)
+    if hasattr(signal, "SIGUSR1"):
+        # kill -USR1 -<process group> profiles the coordinator and every shard at once
+        signal.signal(signal.SIGUSR1, lambda signum, frame: worker.profiler and worker.profiler.start())
+    asyncio.run(worker.run())
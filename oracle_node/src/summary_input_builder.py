@@ -0,0 +1,196 @@
+import json
+import logging
+import math
+import re
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Review struct: (user, scenicId, content, rating, status, rewarded, rewardAmount, timestamp, submitTxHash, approveTxHash)
+REVIEW_CONTENT_INDEX = 2
+REVIEW_RATING_INDEX = 3
+REVIEW_TIMESTAMP_INDEX = 7
+
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+_WORD_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+_PUNCT_PATTERN = re.compile(r"[^\w\s]")
+_NORMALIZE_PATTERN = re.compile(r"[\W_]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without a model tokenizer
+
+    CJK characters count as one token each, latin words as one token per four
+    characters and each punctuation character as one token.
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    words = sum(math.ceil(len(word) / 4) for word in _WORD_PATTERN.findall(text))
+    punctuation = len(_PUNCT_PATTERN.findall(text))
+    return cjk + words + punctuation
+
+
+class SummaryReview:
+    """Single review candidate for the summary prompt"""
+    def __init__(self, position: int, review_id: int, content: str, rating: int, timestamp: int):
+        self.position = position
+        self.review_id = review_id
+        self.content = content
+        self.rating = rating
+        self.timestamp = timestamp
+        self.text = f"content: {content},EvaluationScore: {rating}"
+        self.tokens = estimate_tokens(self.text) + 1  # Separator
+        self.shingles = self._shingles(content)
+
+    def truncated(self, budget: int) -> "SummaryReview":
+        """Copy with the content cut down so the review fits in budget tokens"""
+        low, high = 0, len(self.content)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate_tokens(f"content: {self.content[:middle]},EvaluationScore: {self.rating}") + 1 <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return SummaryReview(self.position, self.review_id, self.content[:low], self.rating, self.timestamp)
+
+    @staticmethod
+    def _shingles(content: str, size: int = 3) -> set:
+        normalized = _NORMALIZE_PATTERN.sub("", content.lower())
+        if len(normalized) <= size:
+            return {normalized}
+        return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+    def similarity(self, other: "SummaryReview") -> float:
+        """Jaccard similarity of character shingles"""
+        if not self.shingles or not other.shingles:
+            return 0.0
+        return len(self.shingles & other.shingles) / len(self.shingles | other.shingles)
+
+
+class SummaryInput:
+    """Result of building a summary prompt"""
+    def __init__(self, summary_input: str, review_ids: List[int], total_reviews: int,
+                 duplicates_dropped: int, budget_dropped: int, estimated_tokens: int):
+        self.summary_input = summary_input
+        self.review_ids = review_ids
+        self.total_reviews = total_reviews
+        self.duplicates_dropped = duplicates_dropped
+        self.budget_dropped = budget_dropped
+        self.estimated_tokens = estimated_tokens
+
+    @property
+    def dropped(self) -> int:
+        return self.duplicates_dropped + self.budget_dropped
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "review_ids": self.review_ids,
+            "total_reviews": self.total_reviews,
+            "duplicates_dropped": self.duplicates_dropped,
+            "budget_dropped": self.budget_dropped,
+            "estimated_tokens": self.estimated_tokens
+        }
+
+
+class SummaryInputBuilder:
+    """Build a bounded summary prompt from approved reviews"""
+    def __init__(self, token_budget: int = 4000, dedup_similarity: float = 0.9):
+        self.token_budget = token_budget
+        self.dedup_similarity = dedup_similarity
+
+    @staticmethod
+    def extract_content(content: Any) -> str:
+        """Extract the text field from JSON review content"""
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        content = str(content)
+        if not content.lstrip().startswith("{"):
+            return content
+        try:
+            content_json = json.loads(content)
+        except json.JSONDecodeError:
+            return content
+        if isinstance(content_json, dict):
+            return str(content_json.get("content", ""))
+        return content
+
+    def build(self, scenic_spot_name: str, reviews: List[Any], review_ids: List[int]) -> SummaryInput:
+        """Deduplicate, rank and pack reviews into the token budget"""
+        candidates = []
+        for position, (review, review_id) in enumerate(zip(reviews, review_ids)):
+            timestamp = review[REVIEW_TIMESTAMP_INDEX] if len(review) > REVIEW_TIMESTAMP_INDEX else position
+            candidates.append(SummaryReview(
+                position=position,
+                review_id=review_id,
+                content=self.extract_content(review[REVIEW_CONTENT_INDEX]),
+                rating=review[REVIEW_RATING_INDEX],
+                timestamp=timestamp
+            ))
+
+        unique = self._deduplicate(candidates)
+        duplicates_dropped = len(candidates) - len(unique)
+
+        header = f"ScenicSpotName:{scenic_spot_name},top20reviews: "
+        selected = self._select(unique, self.token_budget - estimate_tokens(header))
+        budget_dropped = len(unique) - len(selected)
+
+        # Keep the prompt in chain order so the model sees reviews chronologically
+        selected.sort(key=lambda review: review.position)
+        summary_input = header + ";".join(review.text for review in selected)
+
+        return SummaryInput(
+            summary_input=summary_input,
+            review_ids=[review.review_id for review in selected],
+            total_reviews=len(candidates),
+            duplicates_dropped=duplicates_dropped,
+            budget_dropped=budget_dropped,
+            estimated_tokens=estimate_tokens(summary_input)
+        )
+
+    def _deduplicate(self, candidates: List[SummaryReview]) -> List[SummaryReview]:
+        """Drop near-identical reviews, keeping the most recent copy"""
+        unique = []
+        seen = set()  # Shingle sets already kept - identical ones are duplicates at any threshold up to 1
+        for candidate in sorted(candidates, key=lambda review: (review.timestamp, review.position), reverse=True):
+            shingle_key = frozenset(candidate.shingles)
+            if (shingle_key in seen and self.dedup_similarity <= 1) or any(self._similar(candidate, kept) for kept in unique):
+                logger.debug("Dropping near-duplicate review %s", candidate.review_id)
+                continue
+            unique.append(candidate)
+            seen.add(shingle_key)
+        return unique
+
+    def _similar(self, review: SummaryReview, other: SummaryReview) -> bool:
+        # Jaccard similarity is at most the ratio of the set sizes - skip the set operations
+        # for pairs whose sizes alone rule out a match
+        smaller, larger = sorted((len(review.shingles), len(other.shingles)))
+        if not larger or smaller < self.dedup_similarity * larger:
+            return False
+        return review.similarity(other) >= self.dedup_similarity
+
+    def _select(self, unique: List[SummaryReview], budget: int) -> List[SummaryReview]:
+        """Round-robin across rating buckets, newest first, until the budget is spent"""
+        buckets: Dict[int, List[SummaryReview]] = {}
+        for review in unique:  # Already ordered newest first
+            buckets.setdefault(review.rating, []).append(review)
+        order = sorted(buckets.values(), key=lambda bucket: bucket[0].timestamp, reverse=True)
+
+        selected = []
+        used = 0
+        while any(order):
+            for bucket in order:
+                if not bucket:
+                    continue
+                review = bucket.pop(0)
+                if used + review.tokens > budget:
+                    continue
+                selected.append(review)
+                used += review.tokens
+
+        if unique and not selected:
+            # No review fits on its own - an empty review list would make uploadSummary revert,
+            # so keep the newest one cut down to the budget
+            logger.warning(f"No review fits the summary token budget, truncating review {unique[0].review_id}")
+            selected.append(unique[0].truncated(budget))
+        return selected
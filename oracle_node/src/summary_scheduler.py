@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from src.config import Config
+from src.db_manager import DatabaseManager
+from src.business_logic import BusinessLogic
+from src.job_worker import retry_handed_off_job
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPE = "SummaryUpdateRequired"
+
+
+class PendingSummary:
+    """Merged SummaryUpdateRequired requests waiting for one scenic spot"""
+    def __init__(self, scenic_spot_id: int):
+        self.scenic_spot_id = scenic_spot_id
+        self.from_review_index = None
+        self.to_review_index = None
+        self.current_last_review_index = 0
+        self.transaction_hash = None  # Of the request with the highest toReviewIndex
+        self.events = []  # (event_id, transaction_hash, block_number, event_data)
+        self.first_seen = time.monotonic()
+        self.last_seen = self.first_seen
+        self.not_before = None  # Monotonic time enforced by next_generation_at
+
+    def merge(self, event_id, transaction_hash, block_number, event_data):
+        """Widen the pending index range with a new request"""
+        from_index = event_data['fromReviewIndex']
+        to_index = event_data['toReviewIndex']
+        if self.from_review_index is None or from_index < self.from_review_index:
+            self.from_review_index = from_index
+        if self.to_review_index is None or to_index > self.to_review_index:
+            self.to_review_index = to_index
+            self.transaction_hash = event_data.get('transaction_hash')
+        self.current_last_review_index = max(self.current_last_review_index, event_data['currentLastReviewIndex'])
+        self.events.append((event_id, transaction_hash, block_number, event_data))
+        self.last_seen = time.monotonic()
+
+    def to_event_data(self):
+        return {
+            'scenicSpotId': self.scenic_spot_id,
+            'fromReviewIndex': self.from_review_index,
+            'toReviewIndex': self.to_review_index,
+            'currentLastReviewIndex': self.current_last_review_index,
+            'transaction_hash': self.transaction_hash
+        }
+
+
+class SummaryScheduler:
+    """Debounce SummaryUpdateRequired bursts and generate one summary per scenic spot"""
+    def __init__(self, config: Config, db_manager: DatabaseManager, business_logic: BusinessLogic,
+                 owns_scenic_spot=None):
+        self.config = config
+        self.db_manager = db_manager
+        self.business_logic = business_logic
+        self.owns_scenic_spot = owns_scenic_spot or (lambda scenic_spot_id: True)  # Shard filter in multi-process mode
+        self.debounce_seconds = config.summary_debounce_seconds
+        self.max_wait_seconds = config.summary_max_wait_seconds
+        self.pending = {}  # scenic_spot_id => PendingSummary
+        self.deferred_writer = None  # Drained before each generation so tx hashes land on the right summary
+        self.flushing = False
+        self.running = False
+        self._wakeup = asyncio.Event()
+
+    async def schedule(self, event_id, transaction_hash, block_number, event_data):
+        """Record the event as scheduled and merge it into the pending request for its scenic spot"""
+        await self.db_manager.mark_event_as_processed(
+            event_id=event_id,
+            event_type=EVENT_TYPE,
+            transaction_hash=transaction_hash,
+            block_number=block_number,
+            event_data=json.dumps(event_data),
+            status='scheduled'
+        )
+        self._merge(event_id, transaction_hash, block_number, event_data)
+
+    async def restore(self):
+        """Reload events left in 'scheduled' state by a previous run"""
+        rows = await self.db_manager.get_events_by_status(EVENT_TYPE, 'scheduled')
+        rows = [row for row in rows if self.owns_scenic_spot(json.loads(row['event_data'])['scenicSpotId'])]
+        for row in rows:
+            self._merge(row['event_id'], row['transaction_hash'], row['block_number'], json.loads(row['event_data']))
+        if rows:
+            logger.info("Restored %s scheduled summary requests for %s scenic spots", len(rows), len(self.pending))
+
+    def _merge(self, event_id, transaction_hash, block_number, event_data):
+        scenic_spot_id = event_data['scenicSpotId']
+        pending = self.pending.get(scenic_spot_id)
+        if pending is None:
+            pending = PendingSummary(scenic_spot_id)
+            self.pending[scenic_spot_id] = pending
+        pending.merge(event_id, transaction_hash, block_number, event_data)
+        logger.info("Scheduled summary for scenic_spot_id: %s, range: %s-%s, pending events: %s", scenic_spot_id, pending.from_review_index, pending.to_review_index, len(pending.events))
+        self._wakeup.set()
+
+    def _due_at(self, pending: PendingSummary):
+        due_at = min(pending.last_seen + self.debounce_seconds, pending.first_seen + self.max_wait_seconds)
+        if pending.not_before is not None:
+            due_at = max(due_at, pending.not_before)
+        return due_at
+
+    async def run(self):
+        """Scheduler loop - flush pending spots once their debounce window and minimum interval have passed"""
+        self.running = True
+        await self.restore()
+        logger.info("Summary scheduler started")
+
+        while self.running:
+            try:
+                self._wakeup.clear()
+                now = time.monotonic()
+                timeout = None
+
+                for scenic_spot_id, pending in list(self.pending.items()):
+                    due_at = self._due_at(pending)
+                    if due_at > now:
+                        timeout = due_at - now if timeout is None else min(timeout, due_at - now)
+                        continue
+
+                    # Enforce the minimum interval recorded by the previous generation
+                    next_generation_at = await self.db_manager.get_next_generation_at(scenic_spot_id)
+                    if next_generation_at is not None:
+                        remaining = (next_generation_at - datetime.now()).total_seconds()
+                        if remaining > 0:
+                            pending.not_before = time.monotonic() + remaining
+                            logger.info("Summary for scenic_spot_id: %s deferred %.0fs by minimum interval", scenic_spot_id, remaining)
+                            timeout = remaining if timeout is None else min(timeout, remaining)
+                            continue
+
+                    del self.pending[scenic_spot_id]
+                    self.flushing = True
+                    try:
+                        await self._flush(pending)
+                    finally:
+                        self.flushing = False
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in summary scheduler: {e}")
+                await asyncio.sleep(1)
+
+        logger.info("Summary scheduler stopped")
+
+    async def _flush(self, pending: PendingSummary):
+        """Generate one summary for the widest range and mark superseded events as coalesced"""
+        event_data = pending.to_event_data()
+        primary_event_id, primary_tx_hash, primary_block, _ = pending.events[-1]
+
+        # updateSummaryTxHash targets the latest summary, so settle outstanding ones first - backing off or not
+        if self.deferred_writer is not None:
+            await self.deferred_writer.drain(due_only=False)
+
+        logger.info("Generating coalesced summary for scenic_spot_id: %s from %s events, range: %s-%s", pending.scenic_spot_id, len(pending.events), pending.from_review_index, pending.to_review_index)
+
+        await self.db_manager.mark_event_as_processed(
+            event_id=primary_event_id,
+            event_type=EVENT_TYPE,
+            transaction_hash=primary_tx_hash,
+            block_number=primary_block,
+            event_data=json.dumps(event_data),
+            status='processing'
+        )
+
+        success, result = await self.business_logic.process_summary_update_required(event_data)
+
+        status = 'success' if success else 'failed'
+        await self.db_manager.mark_event_as_processed(
+            event_id=primary_event_id,
+            event_type=EVENT_TYPE,
+            transaction_hash=primary_tx_hash,
+            block_number=primary_block,
+            event_data=json.dumps(event_data),
+            status=status,
+            result=str(result)
+        )
+
+        for event_id, transaction_hash, block_number, original_data in pending.events[:-1]:
+            await self.db_manager.mark_event_as_processed(
+                event_id=event_id,
+                event_type=EVENT_TYPE,
+                transaction_hash=transaction_hash,
+                block_number=block_number,
+                event_data=json.dumps(original_data),
+                status='coalesced' if success else 'failed',
+                result=f"coalesced into {primary_event_id}" if success else str(result)
+            )
+
+        logger.info("Processed SummaryUpdateRequired event: %s, status: %s, coalesced: %s", primary_event_id, status, len(pending.events) - 1)
+
+        if not success:
+            # The jobs were acked when they were scheduled - send every merged request back through the
+            # job queue's backoff so the retry covers the whole range again, or dead-letter it when out of retries
+            for event_id, _, _, _ in pending.events:
+                await retry_handed_off_job(self.db_manager, self.config, event_id, EVENT_TYPE, result)
+
+    async def stop(self):
+        self.running = False
+        self._wakeup.set()
@@ -0,0 +1,160 @@
+import asyncio
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# The span the current task is inside - asyncio tasks and to_thread calls inherit a copy
+_current_span = contextvars.ContextVar("oracle_current_span", default=None)
+
+
+class Span:
+    """One timed stage of an event's processing"""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "started_at", "status")
+
+    def __init__(self, trace_id: str, span_id: str, parent_id: Optional[str], name: str, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.status = "ok"
+
+
+class Tracer:
+    """Collects spans in memory and writes them to SQLite in batches"""
+    def __init__(self):
+        self.enabled = False
+        self.db_manager = None
+        self.flush_interval = 5.0
+        self.batch_size = 500
+        self.retention_seconds = 7 * 86400
+        self.running = False
+        self.buffer = []  # (trace_id, span_id, parent_id, name, started_at, duration_ms, status, attributes)
+        self._ids = itertools.count(1)
+        self._prefix = f"{os.getpid():x}"  # Span ids stay unique across shard worker processes
+        self._lock = threading.Lock()  # Spans also close on to_thread worker threads
+        self._flush_needed = None
+        self._loop = None
+
+    def configure(self, config, db_manager):
+        """Enable tracing for this process, persisting through db_manager"""
+        self.enabled = config.tracing_enabled
+        self.db_manager = db_manager
+        self.flush_interval = config.trace_flush_interval
+        self.batch_size = max(1, config.trace_batch_size)
+        self.retention_seconds = config.trace_retention_days * 86400
+
+    @contextmanager
+    def span(self, name: str, trace_id: Optional[str] = None, **attributes):
+        """Time the with-block as a child of the current span, or as a root of trace_id"""
+        parent = _current_span.get()
+        # Outside a trace nothing is recorded, so shared code paths only produce spans while handling an event
+        if not self.enabled or (trace_id is None and parent is None):
+            yield None
+            return
+        span = Span(
+            trace_id or parent.trace_id, f"{self._prefix}-{next(self._ids)}",
+            parent.span_id if parent is not None and (trace_id is None or trace_id == parent.trace_id) else None,
+            name, attributes
+        )
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            _current_span.reset(token)
+            self._add(span, (time.perf_counter() - start) * 1000)
+
+    def record(self, name: str, trace_id: str, duration_seconds: float, **attributes):
+        """Record a stage measured elsewhere, such as time spent waiting in the job queue"""
+        if not self.enabled:
+            return
+        parent = _current_span.get()
+        span = Span(trace_id, f"{self._prefix}-{next(self._ids)}",
+                    parent.span_id if parent is not None and parent.trace_id == trace_id else None, name, attributes)
+        span.started_at -= duration_seconds
+        self._add(span, duration_seconds * 1000)
+
+    def _add(self, span: Span, duration_ms: float):
+        record = (
+            span.trace_id, span.span_id, span.parent_id, span.name, span.started_at, duration_ms, span.status,
+            json.dumps(span.attributes, default=str) if span.attributes else None
+        )
+        with self._lock:
+            self.buffer.append(record)
+            # Bound memory if the database is unavailable for a while
+            overflow = len(self.buffer) - self.batch_size * 20
+            if overflow > 0:
+                del self.buffer[:overflow]
+            full = len(self.buffer) >= self.batch_size
+        if full and self._flush_needed is not None:
+            self._loop.call_soon_threadsafe(self._flush_needed.set)
+
+    async def run(self):
+        """Flush buffered spans every flush_interval seconds or when a batch fills up"""
+        if not self.enabled:
+            return
+        self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._flush_needed = asyncio.Event()
+        last_prune = 0.0
+        logger.info(f"Tracer started (flush every {self.flush_interval}s or {self.batch_size} spans)")
+        while self.running:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_needed.clear()
+                await self.flush()
+                if time.time() - last_prune > 3600:
+                    last_prune = time.time()
+                    await self.db_manager.delete_trace_spans_before(last_prune - self.retention_seconds)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in tracer: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self):
+        with self._lock:
+            records, self.buffer = self.buffer, []
+        if not records or self.db_manager is None:
+            return
+        if not await self.db_manager.save_trace_spans(records):
+            with self._lock:
+                # Keep them for the next flush
+                self.buffer = records + self.buffer
+
+    async def stop(self):
+        self.running = False
+        if self._flush_needed is not None:
+            self._flush_needed.set()
+        if self.enabled:
+            await self.flush()
+
+
+TRACER = Tracer()
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace (event) ID of the span the caller is inside, if any"""
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+
+def span(name: str, trace_id: Optional[str] = None, **attributes):
+    """Shortcut for TRACER.span"""
+    return TRACER.span(name, trace_id, **attributes)
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import time
+from web3.logs import DISCARD
+from src.config import Config
+from src.web3_manager import Web3Manager
+
+logger = logging.getLogger(__name__)
+
+ZERO_HASH = "0x" + "0" * 64
+
+
+class PendingBatch:
+    """Accumulated items for one batch entry point"""
+    def __init__(self):
+        self.items = {}  # review_id => item value
+        self.futures = {}  # review_id => list of futures waiting on the flush
+        self.first_added = None
+
+    def __len__(self):
+        return len(self.items)
+
+
+class TransactionBatcher:
+    """Accumulate review status and tx-hash writes and settle them in batch transactions"""
+    def __init__(self, config: Config, web3_manager: Web3Manager):
+        self.config = config
+        self.web3_manager = web3_manager
+        self.max_items = max(1, config.tx_batch_max_items)
+        self.flush_seconds = config.tx_batch_flush_seconds
+        self.status_batch = PendingBatch()
+        self.tx_hash_batch = PendingBatch()
+        self.running = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+    def update_review_status(self, review_id, is_approved) -> asyncio.Future:
+        """Queue updateReviewStatus - the future resolves to the oracle tx hash, or None on failure"""
+        return self._add(self.status_batch, review_id, is_approved, merge=lambda old, new: new)
+
+    def update_review_tx_hashes(self, review_id, submit_hash=None, approve_hash=None) -> asyncio.Future:
+        """Queue updateReviewTxHashes - zero/None hashes leave the on-chain value untouched"""
+        return self._add(
+            self.tx_hash_batch, review_id, (submit_hash or ZERO_HASH, approve_hash or ZERO_HASH),
+            # Submit and approve hashes for the same review collapse into one entry
+            merge=lambda old, new: (
+                new[0] if new[0] != ZERO_HASH else old[0],
+                new[1] if new[1] != ZERO_HASH else old[1]
+            )
+        )
+
+    async def send_transaction(self, func_call):
+        """Send a one-off contract call, queued behind batch flushes (Web3Manager serializes the sends themselves)"""
+        async with self._flush_lock:
+            return await asyncio.to_thread(self.web3_manager.send_transaction, func_call)
+
+    def _add(self, batch: PendingBatch, review_id, value, merge) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if review_id in batch.items:
+            batch.items[review_id] = merge(batch.items[review_id], value)
+        else:
+            batch.items[review_id] = value
+        batch.futures.setdefault(review_id, []).append(future)
+        if batch.first_added is None:
+            batch.first_added = time.monotonic()
+        self._wakeup.set()
+        return future
+
+    async def run(self):
+        """Flush loop - flush a batch once it holds max_items or its oldest item is flush_seconds old"""
+        self.running = True
+        logger.info("Transaction batcher started (max items: %s, flush interval: %ss)", self.max_items, self.flush_seconds)
+
+        while self.running:
+            try:
+                self._wakeup.clear()
+                timeout = None
+                for batch, flush in ((self.status_batch, self._flush_status), (self.tx_hash_batch, self._flush_tx_hashes)):
+                    if not batch:
+                        continue
+                    remaining = batch.first_added + self.flush_seconds - time.monotonic()
+                    if len(batch) >= self.max_items or remaining <= 0:
+                        await flush()
+                    else:
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+
+                if self.status_batch or self.tx_hash_batch:
+                    # Items arrived during a flush - re-evaluate immediately
+                    if timeout is None:
+                        continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in transaction batcher: {e}")
+                await asyncio.sleep(1)
+
+        # Settle whatever is still queued before shutting down
+        await self.flush_all()
+        logger.info("Transaction batcher stopped")
+
+    async def flush_all(self):
+        if self.status_batch:
+            await self._flush_status()
+        if self.tx_hash_batch:
+            await self._flush_tx_hashes()
+
+    def _take(self, batch: PendingBatch):
+        """Detach up to max_items entries from a batch, keeping the futures per review"""
+        review_ids = list(batch.items.keys())[:self.max_items]
+        items = [(review_id, batch.items.pop(review_id)) for review_id in review_ids]
+        futures = {review_id: batch.futures.pop(review_id) for review_id in review_ids}
+        batch.first_added = time.monotonic() if batch.items else None
+        return items, futures
+
+    async def _flush_status(self):
+        async with self._flush_lock:
+            items, futures = self._take(self.status_batch)
+            if not items:
+                return
+            functions = self.web3_manager.contract.functions
+            await self._settle(
+                "updateReviewStatus", items, futures,
+                single_call=lambda review_id, is_approved: functions.updateReviewStatus(review_id, is_approved),
+                batch_call=lambda batch: functions.updateReviewStatusBatch(
+                    [review_id for review_id, _ in batch],
+                    [is_approved for _, is_approved in batch]
+                ),
+                # The batch skips reviews that are missing or no longer pending - only the ones
+                # with a ReviewApproved log in the receipt were actually updated
+                confirm=self._approved_review_ids
+            )
+
+    async def _flush_tx_hashes(self):
+        async with self._flush_lock:
+            items, futures = self._take(self.tx_hash_batch)
+            if not items:
+                return
+            web3 = self.web3_manager.web3
+            functions = self.web3_manager.contract.functions
+            await self._settle(
+                "updateReviewTxHashes", items, futures,
+                single_call=lambda review_id, hashes: functions.updateReviewTxHashes(
+                    review_id, web3.to_bytes(hexstr=hashes[0]), web3.to_bytes(hexstr=hashes[1])
+                ),
+                batch_call=lambda batch: functions.updateReviewTxHashesBatch(
+                    [review_id for review_id, _ in batch],
+                    [web3.to_bytes(hexstr=hashes[0]) for _, hashes in batch],
+                    [web3.to_bytes(hexstr=hashes[1]) for _, hashes in batch]
+                )
+            )
+
+    async def _settle(self, function_name, items, futures, single_call, batch_call, confirm=None):
+        """Send the items and resolve every future - with its own review's tx hash, or None when that review failed"""
+        results = {}
+        try:
+            if len(items) > 1:
+                logger.info("Flushing %s batch with %s reviews", function_name, len(items))
+            await self._send_items(function_name, items, single_call, batch_call, confirm, results)
+        except Exception as e:
+            logger.error(f"Failed to settle {function_name} for reviews {[review_id for review_id, _ in items]}: {e}")
+        finally:
+            for review_id, waiting in futures.items():
+                for future in waiting:
+                    if not future.done():
+                        future.set_result(results.get(review_id))
+
+    async def _send_items(self, function_name, items, single_call, batch_call, confirm, results):
+        """Send items as one batch - a reverted batch is split in halves until the failing reviews are on their own,
+        and reviews the mined batch skipped are resent individually"""
+        if len(items) == 1:
+            review_id, value = items[0]
+            results[review_id] = await self._send(function_name, lambda: single_call(review_id, value))
+            if results[review_id] is None:
+                logger.error(f"{function_name} failed for review {review_id}")
+            return
+
+        try:
+            func_call = batch_call(items)
+        except Exception as e:
+            # The deployed contract has no batch entry point - nothing to split, send each review on its own
+            logger.error(f"Failed to build {function_name} batch, sending {len(items)} reviews individually: {e}")
+            for item in items:
+                await self._send_items(function_name, [item], single_call, batch_call, confirm, results)
+            return
+
+        tx_hash = await self._send(f"{function_name}Batch", lambda: func_call)
+        if tx_hash is None:
+            logger.warning(f"{function_name} batch failed, splitting reviews: {[review_id for review_id, _ in items]}")
+            middle = len(items) // 2
+            for half in (items[:middle], items[middle:]):
+                await self._send_items(function_name, half, single_call, batch_call, confirm, results)
+            return
+
+        settled = await self._confirm(function_name, confirm, tx_hash, items)
+        results.update((review_id, tx_hash) for review_id in settled)
+        logger.info("%s batch settled %s of %s reviews, tx_hash: %s", function_name, len(settled), len(items), tx_hash)
+        skipped = [(review_id, value) for review_id, value in items if review_id not in settled]
+        if skipped:
+            logger.warning(f"{function_name} batch skipped reviews {[review_id for review_id, _ in skipped]}, resending individually")
+        for item in skipped:
+            await self._send_items(function_name, [item], single_call, batch_call, confirm, results)
+
+    async def _send(self, function_name, build_call):
+        """Build and send one contract call - returns the tx hash, or None if building, sending or the tx failed"""
+        try:
+            func_call = build_call()
+            # Sending waits for the receipt - keep it off the event loop. Web3Manager's thread lock keeps the
+            # local nonce safe even if this task is cancelled and the flush lock released mid-send
+            return await asyncio.to_thread(self.web3_manager.send_transaction, func_call)
+        except Exception as e:
+            logger.error(f"Failed to send {function_name}: {e}")
+            return None
+
+    async def _confirm(self, function_name, confirm, tx_hash, items):
+        """Review ids a mined batch actually applied - all of them when there is no per-item check"""
+        if confirm is None:
+            return {review_id for review_id, _ in items}
+        try:
+            return await asyncio.to_thread(confirm, tx_hash, items)
+        except Exception as e:
+            # Unconfirmed items are resent on their own; a resend of an applied item reverts and fails visibly
+            logger.error(f"Failed to read {function_name} batch receipt {tx_hash}: {e}")
+            return set()
+
+    def _approved_review_ids(self, tx_hash, items):
+        receipt = self.web3_manager.web3.eth.get_transaction_receipt(tx_hash)
+        events = self.web3_manager.contract.events.ReviewApproved().process_receipt(receipt, errors=DISCARD)
+        batch_ids = {review_id for review_id, _ in items}
+        return {event['args']['reviewId'] for event in events} & batch_ids
+
+    async def stop(self):
+        self.running = False
+        self._wakeup.set()
@@ -1,10 +1,18 @@
+import asyncio
 import json
 import logging
+import time
 import httpx
 from typing import List, Dict, Any, Optional
+from src.ai_router import AiRouter
+from src.metrics import AI_REQUEST_SECONDS
+from src.logging_setup import log_payload
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the summary system prompt or input format changes, so cached summaries are not reused
+SUMMARY_PROMPT_VERSION = "1"
+
 
 class AiRequestMessage:
     """AI request message class"""
@@ -31,6 +39,10 @@ class AiRequest:
         self.max_tokens = max_tokens
         self.stream = stream
 
+    def with_model(self, model: str) -> "AiRequest":
+        """Copy of this request targeting another model"""
+        return AiRequest(model, self.messages, self.temperature, self.top_p, self.max_tokens, self.stream)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "model": self.model,
@@ -75,17 +87,54 @@ class AiResponse:
         return ""
 
 
+def split_into_chunks(text: str, chunk_size: int, overlap: int = 0) -> List[str]:
+    """Split text into chunks of at most chunk_size characters that overlap by overlap characters"""
+    if chunk_size <= 0 or len(text) <= chunk_size:
+        return [text]
+    overlap = max(0, min(overlap, chunk_size // 2))
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # Prefer to break on whitespace in the second half of the chunk
+            boundary = text.rfind(" ", start + chunk_size // 2, end)
+            if boundary > start:
+                end = boundary + 1
+        chunks.append(text[start:end])
+        if end >= len(text):
+            break
+        start = end - overlap
+    return chunks
+
+
 class VolcEngineAI:
     """Volc Engine AI service wrapper"""
-    def __init__(self, api_key: str, api_url: str = "https://ark.cn-beijing.volces.com/api/v3/bots/chat/completions"):
+    def __init__(self, api_key: str, api_url: str = "https://ark.cn-beijing.volces.com/api/v3/bots/chat/completions",
+                 routers: Optional[Dict[str, AiRouter]] = None):
         self.api_key = api_key
         self.api_url = api_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.routers = routers or {}  # task ("audit" / "summary") => AiRouter
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use unless connect() ran - building it loads the CA bundle, which takes tens of ms
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30.0)
+        return self._client
+
+    async def connect(self) -> bool:
+        """Create the HTTP client on a thread, keeping the CA bundle load off the event loop"""
+        if self._client is None:
+            self._client = await asyncio.to_thread(httpx.AsyncClient, timeout=30.0)
+        return True
 
-    async def generate(self, request: AiRequest) -> AiResponse:
+    async def generate(self, request: AiRequest, api_url: Optional[str] = None) -> AiResponse:
         """Call AI to generate response"""
         try:
-            logger.info(f"Generating AI response with model: {request.model}, stream mode: {request.stream}")
+            api_url = api_url or self.api_url
+            logger.info("Generating AI response with model: %s, stream mode: %s", request.model, request.stream)
             
             # Build request headers
             headers = {
@@ -102,20 +151,26 @@ class VolcEngineAI:
                     "include_usage": True
                 }
             
-            logger.debug(f"AI Request Payload: {json.dumps(request_data, ensure_ascii=False)}")
+            log_payload(logger, "AI request payload", request_data)
             
             # Send request
-            response = await self.client.post(
-                self.api_url,
-                headers=headers,
-                json=request_data
-            )
-            
-            response.raise_for_status()
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(
+                    api_url,
+                    headers=headers,
+                    json=request_data
+                )
+                
+                response.raise_for_status()
+            except Exception:
+                AI_REQUEST_SECONDS.observe(time.perf_counter() - start, model=request.model, outcome="error")
+                raise
+            AI_REQUEST_SECONDS.observe(time.perf_counter() - start, model=request.model, outcome="ok")
             
             # Process response
             response_data = response.json()
-            logger.debug(f"Received API response: {json.dumps(response_data, ensure_ascii=False)}")
+            log_payload(logger, "AI response", response_data)
             
             return AiResponse.from_dict(response_data)
             
@@ -126,8 +181,51 @@ class VolcEngineAI:
             logger.error(f"Error generating AI response: {str(e)}")
             raise
     
-    async def audit_review_content(self, content: str, model_id: str) -> bool:
-        """Audit review content"""
+    async def generate_routed(self, task: str, request: AiRequest) -> AiResponse:
+        """Generate through the task's router, or the default endpoint if none is configured"""
+        router = self.routers.get(task)
+        if router is None:
+            return await self.generate(request)
+        return await router.call(
+            lambda endpoint: self.generate(request.with_model(endpoint.model_id), api_url=endpoint.api_url)
+        )
+    
+    async def audit_review_content(self, audit_content: Dict[str, Any], model_id: str, chunk_size: Optional[int] = None,
+                                   chunk_overlap: int = 200, max_concurrency: int = 4) -> bool:
+        """Audit a review envelope ({ScenicSpotName, EvaluationScore, content}), splitting oversized
+        review content into chunks that are audited concurrently, each in its own copy of the envelope"""
+        content = str(audit_content.get("content") or "")
+        if chunk_size and len(content) > chunk_size:
+            return await self._audit_chunked(audit_content, content, model_id, chunk_size, chunk_overlap, max_concurrency)
+        return await self._audit_single(json.dumps(audit_content, ensure_ascii=False), model_id)
+    
+    async def _audit_chunked(self, audit_content: Dict[str, Any], content: str, model_id: str, chunk_size: int,
+                             chunk_overlap: int, max_concurrency: int) -> bool:
+        """Audit overlapping content chunks, at most max_concurrency at a time, rejecting as soon as any chunk is rejected"""
+        chunks = split_into_chunks(content, chunk_size, chunk_overlap)
+        logger.info("Auditing oversized content (%s chars) in %s chunks, %s at a time", len(content), len(chunks), max(1, max_concurrency))
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def audit_chunk(chunk: str) -> bool:
+            async with semaphore:
+                # Same envelope as an unchunked audit, so every chunk is judged with the scenic spot and rating
+                return await self._audit_single(json.dumps(dict(audit_content, content=chunk), ensure_ascii=False), model_id)
+        
+        tasks = [asyncio.create_task(audit_chunk(chunk)) for chunk in chunks]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                if not await completed:
+                    logger.info("Chunk rejected, cancelling remaining chunk audits")
+                    return False
+            return True
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _audit_single(self, content: str, model_id: str) -> bool:
+        """Audit a single piece of content in one request"""
         try:
             messages = [
                 AiRequestMessage(
@@ -147,10 +245,10 @@ class VolcEngineAI:
                 max_tokens=10
             )
             
-            response = await self.generate(request)
+            response = await self.generate_routed("audit", request)
             result = response.content.strip()
             
-            logger.info(f"Content audit result for '{content}': {result}")
+            logger.info("Content audit result: %s (%d chars)", result, len(content))
             # Handle AI response - only check for English "Approved" since system prompt is now in English
             return result == "Approved"
             
@@ -181,10 +279,10 @@ class VolcEngineAI:
                 max_tokens=2000
             )
             
-            response = await self.generate(request)
+            response = await self.generate_routed("summary", request)
             summary_content = response.content.strip()
             
-            logger.info(f"Generated summary from input: {summary_content}")
+            log_payload(logger, "Generated summary", summary_content)
             return summary_content
             
         except Exception as e:
@@ -193,4 +291,5 @@ class VolcEngineAI:
     
     async def close(self):
         """Close HTTP client"""
-        await self.client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
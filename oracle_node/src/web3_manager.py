@@ -1,49 +1,64 @@
 import os
+import json
 import logging
+import threading
+import time
 from web3 import Web3
 from src.config import Config
+from src.rpc_pool import RpcProviderPool, PooledHTTPProvider
+from src.metrics import TX_CONFIRMATION_SECONDS, TX_IN_FLIGHT
+from src.logging_setup import log_payload
 
 logger = logging.getLogger(__name__)
 
+def load_contract_abi(abi_path):
+    """Read and parse the contract ABI - parsed once and shared by the sync and async contract objects"""
+    with open(abi_path, 'r') as f:
+        return json.load(f)
+
 class Web3Manager:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, rpc_pool: RpcProviderPool = None, abi=None):
         self.config = config
+        self.rpc_pool = rpc_pool or RpcProviderPool(config)  # Shared with the async listener when passed in
+        self.abi = abi  # Parsed contract ABI, loaded from ABI_PATH on connect when not passed in
         self.web3 = None
         self.oracle_account = None
         self.contract = None
         self.local_nonce = None  # Local nonce counter
+        # Sends run in worker threads; one at a time, so no two ever build a transaction with the same nonce
+        self._send_lock = threading.Lock()
         
     def connect(self):
         try:
             # Create Web3 connection
-            self.web3 = Web3(Web3.HTTPProvider(self.config.rpc_url))
+            self.web3 = Web3(PooledHTTPProvider(self.rpc_pool))
             
             # Check connection status
             if not self.web3.is_connected():
                 raise Exception("Failed to connect to RPC endpoint")
             
-            logger.info(f"Connected to blockchain: {self.config.rpc_url}")
+            logger.info("Connected to blockchain: %s", ', '.join(self.config.rpc_urls))
             
             # Load Oracle account
             self.oracle_account = self.web3.eth.account.from_key(self.config.oracle_private_key)
-            logger.info(f"Oracle account loaded: {self.oracle_account.address}")
+            logger.info("Oracle account loaded: %s", self.oracle_account.address)
             
             # Load contract
-            with open(self.config.abi_path, 'r') as f:
-                abi = f.read()
+            if self.abi is None:
+                self.abi = load_contract_abi(self.config.abi_path)
             
             self.contract = self.web3.eth.contract(
                 address=self.web3.to_checksum_address(self.config.scenic_review_system_address),
-                abi=abi
+                abi=self.abi
             )
             
-            logger.info(f"Contract loaded: {self.config.scenic_review_system_address}")
+            logger.info("Contract loaded: %s", self.config.scenic_review_system_address)
             
             # Verify Oracle address in contract
             try:
                 contract_oracle_address = self.contract.functions.oracleAddress().call()
-                logger.info(f"Contract oracle address: {contract_oracle_address}")
-                logger.info(f"Oracle account matches contract oracle address: {contract_oracle_address == self.oracle_account.address}")
+                logger.info("Contract oracle address: %s", contract_oracle_address)
+                logger.info("Oracle account matches contract oracle address: %s", contract_oracle_address == self.oracle_account.address)
             except Exception as e:
                 logger.error(f"Failed to verify contract oracle address: {e}")
             
@@ -58,7 +73,7 @@ class Web3Manager:
             # If local nonce doesn't exist, get the latest value from the blockchain
             if self.local_nonce is None:
                 self.local_nonce = self.web3.eth.get_transaction_count(self.oracle_account.address)
-                logger.info(f"Initialized local nonce from blockchain: {self.local_nonce}")
+                logger.info("Initialized local nonce from blockchain: %s", self.local_nonce)
             return self.local_nonce
         except Exception as e:
             logger.error(f"Failed to get nonce: {e}")
@@ -72,16 +87,22 @@ class Web3Manager:
             return None
     
     def send_transaction(self, func_call, value=0, retry_count=3):
+        """Sign, send and wait for a contract call - returns the tx hash, or None if it failed or reverted"""
+        # Held by the thread itself, so a cancelled asyncio caller cannot let a second send overlap this one
+        with self._send_lock:
+            return self._send_transaction(func_call, value, retry_count)
+    
+    def _send_transaction(self, func_call, value, retry_count):
         try:
             # Get Oracle account address
             oracle_address = self.oracle_account.address
-            logger.info(f"Sending transaction from Oracle address: {oracle_address}")
+            logger.info("Sending transaction from Oracle address: %s", oracle_address)
             
             # Verify Oracle address in contract
             try:
                 contract_oracle_address = self.contract.functions.oracleAddress().call()
-                logger.info(f"Contract oracle address: {contract_oracle_address}")
-                logger.info(f"Oracle account matches contract oracle address: {contract_oracle_address == oracle_address}")
+                logger.info("Contract oracle address: %s", contract_oracle_address)
+                logger.info("Oracle account matches contract oracle address: %s", contract_oracle_address == oracle_address)
             except Exception as e:
                 logger.error(f"Failed to verify contract oracle address: {e}")
             
@@ -90,7 +111,7 @@ class Web3Manager:
                 nonce = self.get_nonce()
                 if nonce is None:
                     return None
-                logger.info(f"Using nonce: {nonce} (attempt {attempt + 1})")
+                logger.info("Using nonce: %s (attempt %s)", nonce, attempt + 1)
                 
                 # First try to build the transaction directly without using estimate_gas
                 try:
@@ -103,27 +124,27 @@ class Web3Manager:
                         'value': value
                     })
                     
-                    logger.info(f"Transaction built successfully: {tx}")
+                    log_payload(logger, "Built transaction", tx)
                     
                     # Sign transaction
                     signed_tx = self.web3.eth.account.sign_transaction(
                         tx, self.config.oracle_private_key
                     )
-                    logger.info(f"Transaction signed successfully")
+                    logger.info("Transaction signed successfully")
                     
                     # Send transaction - use the correct property name raw_transaction (underscore format)
                     tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                    logger.info(f"Transaction sent: {tx_hash.hex()}")
+                    logger.info("Transaction sent: %s", tx_hash.hex())
                     
                     # Wait for transaction confirmation
-                    tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+                    tx_receipt = self._wait_for_receipt(tx_hash)
                     
                     if tx_receipt.status == 1:
-                        logger.info(f"Transaction confirmed: {tx_hash.hex()}")
+                        logger.info("Transaction confirmed: %s", tx_hash.hex())
                         # Increment local nonce after success
                         if self.local_nonce is not None:
                             self.local_nonce += 1
-                            logger.info(f"Updated local nonce to: {self.local_nonce}")
+                            logger.info("Updated local nonce to: %s", self.local_nonce)
                         return tx_hash.hex()
                     else:
                         logger.error(f"Transaction failed: {tx_hash.hex()}")
@@ -168,6 +189,19 @@ class Web3Manager:
                 logger.error(f"Error data: {e.data}")
             return None
     
+    def _wait_for_receipt(self, tx_hash):
+        """Wait for a receipt, recording confirmation time and in-flight count"""
+        start = time.perf_counter()
+        status = "error"
+        TX_IN_FLIGHT.inc()
+        try:
+            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            status = "success" if tx_receipt.status == 1 else "reverted"
+            return tx_receipt
+        finally:
+            TX_IN_FLIGHT.dec()
+            TX_CONFIRMATION_SECONDS.observe(time.perf_counter() - start, status=status)
+    
     def get_block_number(self):
         try:
             return self.web3.eth.block_number